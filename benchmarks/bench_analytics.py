@@ -0,0 +1,93 @@
+"""Compares brawlstats.analytics with per-item Box loops on synthetic battle logs.
+
+Usage: python -m benchmarks.bench_analytics [--battles 1000000]
+"""
+import argparse
+import random
+import time
+from collections import defaultdict
+
+import brawlstats
+from brawlstats.analytics import BattleFrame, parse_battle_times
+from brawlstats.utils import get_datetime
+
+MODES = [
+    ('gemGrab', 'Hard Rock Mine'), ('brawlBall', 'Backyard Bowl'), ('heist', 'Safe Zone'), ('bounty', 'Shooting Star')
+]
+OWNER = '#2PP'
+
+
+def make_battle(rng):
+    mode, map_ = rng.choice(MODES)
+    players = [
+        {'tag': OWNER if i == 0 else f'#{rng.randrange(10 ** 8)}', 'name': 'x',
+         'brawler': {'id': 16000000 + b, 'name': f'BRAWLER{b}', 'power': 11, 'trophies': 500}}
+        for i, b in enumerate(rng.sample(range(60), 6))
+    ]
+    return {
+        'battleTime': f'2024{rng.randint(1, 12):02d}{rng.randint(1, 28):02d}T{rng.randrange(24):02d}'
+                      f'{rng.randrange(60):02d}{rng.randrange(60):02d}.000Z',
+        'event': {'id': 15000000, 'mode': mode, 'map': map_},
+        'battle': {
+            'mode': mode, 'type': 'ranked', 'result': rng.choice(['victory', 'defeat', 'draw']), 'duration': 120,
+            'trophyChange': rng.randint(-8, 8), 'starPlayer': rng.choice(players),
+            'teams': [players[:3], players[3:]]
+        }
+    }
+
+
+def timed(label, func, scale=1):
+    start = time.perf_counter()
+    result = func()
+    elapsed = (time.perf_counter() - start) * scale
+    print(f'{label:<45} {elapsed:8.3f} s')
+    return result
+
+
+def box_win_rates(battle_logs):
+    games, wins = defaultdict(int), defaultdict(int)
+    for tag, battle_log in battle_logs:
+        for item in battle_log:
+            for team in item.battle.teams:
+                for player in team:
+                    if player.tag == tag:
+                        games[player.brawler.name] += 1
+                        wins[player.brawler.name] += item.battle.result == 'victory'
+    return {name: wins[name] / games[name] for name in games}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--battles', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    templates = [make_battle(rng) for _ in range(5000)]
+    battle_logs = [
+        (OWNER, {'items': [templates[(i * 25 + j) % len(templates)] for j in range(25)]})
+        for i in range(args.battles // 25)
+    ]
+    times = [item['battleTime'] for _, log in battle_logs for item in log['items']]
+    print(f'{len(times)} battles in {len(battle_logs)} battle logs\n')
+
+    # The Box baseline is measured on a sample and scaled up
+    sample = battle_logs[:max(1, len(battle_logs) // 50)]
+    scale = len(battle_logs) / len(sample)
+    timed('BattleLog models (Box, extrapolated)', lambda: [brawlstats.BattleLog(None, log) for _, log in sample], scale)
+    models = [(tag, brawlstats.BattleLog(None, log)) for tag, log in sample]
+    timed('win rate loop over Box (extrapolated)', lambda: box_win_rates(models), scale)
+    timed('utils.get_datetime loop', lambda: [get_datetime(t) for t in times])
+    print()
+
+    timed('analytics.parse_battle_times', lambda: parse_battle_times(times))
+    frame = timed('BattleFrame.from_battle_logs', lambda: BattleFrame.from_battle_logs(
+        (tag, log['items']) for tag, log in battle_logs
+    ))
+    timed('BattleFrame.win_rates', frame.win_rates)
+    timed('BattleFrame.usage', frame.usage)
+    timed('BattleFrame.mode_stats', frame.mode_stats)
+    timed('BattleFrame.trophy_deltas', frame.trophy_deltas)
+
+
+if __name__ == '__main__':
+    main()
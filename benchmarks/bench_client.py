@@ -0,0 +1,147 @@
+"""Measures the sync and async clients against the local mock API, without the network or a token.
+
+Reports requests/s, p50/p99 latency and CPU time per request for a mix of every
+endpoint, and the memory each model takes.
+
+Usage: python -m benchmarks.bench_client [--requests 2000] [--concurrency 50] [--latency 0.0]
+                                         [--error 503=0.01] [--items 200] [--port 8765]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import time
+import tracemalloc
+
+import brawlstats
+from brawlstats import models
+
+from .mock_server import FIXTURES, parse_errors, start
+
+TAG_CHARACTERS = '0289PYLQGRJCUV'
+MODELS = [
+    ('Player', models.Player, 'player'), ('BattleLog', models.BattleLog, 'battlelog'),
+    ('Club', models.Club, 'club'), ('Members', models.Members, 'club_members'),
+    ('Ranking', models.Ranking, 'rankings_players'), ('Brawlers', models.Brawlers, 'brawlers'),
+    ('EventRotation', models.EventRotation, 'event_rotation')
+]
+
+
+def make_calls(requests, seed=0):
+    """Makes a mix of ``(method name, kwargs)`` calls over every endpoint."""
+    rng = random.Random(seed)
+    kinds = [
+        ('get_player', 'tag'), ('get_battle_logs', 'tag'), ('get_club', 'tag'), ('get_club_members', 'tag'),
+        ('get_rankings', 'players'), ('get_rankings', 'clubs'), ('get_brawlers', None), ('get_event_rotation', None)
+    ]
+    calls = []
+    for i in range(requests):
+        name, arg = kinds[i % len(kinds)]
+        kwargs = {'use_cache': False}
+        if arg == 'tag':
+            kwargs['tag'] = '#' + ''.join(rng.choice(TAG_CHARACTERS) for _ in range(8))
+        elif arg is not None:
+            kwargs['ranking'] = arg
+        calls.append((name, kwargs))
+    return calls
+
+
+def summarize(label, latencies, errors, elapsed, cpu):
+    latencies.sort()
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    requests = len(latencies)
+    print(
+        f'{label:<6} {requests / elapsed:9.0f} requests/s   p50 {statistics.median(latencies) * 1000:7.2f} ms   '
+        f'p99 {p99 * 1000:7.2f} ms   CPU {cpu / requests * 1e6:7.0f} us/request   errors {errors}'
+    )
+
+
+def run_sync(base_url, calls, concurrency):
+    client = brawlstats.Client('token', base_url=base_url, max_workers=concurrency)
+    latencies = []
+
+    def call(name, kwargs):
+        start = time.perf_counter()
+        try:
+            getattr(client, name)(**kwargs)
+            return None
+        except brawlstats.RequestError as e:
+            return e
+        finally:
+            latencies.append(time.perf_counter() - start)
+
+    try:
+        start, cpu = time.perf_counter(), time.process_time()
+        results = client.map(call, *zip(*calls))
+        elapsed, cpu = time.perf_counter() - start, time.process_time() - cpu
+    finally:
+        client.close()
+    summarize('sync', latencies, sum(r is not None for r in results), elapsed, cpu)
+
+
+async def run_async(base_url, calls, concurrency):
+    latencies = []
+    errors = 0
+    async with brawlstats.Client('token', base_url=base_url, is_async=True) as client:
+        queue = iter(calls)
+
+        async def worker():
+            nonlocal errors
+            for name, kwargs in queue:
+                start = time.perf_counter()
+                try:
+                    await getattr(client, name)(**kwargs)
+                except brawlstats.RequestError:
+                    errors += 1
+                latencies.append(time.perf_counter() - start)
+
+        start, cpu = time.perf_counter(), time.process_time()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed, cpu = time.perf_counter() - start, time.process_time() - cpu
+    summarize('async', latencies, errors, elapsed, cpu)
+
+
+def measure_models(base_url, count=200):
+    """Prints the memory of a model made from each fixture, including the data it was made from."""
+    client = brawlstats.Client('token', base_url=base_url)
+    try:
+        for label, model, fixture in MODELS:
+            with open(os.path.join(FIXTURES, f'{fixture}.json')) as f:
+                text = f.read()
+            tracemalloc.start()
+            before = tracemalloc.get_traced_memory()[0]
+            made = [model(client, json.loads(text)) for _ in range(count)]
+            size = (tracemalloc.get_traced_memory()[0] - before) / count
+            tracemalloc.stop()
+            del made
+            print(f'{label:<14} {size / 1024:9.1f} KiB   ({len(text) / 1024:.1f} KiB of JSON)')
+    finally:
+        client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds the mock API delays every response by')
+    parser.add_argument('--error', action='append', help='STATUS=PROBABILITY, e.g. 503=0.01 (repeatable)')
+    parser.add_argument('--items', type=int, help='the number of items of list responses')
+    parser.add_argument('--port', type=int, default=8765)
+    args = parser.parse_args()
+
+    server, base_url = start(
+        args.port, latency=args.latency, errors=parse_errors(args.error), items=args.items, any_tag=True, seed=0
+    )
+    try:
+        calls = make_calls(args.requests)
+        run_sync(base_url, calls, args.concurrency)
+        asyncio.run(run_async(base_url, calls, args.concurrency))
+        measure_models(base_url)
+    finally:
+        server.terminate()
+
+
+if __name__ == '__main__':
+    main()
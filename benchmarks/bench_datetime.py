@@ -0,0 +1,57 @@
+"""Compares utils.get_datetime with the previous strptime implementation.
+
+Usage: python -m benchmarks.bench_datetime [--count 1000000] [--unique 50000]
+"""
+import argparse
+import random
+import time
+from datetime import datetime
+
+from brawlstats.utils import _parse_timestamp, _unix_timestamp, get_datetime, get_timestamps
+
+
+def strptime_get_datetime(timestamp):
+    """The previous implementation of get_datetime"""
+    return int(datetime.strptime(timestamp, '%Y%m%dT%H%M%S.%fZ').timestamp())
+
+
+def timed(label, func, count):
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    print(f'{label:<40} {elapsed:8.3f} s {elapsed / count * 1e9:10.0f} ns/timestamp')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--count', type=int, default=1_000_000)
+    parser.add_argument('--unique', type=int, default=50_000, help='distinct timestamps among --count')
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    unique = [
+        f'2024{rng.randint(1, 12):02d}{rng.randint(1, 28):02d}T{rng.randrange(24):02d}'
+        f'{rng.randrange(60):02d}{rng.randrange(60):02d}.000Z'
+        for _ in range(args.unique)
+    ]
+    timestamps = [rng.choice(unique) for _ in range(args.count)]
+    print(f'{args.count} timestamps, {len(set(timestamps))} distinct\n')
+
+    timed('strptime (previous get_datetime)', lambda: [strptime_get_datetime(t) for t in timestamps], args.count)
+
+    timed('slicing parser without cache (fields only)', lambda: [_parse_timestamp.__wrapped__(t) for t in timestamps],
+          args.count)
+    _unix_timestamp.cache_clear()
+    timed('get_datetime', lambda: [get_datetime(t) for t in timestamps], args.count)
+    _unix_timestamp.cache_clear()
+    timed('get_timestamps', lambda: get_timestamps(timestamps), args.count)
+
+    try:
+        from brawlstats.analytics import parse_battle_times
+    except ImportError:
+        return
+    timed('analytics.parse_battle_times (NumPy)', lambda: parse_battle_times(timestamps), args.count)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""Compares the async client's throughput on the default asyncio event loop and on uvloop.
+
+Usage: python -m benchmarks.bench_event_loop [--requests 20000] [--concurrency 100]
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import time
+
+from aiohttp import web
+
+import brawlstats
+
+PLAYER = json.dumps({
+    'tag': '#V2LQY9UY', 'name': 'SharpBit', 'trophies': 30000, 'club': {'tag': '#UL0GCC8', 'name': 'Club'},
+    'brawlers': [{'id': 16000000 + i, 'name': f'BRAWLER{i}', 'power': 11, 'trophies': 500} for i in range(60)]
+})
+BRAWLERS = json.dumps({'items': [{'id': 16000000, 'name': 'SHELLY', 'starPowers': [], 'gadgets': []}]})
+
+
+def serve(port):
+    async def player(request):
+        return web.Response(text=PLAYER, content_type='application/json')
+
+    async def brawlers(request):
+        return web.Response(text=BRAWLERS, content_type='application/json')
+
+    app = web.Application()
+    app.router.add_get('/v1/players/{tag}', player)
+    app.router.add_get('/v1/brawlers', brawlers)
+    web.run_app(app, host='127.0.0.1', port=port, print=None)
+
+
+async def run(base_url, requests, concurrency):
+    async with brawlstats.Client('token', base_url=base_url, is_async=True) as client:
+        queue = iter(range(requests))
+
+        async def worker():
+            for _ in queue:
+                await client.get_player('#V2LQY9UY', use_cache=False)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=20000)
+    parser.add_argument('--concurrency', type=int, default=100)
+    parser.add_argument('--port', type=int, default=8765)
+    args = parser.parse_args()
+
+    server = multiprocessing.Process(target=serve, args=(args.port,), daemon=True)
+    server.start()
+    time.sleep(1)
+    base_url = f'http://127.0.0.1:{args.port}/v1'
+
+    loops = [('asyncio', asyncio.new_event_loop)]
+    try:
+        import uvloop
+    except ImportError:
+        print('uvloop is not installed, only the default loop is measured')
+    else:
+        loops.append(('uvloop', uvloop.new_event_loop))
+
+    try:
+        for name, new_event_loop in loops:
+            loop = new_event_loop()
+            try:
+                elapsed = loop.run_until_complete(run(base_url, args.requests, args.concurrency))
+            finally:
+                loop.close()
+            print(f'{name:<10} {args.requests / elapsed:10.0f} requests/s')
+    finally:
+        server.terminate()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""Compares Model.to_bytes/from_bytes with pickle for sending models between processes.
+
+Usage: python -m benchmarks.bench_serialize [--count 200]
+"""
+import argparse
+import pickle
+import time
+
+import brawlstats
+from brawlstats.models import _msgpack
+
+from .mock_server import load_fixtures
+
+MODELS = {
+    'player': brawlstats.Player, 'battlelog': brawlstats.BattleLog, 'club': brawlstats.Club,
+    'rankings_players': brawlstats.Ranking
+}
+
+
+def timed(func, count):
+    start = time.perf_counter()
+    for _ in range(count):
+        func()
+    return count / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--count', type=int, default=200)
+    args = parser.parse_args()
+
+    fixtures = load_fixtures()
+    brawlstats.registry.update(fixtures['brawlers']['items'], save=False)  # so that the client makes no request
+    client = brawlstats.Client('token')
+    codecs = ['json'] + (['msgpack'] if _msgpack() is not None else [])
+
+    # Loaded models build their Box on first use, which the last column includes
+    print(f'{"model":<18} {"method":<22} {"bytes":>8} {"dumps/s":>10} {"loads/s":>10} {"loads+use/s":>12}')
+    for name, model in MODELS.items():
+        instance = model(client, fixtures[name])
+
+        # A model with its client, as the worker processes have them, and without, as they must be sent
+        methods = {'pickle (with client)': (lambda: pickle.dumps(instance), pickle.loads)}
+        detached = model(None, fixtures[name])
+        methods['pickle'] = (lambda: pickle.dumps(detached), pickle.loads)
+        for codec in codecs:
+            methods[f'to_bytes ({codec})'] = (lambda codec=codec: instance.to_bytes(codec), model.from_bytes)
+
+        for method, (dumps, loads) in methods.items():
+            try:
+                data = dumps()
+            except Exception as e:
+                print(f'{name:<18} {method:<22} {type(e).__name__}')
+                continue
+            print(
+                f'{name:<18} {method:<22} {len(data):>8} {timed(dumps, args.count):>10.0f} '
+                f'{timed(lambda: loads(data), args.count):>10.0f} '
+                f'{timed(lambda: loads(data)._boxed_data, args.count):>12.0f}'
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,236 @@
+"""A local stand-in for the Brawl Stars API that serves recorded fixtures for every endpoint.
+
+Usage: python -m benchmarks.mock_server [--port 8000] [--latency 0.05] [--jitter 0.02]
+                                        [--error 503=0.01] [--items 100] [--any-tag] [--compress]
+
+Run the test suite against it with BASE_URL=http://127.0.0.1:8000/v1 and any TOKEN.
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import random
+import socket
+import time
+
+from aiohttp import web
+
+from brawlstats.utils import REGIONS
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+# The bodies the API sends with its errors
+ERRORS = {
+    403: {'reason': 'accessDenied', 'message': 'Invalid authorization'},
+    404: {'reason': 'notFound', 'message': 'Not found'},
+    429: {
+        'reason': 'throttled',
+        'message': 'Request was throttled, because amount of requests was above the threshold defined for the used '
+                   'API token.'
+    },
+    500: {'reason': 'unknownException', 'message': 'An unknown error occurred'},
+    503: {'reason': 'inMaintenance', 'message': 'Server is in maintenance'},
+}
+
+
+def load_fixtures(path=FIXTURES):
+    """Loads every ``<name>.json`` fixture of a directory into a dict by name."""
+    fixtures = {}
+    for filename in os.listdir(path):
+        if filename.endswith('.json'):
+            with open(os.path.join(path, filename)) as f:
+                fixtures[filename[:-5]] = json.load(f)
+    return fixtures
+
+
+def make_app(
+    latency: float=0.0, jitter: float=0.0, errors: dict=None, items: int=None, any_tag: bool=False,
+    fixtures: str=FIXTURES, seed: int=None, compress: bool=False
+) -> web.Application:
+    """Creates the mock API.
+
+    Parameters
+    ----------
+    latency : float, optional
+        The number of seconds every response is delayed by, by default 0
+    jitter : float, optional
+        A random number of seconds between -jitter and +jitter added to the latency, by default 0
+    errors : dict, optional
+        The probability of each status code (403, 404, 429, 500 or 503) being returned instead of the
+        fixture, e.g. ``{503: 0.01}``, by default None
+    items : int, optional
+        Repeat or cut the items of list responses to this many, to change the payload sizes, by default None
+    any_tag : bool, optional
+        Serve the fixtures for every valid tag instead of only the tags that appear in them, by default False
+    fixtures : str, optional
+        The directory of the fixtures, by default the fixtures shipped with the benchmarks
+    seed : int, optional
+        The seed of the latency and error randomness, by default None
+    compress : bool, optional
+        Compress the responses with the best encoding in the request's ``Accept-Encoding``, by default False
+    """
+    data = load_fixtures(fixtures)
+    rng = random.Random(seed)
+    errors = sorted((errors or {}).items())
+
+    if items is not None:
+        for name in ('battlelog', 'club_members', 'rankings_players', 'rankings_clubs', 'rankings_brawlers'):
+            original = data[name]['items']
+            data[name]['items'] = [original[i % len(original)] for i in range(items)]
+        original = data['club']['members']
+        data['club']['members'] = [original[i % len(original)] for i in range(items)]
+
+    # Every tag that appears in the fixtures exists
+    player_tag, club_tag = data['player']['tag'], data['club']['tag']
+    players = {player_tag} | {m['tag'] for m in data['club_members']['items']}
+    players |= {p['tag'] for p in data['rankings_players']['items'] + data['rankings_brawlers']['items']}
+    clubs = {club_tag} | {c['tag'] for c in data['rankings_clubs']['items']}
+    brawler_ids = {b['id'] for b in data['brawlers']['items']}
+
+    # Serialized once, responses for other tags are made by replacing the tag
+    texts = {name: json.dumps(value, separators=(',', ':')) for name, value in data.items()}
+
+    def respond(text, status=200):
+        response = web.Response(text=text, status=status, content_type='application/json')
+        if compress:
+            response.enable_compression()
+        return response
+
+    def error(status):
+        return respond(json.dumps(ERRORS[status]), status)
+
+    def ranking(name, request):
+        limit = int(request.query.get('limit', 200))
+        if not 0 < limit <= 200:
+            return respond(json.dumps({'reason': 'badRequest', 'message': 'Invalid limit'}), 400)
+        if request.match_info['region'] != 'global' and request.match_info['region'].upper() not in REGIONS:
+            return error(404)
+        if limit == len(data[name]['items']):
+            return respond(texts[name])
+        return respond(json.dumps({'items': data[name]['items'][:limit], 'paging': {'cursors': {}}}))
+
+    def tagged(name, tag, known, fixture_tag):
+        if tag not in known and not any_tag:
+            return error(404)
+        return respond(texts[name].replace(f'"{fixture_tag}"', f'"{tag}"'))
+
+    routes = web.RouteTableDef()
+
+    @routes.get('/v1/players/{tag}')
+    async def get_player(request):
+        return tagged('player', request.match_info['tag'], players, player_tag)
+
+    @routes.get('/v1/players/{tag}/battlelog')
+    async def get_battle_logs(request):
+        return tagged('battlelog', request.match_info['tag'], players, player_tag)
+
+    @routes.get('/v1/clubs/{tag}')
+    async def get_club(request):
+        return tagged('club', request.match_info['tag'], clubs, club_tag)
+
+    @routes.get('/v1/clubs/{tag}/members')
+    async def get_club_members(request):
+        return tagged('club_members', request.match_info['tag'], clubs, club_tag)
+
+    @routes.get('/v1/rankings/{region}/players')
+    async def get_player_rankings(request):
+        return ranking('rankings_players', request)
+
+    @routes.get('/v1/rankings/{region}/clubs')
+    async def get_club_rankings(request):
+        return ranking('rankings_clubs', request)
+
+    @routes.get('/v1/rankings/{region}/brawlers/{brawler}')
+    async def get_brawler_rankings(request):
+        if int(request.match_info['brawler']) not in brawler_ids:
+            return error(404)
+        return ranking('rankings_brawlers', request)
+
+    @routes.get('/v1/brawlers')
+    async def get_brawlers(request):
+        return respond(texts['brawlers'])
+
+    @routes.get('/v1/events/rotation')
+    async def get_event_rotation(request):
+        return respond(texts['event_rotation'])
+
+    @web.middleware
+    async def simulate(request, handler):
+        delay = latency + rng.uniform(-jitter, jitter) if jitter else latency
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if not request.headers.get('Authorization', '').startswith('Bearer '):
+            return error(403)
+        roll = rng.random()
+        for status, probability in errors:
+            if roll < probability:
+                return error(status)
+            roll -= probability
+        try:
+            return await handler(request)
+        except web.HTTPNotFound:
+            return error(404)
+
+    app = web.Application(middlewares=[simulate])
+    app.add_routes(routes)
+    return app
+
+
+def serve(port: int=8000, **options):
+    """Runs the mock API until interrupted, see :func:`make_app` for the options."""
+    web.run_app(make_app(**options), host='127.0.0.1', port=port, print=None)
+
+
+def start(port: int=8000, **options):
+    """Runs the mock API in a child process and waits until it accepts connections.
+
+    Returns
+    -------
+    Tuple[multiprocessing.Process, str]
+        The server process, to terminate when done, and the base URL to pass to the client.
+    """
+    process = multiprocessing.Process(target=serve, args=(port,), kwargs=options, daemon=True)
+    process.start()
+    deadline = time.monotonic() + 10
+    while True:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            break
+        except OSError:
+            if time.monotonic() > deadline or not process.is_alive():
+                process.terminate()
+                raise RuntimeError(f'The mock API did not start on port {port}.')
+            time.sleep(0.05)
+    return process, f'http://127.0.0.1:{port}/v1'
+
+
+def parse_errors(values):
+    """Parses ``--error 503=0.01`` arguments."""
+    errors = {}
+    for value in values or ():
+        status, probability = value.split('=')
+        errors[int(status)] = float(probability)
+    return errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds added to every response')
+    parser.add_argument('--jitter', type=float, default=0.0, help='random seconds added to or taken off the latency')
+    parser.add_argument('--error', action='append', help='STATUS=PROBABILITY, e.g. 503=0.01 (repeatable)')
+    parser.add_argument('--items', type=int, help='the number of items of list responses')
+    parser.add_argument('--any-tag', action='store_true', help='serve every valid tag, not only the fixtures\'')
+    parser.add_argument('--compress', action='store_true', help='compress the responses like the API')
+    args = parser.parse_args()
+
+    print(f'Serving the mock API on http://127.0.0.1:{args.port}/v1')
+    serve(
+        args.port, latency=args.latency, jitter=args.jitter, errors=parse_errors(args.error),
+        items=args.items, any_tag=args.any_tag, compress=args.compress
+    )
+
+
+if __name__ == '__main__':
+    main()
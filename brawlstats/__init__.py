@@ -1,6 +1,19 @@
 from .core import Client
 from .models import *
 from .errors import *
+from .brawlers import *
+from .archive import *
+from .polling import *
+from .changes import *
+from .crawler import *
+from .ratelimit import *
+from .circuit import *
+from .encoding import *
+from .hedging import *
+from .multiprocess import *
+from .bridge import *
+from .replay import *
+from .profiling import *
 
 ############
 # METADATA #
@@ -0,0 +1,309 @@
+from typing import Any, Dict, Iterable, Mapping, Tuple, Union
+
+try:
+    import numpy as np
+except ImportError:
+    raise ImportError('NumPy is required for brawlstats.analytics: pip install numpy') from None
+
+from .models import BattleLog
+
+__all__ = ['BattleFrame', 'parse_battle_times']
+
+RESULTS = {'victory': 1, 'draw': 0, 'defeat': -1}
+# The length of a battleTime such as 20200925T184431.000Z
+TIMESTAMP_LENGTH = 20
+# The positions of its separators and digits
+SEPARATORS = {8: 'T', 15: '.', 19: 'Z'}
+DIGITS = [i for i in range(TIMESTAMP_LENGTH) if i not in SEPARATORS]
+
+
+def parse_battle_times(timestamps: Iterable[str]) -> 'np.ndarray':
+    """Converts many %Y%m%dT%H%M%S.%fZ timestamps to UTC POSIX timestamps at once.
+
+    The digits are read straight from the strings' code points, so no string is parsed individually.
+
+    Parameters
+    ----------
+    timestamps : Iterable[str]
+        Timestamps in the format of ``battleTime``, e.g. 20200925T184431.000Z
+
+    Returns
+    -------
+    numpy.ndarray
+        An int64 array of seconds since the epoch.
+
+    Raises
+    ------
+    ValueError
+        A timestamp is not in the expected format.
+    """
+    error = ValueError('Timestamps must be in the %Y%m%dT%H%M%S.%fZ format.')
+    # Converted without a fixed width first so that longer strings are not truncated to a valid length
+    strings = np.asarray(list(timestamps) if not isinstance(timestamps, np.ndarray) else timestamps, dtype=str)
+    if not len(strings):
+        return np.empty(0, dtype=np.int64)
+    if strings.ndim != 1 or (np.char.str_len(strings) != TIMESTAMP_LENGTH).any():
+        raise error
+
+    # A view needs contiguous memory, which a slice of a larger array does not have
+    codes = np.ascontiguousarray(strings.astype('U20')).view(np.uint32).reshape(len(strings), TIMESTAMP_LENGTH)
+    for position, separator in SEPARATORS.items():
+        if (codes[:, position] != ord(separator)).any():
+            raise error
+    digits = codes.astype(np.int64) - ord('0')
+    if ((digits[:, DIGITS] < 0) | (digits[:, DIGITS] > 9)).any():
+        raise error
+
+    def number(start, length):
+        value = digits[:, start]
+        for i in range(start + 1, start + length):
+            value = value * 10 + digits[:, i]
+        return value
+
+    year, month, day = number(0, 4), number(4, 2), number(6, 2)
+    hour, minute, second = number(9, 2), number(11, 2), number(13, 2)
+    if ((month < 1) | (month > 12) | (day < 1) | (hour > 23) | (minute > 59) | (second > 59)).any():
+        raise error
+    months = (year - 1970).astype('datetime64[Y]') + (month - 1).astype('timedelta64[M]')
+    days = months.astype('datetime64[D]') + (day - 1).astype('timedelta64[D]')
+    if (days.astype('datetime64[M]') != months).any():
+        raise error  # past the end of the month
+    return days.astype(np.int64) * 86400 + hour * 3600 + minute * 60 + second
+
+
+class BattleFrame:
+    """The battles of many battle logs as NumPy columns, one row per battle.
+
+    Every row describes a battle from the perspective of the battle log's
+    player, so ``brawler_id`` and ``brawler_name`` are the brawler they played.
+    ``result`` is 1 for a victory, 0 for a draw and -1 for a defeat. Showdown
+    battles have no result, so finishing in the top half counts as a victory.
+
+    Parameters
+    ----------
+    columns : Dict[str, numpy.ndarray]
+        The columns, see :meth:`from_battle_logs` for how to create them.
+    """
+
+    COLUMNS = (
+        'tag', 'battle_time', 'mode', 'map', 'type', 'result', 'rank',
+        'trophy_change', 'duration', 'brawler_id', 'brawler_name', 'is_star_player'
+    )
+
+    def __init__(self, columns: Dict[str, 'np.ndarray']):
+        self.columns = columns
+
+    def __repr__(self):
+        return f'<BattleFrame count={len(self)}>'
+
+    def __len__(self):
+        return len(self.columns['tag'])
+
+    def __getitem__(self, column) -> 'np.ndarray':
+        return self.columns[column]
+
+    @classmethod
+    def from_battle_logs(
+        cls, battle_logs: Union[Mapping[str, BattleLog], Iterable[Tuple[str, BattleLog]]]
+    ) -> 'BattleFrame':
+        """Builds a frame from battle logs and the tags of the players they belong to.
+
+        Parameters
+        ----------
+        battle_logs : Union[Mapping[str, BattleLog], Iterable[Tuple[str, BattleLog]]]
+            The battle logs by player tag. Raw ``items`` lists are accepted in place of :class:`BattleLog`
+
+        Returns
+        -------
+        BattleFrame
+            A frame with a row for every battle the player was found in.
+        """
+        rows = {name: [] for name in cls.COLUMNS}
+        items = battle_logs.items() if isinstance(battle_logs, Mapping) else battle_logs
+        for tag, battle_log in items:
+            tag = '#' + tag.strip('#').upper()
+            for item in getattr(battle_log, 'raw_data', battle_log):
+                cls._add_battle(rows, tag, item)
+        return cls._from_rows(rows)
+
+    @classmethod
+    def from_columns(cls, columns: Dict[str, list], tag: str) -> 'BattleFrame':
+        """Builds a frame from the columnar export of one player's battle log.
+
+        Parameters
+        ----------
+        columns : Dict[str, list]
+            The result of :meth:`BattleLog.to_columns`
+        tag : str
+            The tag of the player the battle log belongs to.
+        """
+        tag = '#' + tag.strip('#').upper()
+        count = len(columns.get('team', ()))
+
+        def column(name):
+            return columns.get(name) or [None] * count
+
+        # Showdown ranks are out of the number of teams (or players) in the battle
+        entries = {}
+        for battle_time, team in zip(column('battle_time'), column('team')):
+            entries[battle_time] = max(entries.get(battle_time, 0), team + 1)
+
+        rows = {name: [] for name in cls.COLUMNS}
+        for (
+            battle_time, battle_mode, event_mode, event_map, battle_type, result, rank, trophy_change,
+            duration, player_tag, brawler_id, brawler_name, is_star_player
+        ) in zip(*map(column, (
+            'battle_time', 'battle.mode', 'event.mode', 'event.map', 'battle.type', 'battle.result', 'battle.rank',
+            'battle.trophy_change', 'battle.duration', 'player.tag', 'player.brawler.id', 'player.brawler.name',
+            'is_star_player'
+        ))):
+            if player_tag != tag:
+                continue
+            rows['tag'].append(tag)
+            rows['battle_time'].append(battle_time)
+            rows['mode'].append(battle_mode or event_mode)
+            rows['map'].append(event_map)
+            rows['type'].append(battle_type)
+            rows['result'].append(_result(result, rank, entries[battle_time]))
+            rows['rank'].append(rank)
+            rows['trophy_change'].append(trophy_change)
+            rows['duration'].append(duration)
+            rows['brawler_id'].append(brawler_id)
+            rows['brawler_name'].append(brawler_name)
+            rows['is_star_player'].append(is_star_player)
+        return cls._from_rows(rows)
+
+    @staticmethod
+    def _add_battle(rows, tag, item):
+        battle = item.get('battle', {})
+        event = item.get('event', {})
+        if 'teams' in battle:
+            players = [p for team in battle['teams'] for p in team]
+            entries = len(battle['teams'])
+        else:
+            players = battle.get('players', [])
+            entries = len(players)
+
+        player = next((p for p in players if p.get('tag') == tag), None)
+        if player is None:
+            return
+        brawler = player.get('brawler', {})
+
+        rows['tag'].append(tag)
+        rows['battle_time'].append(item['battleTime'])
+        rows['mode'].append(battle.get('mode') or event.get('mode'))
+        rows['map'].append(event.get('map'))
+        rows['type'].append(battle.get('type'))
+        rows['result'].append(_result(battle.get('result'), battle.get('rank'), entries))
+        rows['rank'].append(battle.get('rank'))
+        rows['trophy_change'].append(battle.get('trophyChange'))
+        rows['duration'].append(battle.get('duration'))
+        rows['brawler_id'].append(brawler.get('id'))
+        rows['brawler_name'].append(brawler.get('name'))
+        rows['is_star_player'].append((battle.get('starPlayer') or {}).get('tag') == tag)
+
+    @classmethod
+    def _from_rows(cls, rows):
+        columns = {
+            'tag': np.array(rows['tag'], dtype=str),
+            'battle_time': parse_battle_times(rows['battle_time']),
+            'result': np.array(rows['result'], dtype=np.int8),
+            'is_star_player': np.array(rows['is_star_player'], dtype=bool),
+        }
+        for name in ('mode', 'map', 'type', 'brawler_name'):
+            columns[name] = np.array([v or '' for v in rows[name]], dtype=str)
+        # Missing numbers are 0, or -1 for ids and ranks
+        for name, missing in (('trophy_change', 0), ('duration', 0), ('rank', -1), ('brawler_id', -1)):
+            columns[name] = np.array([missing if v is None else v for v in rows[name]], dtype=np.int64)
+        return cls(columns)
+
+    def _group(self, by):
+        """Gets the unique keys of the ``by`` columns and the group index of every row."""
+        if isinstance(by, str):
+            keys, inverse = np.unique(self.columns[by], return_inverse=True)
+            return keys.tolist(), inverse.ravel()
+
+        combined = np.rec.fromarrays([self.columns[name] for name in by])
+        keys, inverse = np.unique(combined, return_inverse=True)
+        return [tuple(k) for k in keys.tolist()], inverse.ravel()
+
+    def aggregate(self, by: Union[str, Tuple[str, ...]]='brawler_name') -> Dict[Any, dict]:
+        """Aggregates the battles by one or more columns.
+
+        Parameters
+        ----------
+        by : Union[str, Tuple[str, ...]], optional
+            The column or columns to group by, by default ``'brawler_name'``
+
+        Returns
+        -------
+        Dict[Any, dict]
+            For every group key (a tuple when grouping by several columns): ``battles``, ``wins``,
+            ``draws``, ``losses``, ``win_rate``, ``star_player_rate``, ``trophy_change`` (the sum)
+            and ``average_trophy_change``
+        """
+        if not len(self):
+            return {}
+        keys, groups = self._group(by)
+        size = len(keys)
+        result = self.columns['result']
+
+        battles = np.bincount(groups, minlength=size)
+        wins = np.bincount(groups, weights=result == 1, minlength=size)
+        draws = np.bincount(groups, weights=result == 0, minlength=size)
+        star_player = np.bincount(groups, weights=self.columns['is_star_player'], minlength=size)
+        trophy_change = np.bincount(groups, weights=self.columns['trophy_change'], minlength=size)
+
+        # Draws do not count towards the win rate
+        decided = battles - draws
+        win_rate = np.divide(wins, decided, out=np.zeros(size), where=decided > 0)
+
+        return {
+            key: {
+                'battles': int(battles[i]), 'wins': int(wins[i]), 'draws': int(draws[i]),
+                'losses': int(decided[i] - wins[i]), 'win_rate': float(win_rate[i]),
+                'star_player_rate': float(star_player[i] / battles[i]),
+                'trophy_change': int(trophy_change[i]), 'average_trophy_change': float(trophy_change[i] / battles[i])
+            }
+            for i, key in enumerate(keys)
+        }
+
+    def win_rates(self, by: Union[str, Tuple[str, ...]]='brawler_name') -> Dict[Any, float]:
+        """Gets the win rate of every group, see :meth:`aggregate`."""
+        return {key: stats['win_rate'] for key, stats in self.aggregate(by).items()}
+
+    def usage(self, by: Union[str, Tuple[str, ...]]='brawler_name') -> Dict[Any, float]:
+        """Gets the share of battles played by every group, e.g. the pick rate of every brawler."""
+        if not len(self):
+            return {}
+        keys, groups = self._group(by)
+        counts = np.bincount(groups, minlength=len(keys)) / len(self)
+        return dict(zip(keys, counts.tolist()))
+
+    def mode_stats(self) -> Dict[Any, dict]:
+        """Aggregates the battles by mode and map, see :meth:`aggregate`."""
+        return self.aggregate(('mode', 'map'))
+
+    def trophy_deltas(self, since: int=None) -> Dict[str, int]:
+        """Gets every player's total trophy change.
+
+        Parameters
+        ----------
+        since : int, optional
+            Only count battles at or after this POSIX timestamp, by default None
+        """
+        tags, groups = np.unique(self.columns['tag'], return_inverse=True)
+        weights = self.columns['trophy_change']
+        if since is not None:
+            weights = np.where(self.columns['battle_time'] >= since, weights, 0)
+        deltas = np.bincount(groups.ravel(), weights=weights, minlength=len(tags))
+        return dict(zip(tags.tolist(), deltas.astype(np.int64).tolist()))
+
+
+def _result(result, rank, entries):
+    if result is not None:
+        return RESULTS.get(result, 0)
+    if rank is not None:
+        # Showdown: finishing in the top half of the teams (or players) is a victory
+        return 1 if rank <= max(1, entries // 2) else -1
+    return 0
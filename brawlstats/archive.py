@@ -0,0 +1,257 @@
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+from typing import Iterator, NamedTuple, Optional
+
+__all__ = ['ArchiveRecord', 'ResponseArchive', 'ArchiveReader']
+
+# timestamp, endpoint length, tag length, body length
+RECORD_HEADER = struct.Struct('<dHHI')
+# offset in the segment, timestamp, crc32 of the endpoint and tag
+INDEX_ENTRY = struct.Struct('<QdI')
+
+SEGMENT_SUFFIX = '.seg'
+INDEX_SUFFIX = '.idx'
+
+
+def _normalize_tag(tag):
+    if not tag:
+        return ''
+    return '#' + tag.strip('#').upper()
+
+
+def _key_hash(endpoint, tag):
+    return zlib.crc32(f'{endpoint}\x00{tag}'.encode('utf-8'))
+
+
+class ArchiveRecord(NamedTuple):
+    """A single archived API response."""
+
+    endpoint: str
+    tag: str
+    timestamp: float
+    body: bytes
+
+    @property
+    def data(self):
+        """The decoded JSON body of the response."""
+        return json.loads(self.body)
+
+
+class ResponseArchive:
+    """An append-only, segmented on-disk archive of raw API responses.
+
+    Every record is appended to the newest segment file together with an
+    entry in the segment's index file. Once a segment grows past
+    ``segment_size`` bytes a new segment is started; existing segments are
+    never rewritten. Use :class:`ArchiveReader` to read the archive back.
+
+    Parameters
+    ----------
+    path : str
+        The directory to store the segments in. It is created if it does not exist.
+    segment_size : int, optional
+        The size in bytes after which a new segment is started, by default 64 MiB
+    """
+
+    def __init__(self, path, segment_size=64 * 1024 * 1024):
+        self.path = path
+        self.segment_size = segment_size
+        self._lock = threading.Lock()
+        os.makedirs(path, exist_ok=True)
+
+        segments = _list_segments(path)
+        self._segment_id = segments[-1] if segments else 0
+        self._open_segment()
+
+    def __repr__(self):
+        return f"<ResponseArchive path='{self.path}' segment={self._segment_id}>"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _open_segment(self):
+        base = os.path.join(self.path, f'{self._segment_id:08d}')
+        self._segment = open(base + SEGMENT_SUFFIX, 'ab')
+        self._index = open(base + INDEX_SUFFIX, 'ab')
+
+    def _rotate(self):
+        self._segment.close()
+        self._index.close()
+        self._segment_id += 1
+        self._open_segment()
+
+    def append(self, endpoint: str, tag: Optional[str], body, timestamp: float=None):
+        """Appends a response to the archive.
+
+        Parameters
+        ----------
+        endpoint : str
+            The endpoint the response was returned from, e.g. ``players/{tag}/battlelog``
+        tag : Optional[str]
+            The player or club tag of the request, if any.
+        body : Union[str, bytes]
+            The raw response body.
+        timestamp : float, optional
+            The POSIX timestamp of the response, by default the current time
+        """
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        tag = _normalize_tag(tag)
+        if timestamp is None:
+            timestamp = time.time()
+
+        endpoint_bytes = endpoint.encode('utf-8')
+        tag_bytes = tag.encode('utf-8')
+        header = RECORD_HEADER.pack(timestamp, len(endpoint_bytes), len(tag_bytes), len(body))
+
+        with self._lock:
+            if self._segment.tell() >= self.segment_size:
+                self._rotate()
+            offset = self._segment.tell()
+            self._segment.write(header + endpoint_bytes + tag_bytes + body)
+            self._segment.flush()
+            self._index.write(INDEX_ENTRY.pack(offset, timestamp, _key_hash(endpoint, tag)))
+            self._index.flush()
+
+    def close(self):
+        with self._lock:
+            self._segment.close()
+            self._index.close()
+
+
+class ArchiveReader:
+    """Reads a :class:`ResponseArchive` by memory-mapping its segments.
+
+    Records are only copied out of the mapped segments when they are yielded,
+    so the archive can be scanned or searched without loading it into memory.
+
+    Parameters
+    ----------
+    path : str
+        The directory the archive was written to.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._maps = {}
+
+    def __repr__(self):
+        return f"<ArchiveReader path='{self.path}'>"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _map(self, segment_id, suffix):
+        """Maps a segment or index file, remapping it if it has grown since."""
+        filename = os.path.join(self.path, f'{segment_id:08d}{suffix}')
+        size = os.path.getsize(filename)
+        cached = self._maps.get(filename)
+        if cached is not None and len(cached) == size:
+            return cached
+        # The old mapping is not closed: unfinished scans still read it, and it is unmapped once they are done
+        if size == 0:
+            return None
+
+        with open(filename, 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._maps[filename] = mapped
+        return mapped
+
+    @staticmethod
+    def _read_record(segment, offset):
+        timestamp, endpoint_len, tag_len, body_len = RECORD_HEADER.unpack_from(segment, offset)
+        start = offset + RECORD_HEADER.size
+        endpoint = segment[start:start + endpoint_len].decode('utf-8')
+        start += endpoint_len
+        tag = segment[start:start + tag_len].decode('utf-8')
+        start += tag_len
+        return ArchiveRecord(endpoint, tag, timestamp, segment[start:start + body_len])
+
+    def _entries(self, segment_id):
+        index = self._map(segment_id, INDEX_SUFFIX)
+        if index is None:
+            return
+        # Ignore a partially written trailing entry
+        end = len(index) - len(index) % INDEX_ENTRY.size
+        yield from INDEX_ENTRY.iter_unpack(memoryview(index)[:end])
+
+    def scan(self, endpoint: str=None, tag: str=None, since: float=None) -> Iterator[ArchiveRecord]:
+        """Iterates over the archived records in the order they were written.
+
+        Parameters
+        ----------
+        endpoint : str, optional
+            Only yield records of this endpoint, by default None
+        tag : str, optional
+            Only yield records of this tag, requires ``endpoint``: by default None
+        since : float, optional
+            Only yield records archived at or after this POSIX timestamp, by default None
+
+        Yields
+        ------
+        ArchiveRecord
+            The matching records.
+        """
+        key_hash = _key_hash(endpoint, _normalize_tag(tag)) if endpoint is not None and tag is not None else None
+        for segment_id in _list_segments(self.path):
+            segment = None
+            for offset, timestamp, entry_hash in self._entries(segment_id):
+                if key_hash is not None and entry_hash != key_hash:
+                    continue
+                if since is not None and timestamp < since:
+                    continue
+                if segment is None:
+                    segment = self._map(segment_id, SEGMENT_SUFFIX)
+                record = self._read_record(segment, offset)
+                if endpoint is not None and record.endpoint != endpoint:
+                    continue
+                if tag is not None and record.tag != _normalize_tag(tag):
+                    continue
+                yield record
+
+    def history(self, endpoint: str, tag: str=None) -> Iterator[ArchiveRecord]:
+        """Iterates over every archived response of an endpoint and tag, oldest first."""
+        return self.scan(endpoint=endpoint, tag=tag or '')
+
+    def latest(self, endpoint: str, tag: str=None) -> Optional[ArchiveRecord]:
+        """Gets the most recently archived response of an endpoint and tag.
+
+        Returns
+        -------
+        Optional[ArchiveRecord]
+            The record, or None if nothing has been archived for the endpoint and tag.
+        """
+        key_hash = _key_hash(endpoint, _normalize_tag(tag))
+        for segment_id in reversed(_list_segments(self.path)):
+            entries = [entry for entry in self._entries(segment_id) if entry[2] == key_hash]
+            for offset, _, _ in reversed(entries):
+                record = self._read_record(self._map(segment_id, SEGMENT_SUFFIX), offset)
+                if record.endpoint == endpoint and record.tag == _normalize_tag(tag):
+                    return record
+        return None
+
+    def close(self):
+        for mapped in self._maps.values():
+            try:
+                mapped.close()
+            except BufferError:
+                pass  # Still read by an unfinished scan, unmapped once it is garbage collected
+        self._maps.clear()
+
+
+def _list_segments(path):
+    return sorted(
+        int(filename[:-len(SEGMENT_SUFFIX)]) for filename in os.listdir(path)
+        if filename.endswith(SEGMENT_SUFFIX)
+    )
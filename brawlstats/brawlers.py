@@ -0,0 +1,172 @@
+import json
+import os
+import threading
+import time
+from typing import Dict, Iterator, Optional, Tuple, Union
+
+from box import Box
+
+__all__ = ['BrawlerRegistry', 'registry']
+
+SNAPSHOT_VERSION = 1
+
+
+class BrawlerRegistry:
+    """The brawlers of the game with O(1) lookups by name and ID, shared by every client of the process.
+
+    The first client to need the brawlers fetches them, or loads them from the
+    snapshot file at ``path`` if there is one, and the others reuse them.
+    Once they are older than ``ttl`` seconds, clients refresh them in the background.
+
+    Parameters
+    ----------
+    path : str, optional
+        The JSON file the brawlers are saved to after every fetch and loaded from at startup, by default None
+    ttl : float, optional
+        The number of seconds after which the brawlers are refreshed, by default a day
+    """
+
+    def __init__(self, path: str=None, ttl: float=24 * 60 * 60):
+        self.path = path
+        self.ttl = ttl
+        self.updated_at = None
+        self._lock = threading.Lock()
+        self._refresh_started = None
+        self._set([])
+
+    def __repr__(self):
+        return f'<BrawlerRegistry brawlers={len(self)} stale={self.stale}>'
+
+    def __len__(self):
+        return len(self._by_id)
+
+    def __iter__(self) -> Iterator[Box]:
+        return (Box(item, camel_killer_box=True) for item in self._items)
+
+    def __contains__(self, brawler):
+        return self.get_id(brawler) is not None
+
+    def _set(self, items):
+        by_id, ids = {}, {}
+        star_powers, gadgets = {}, {}
+        for item in items:
+            brawler_id = int(item['id'])
+            by_id[brawler_id] = item
+            ids[item['name'].lower()] = brawler_id
+            for star_power in item.get('starPowers') or ():
+                star_powers[star_power['id']] = (brawler_id, star_power)
+            for gadget in item.get('gadgets') or ():
+                gadgets[gadget['id']] = (brawler_id, gadget)
+        # Swapped in at once so that lookups from other threads never see a partial registry
+        self._items, self._by_id, self._ids = list(items), by_id, ids
+        self._star_powers, self._gadgets = star_powers, gadgets
+
+    @property
+    def ids(self) -> Dict[str, int]:
+        """The brawler IDs by lowercase name."""
+        return self._ids
+
+    @property
+    def stale(self) -> bool:
+        """Whether the brawlers are missing or older than ``ttl``."""
+        return self.updated_at is None or time.time() - self.updated_at > self.ttl
+
+    def update(self, brawlers, updated_at: float=None, save: bool=True):
+        """Replaces the brawlers.
+
+        Parameters
+        ----------
+        brawlers : Union[Brawlers, List[dict]]
+            The brawlers returned by :meth:`Client.get_brawlers`, or their raw data
+        updated_at : float, optional
+            The POSIX timestamp the brawlers were fetched at, by default now
+        save : bool, optional
+            Whether to save them to ``path``, if it is set, by default True
+        """
+        items = getattr(brawlers, 'raw_data', brawlers)
+        with self._lock:
+            self._set(items)
+            self.updated_at = time.time() if updated_at is None else updated_at
+            self._refresh_started = None
+        if save and self.path is not None:
+            self.save()
+
+    def get_id(self, brawler: Union[str, int]) -> Optional[int]:
+        """Gets the ID of a brawler from its name, in any case, or ID, or None if there is no such brawler."""
+        if isinstance(brawler, str):
+            brawler_id = self._ids.get(brawler.lower())
+            if brawler_id is not None or not brawler.isdigit():
+                return brawler_id
+            brawler = int(brawler)
+        return brawler if brawler in self._by_id else None
+
+    def get(self, brawler: Union[str, int]) -> Optional[Box]:
+        """Gets a brawler by name or ID, or None if there is no such brawler."""
+        brawler_id = self.get_id(brawler)
+        if brawler_id is None:
+            return None
+        return Box(self._by_id[brawler_id], camel_killer_box=True)
+
+    def name(self, brawler_id: int) -> Optional[str]:
+        """Gets the name of a brawler from its ID."""
+        item = self._by_id.get(brawler_id)
+        return None if item is None else item['name']
+
+    def star_power(self, star_power_id: int) -> Optional[Tuple[Box, Box]]:
+        """Gets the brawler and the star power of a star power ID, e.g. from a player's brawlers."""
+        return self._accessory(self._star_powers, star_power_id)
+
+    def gadget(self, gadget_id: int) -> Optional[Tuple[Box, Box]]:
+        """Gets the brawler and the gadget of a gadget ID."""
+        return self._accessory(self._gadgets, gadget_id)
+
+    def _accessory(self, index, accessory_id):
+        found = index.get(accessory_id)
+        if found is None:
+            return None
+        brawler_id, accessory = found
+        return Box(self._by_id[brawler_id], camel_killer_box=True), Box(accessory, camel_killer_box=True)
+
+    def claim_refresh(self, timeout: float=60) -> bool:
+        """Returns True if the caller should refresh the stale brawlers, so that only one client does at a time."""
+        with self._lock:
+            now = time.monotonic()
+            if not self.stale or (self._refresh_started is not None and now - self._refresh_started < timeout):
+                return False
+            self._refresh_started = now
+            return True
+
+    def save(self, path: str=None):
+        """Saves the brawlers to a JSON snapshot, by default at ``path``."""
+        path = path or self.path
+        with self._lock:
+            snapshot = {'version': SNAPSHOT_VERSION, 'updated_at': self.updated_at, 'items': self._items}
+        # Written next to the file and renamed, so that readers never see half a snapshot
+        temp = f'{path}.{os.getpid()}.tmp'
+        with open(temp, 'w') as f:
+            json.dump(snapshot, f)
+        os.replace(temp, path)
+
+    def load(self, path: str=None) -> bool:
+        """Loads the brawlers from a JSON snapshot, by default at ``path``.
+
+        Returns
+        -------
+        bool
+            Whether a valid snapshot was loaded.
+        """
+        path = path or self.path
+        if path is None:
+            return False
+        try:
+            with open(path) as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if snapshot.get('version') != SNAPSHOT_VERSION:
+            return False
+        self.update(snapshot['items'], updated_at=snapshot['updated_at'], save=False)
+        return True
+
+
+registry = BrawlerRegistry()
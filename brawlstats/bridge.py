@@ -0,0 +1,216 @@
+import asyncio
+import functools
+import threading
+from typing import Any, Callable, Iterable, List, Union
+
+from .core import Client
+from .models import BaseBox, Club, Player
+
+__all__ = ['BatchClient']
+
+# The client methods that BatchClient runs on its event loop and blocks on
+METHODS = (
+    'get_player', 'get_profile', 'get_battle_logs', 'get_club', 'get_club_members',
+    'get_rankings', 'get_rankings_all_regions', 'get_brawlers', 'get_event_rotation'
+)
+
+
+class BatchClient:
+    """A sync client that runs an async :class:`Client` on an event loop in a background thread.
+
+    Its methods block like those of the sync client and return the same models,
+    but bulk calls such as :meth:`get_players` make their requests concurrently
+    on the event loop instead of one at a time, so scripts and task queue workers
+    get the concurrency of aiohttp without writing async code.
+    It can be used from several threads at once.
+
+    .. code:: py
+
+        with brawlstats.BatchClient('token', concurrency=100, rate_limit=30) as client:
+            players = client.get_players(tags)  # 1,000 tags, fetched concurrently
+            club = players[0].get_club()
+
+    Parameters
+    ----------
+    token : str
+        The API Key that you can get from https://developer.brawlstars.com
+    concurrency : int, optional
+        The maximum number of requests in flight during a bulk call, by default 64
+    **options
+        Any other option of :class:`Client`, e.g. ``rate_limit``, ``timeout`` or ``base_url``
+    """
+
+    def __init__(self, token: str, concurrency: int=64, **options):
+        options.pop('is_async', None)
+        self.concurrency = concurrency
+        self.is_async = False  # for the models, whose methods call the client back
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run_loop, name='brawlstats-loop', daemon=True)
+        self._thread.start()
+        try:
+            self.client = self._call(self._create(token, options))
+        except BaseException:
+            self._stop()
+            raise
+        self.api = self.client.api
+
+    def __repr__(self):
+        return f'<BatchClient concurrency={self.concurrency} timeout={self.client.timeout}>'
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_forever()
+
+    async def _create(self, token, options):
+        # Created on the loop so that its session and background tasks belong to it
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        return Client(token, is_async=True, **options)
+
+    def _call(self, coro):
+        """Runs a coroutine on the event loop and waits for its result."""
+        if threading.current_thread() is self._thread:
+            coro.close()
+            raise RuntimeError('BatchClient methods can not be called from its own event loop.')
+        if self._loop.is_closed():
+            coro.close()
+            raise RuntimeError('The BatchClient is closed.')
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    def _stop(self):
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+    def close(self):
+        """Closes the async client, once its requests in flight are done, and stops the event loop."""
+        if self._loop.is_closed():
+            return
+        try:
+            self._call(self.client.close())
+        finally:
+            self._stop()
+
+    def _bind(self, result):
+        # The models call their client back, e.g. Player.get_club, so they are given this client to block on
+        if isinstance(result, BaseBox):
+            result.client = self
+        elif isinstance(result, list):
+            for item in result:
+                self._bind(item)
+        elif isinstance(result, dict):
+            for item in result.values():
+                self._bind(item)
+        return result
+
+    def _get_model(self, url, model, **kwargs):
+        async def run():
+            return await self.client._get_model(url, model=model, **kwargs)
+        return self._bind(self._call(run()))
+
+    def map(
+        self, func: Union[str, Callable], *iterables: Iterable, return_exceptions: bool=False
+    ) -> List[Any]:
+        """Calls a client method for every item of the iterables concurrently and waits for all the results.
+
+        At most ``concurrency`` calls are in flight at once. The results are in the same order as the items.
+
+        .. code:: py
+
+            clubs = client.map('get_club', tags)
+            members = client.map(client.get_club_members, tags, return_exceptions=True)
+
+        Parameters
+        ----------
+        func : Union[str, Callable]
+            The name of a client method, e.g. ``'get_player'``, the method itself, e.g. ``client.get_player``,
+            or an ``async def func(client, *args)`` called with the async client
+        *iterables : Iterable
+            The arguments of every call, like the builtin ``map``
+        return_exceptions : bool, optional
+            Whether to put raised exceptions in the results instead of raising the first one, by default False
+
+        Returns
+        -------
+        List[Any]
+            The return values of the calls.
+        """
+        if not isinstance(func, str) and getattr(func, '__self__', None) is self:
+            func = func.__name__
+        if isinstance(func, str):
+            if func not in METHODS:
+                raise ValueError(f'{func!r} is not a method of the client.')
+            func = functools.partial(_call_method, func)
+
+        async def call(args):
+            async with self._semaphore:
+                return await func(self.client, *args)
+
+        # Materialized here so that the iterables are consumed by the calling thread
+        calls = list(zip(*iterables))
+
+        async def run():
+            return await asyncio.gather(*(call(args) for args in calls), return_exceptions=return_exceptions)
+
+        return self._bind(self._call(run()))
+
+    def get_players(self, tags: Iterable[str], return_exceptions: bool=False) -> List[Player]:
+        """Gets the stats of many players concurrently.
+
+        Parameters
+        ----------
+        tags : Iterable[str]
+            The player tags
+        return_exceptions : bool, optional
+            Whether to put raised exceptions, e.g. :class:`NotFoundError`, in the results
+            instead of raising the first one, by default False
+
+        Returns
+        -------
+        List[Player]
+            The players, in the same order as the tags.
+        """
+        return self.map('get_player', tags, return_exceptions=return_exceptions)
+
+    def get_clubs(self, tags: Iterable[str], return_exceptions: bool=False) -> List[Club]:
+        """Gets the stats of many clubs concurrently.
+
+        Parameters
+        ----------
+        tags : Iterable[str]
+            The club tags
+        return_exceptions : bool, optional
+            Whether to put raised exceptions in the results instead of raising the first one, by default False
+
+        Returns
+        -------
+        List[Club]
+            The clubs, in the same order as the tags.
+        """
+        return self.map('get_club', tags, return_exceptions=return_exceptions)
+
+
+async def _call_method(name, client, *args):
+    return await getattr(client, name)(*args)
+
+
+def _blocking(name):
+    method = getattr(Client, name)
+
+    @functools.wraps(method)
+    def call(self, *args, **kwargs):
+        async def run():
+            # The coroutine is created on the loop, as the async client expects
+            return await getattr(self.client, name)(*args, **kwargs)
+        return self._bind(self._call(run()))
+
+    return call
+
+
+for _name in METHODS:
+    setattr(BatchClient, _name, _blocking(_name))
@@ -0,0 +1,214 @@
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple, Union
+
+from box import Box
+
+from .models import BaseBox
+
+__all__ = ['ListDelta', 'ObjectDelta', 'ChangeTracker', 'diff_lists', 'diff_objects']
+
+
+class ListDelta(NamedTuple):
+    """The changes between two snapshots of a list of entries, such as :class:`Members` or a :class:`Ranking`.
+
+    Attributes
+    ----------
+    added : List[Box]
+        The entries that are new, e.g. members who joined
+    removed : List[Box]
+        The entries that are gone, e.g. members who left
+    changed : Dict[str, Dict[str, Tuple[Any, Any]]]
+        The fields of the other entries that changed as ``{tag: {field: (old, new)}}``, with the API's field names
+    moved : Dict[str, Tuple[int, int]]
+        The entries whose rank changed as ``{tag: (old rank, new rank)}``
+    """
+
+    added: List[Box]
+    removed: List[Box]
+    changed: Dict[str, Dict[str, Tuple[Any, Any]]]
+    moved: Dict[str, Tuple[int, int]]
+
+    def __bool__(self):
+        return bool(self.added or self.removed or self.changed or self.moved)
+
+
+class ObjectDelta(NamedTuple):
+    """The changes between two snapshots of an object, such as a :class:`Club` or :class:`Player`.
+
+    Attributes
+    ----------
+    changed : Dict[str, Tuple[Any, Any]]
+        The fields that changed as ``{field: (old, new)}``, with the API's field names
+    lists : Dict[str, ListDelta]
+        The changes of the lists of entries in the object, e.g. ``{'members': ListDelta(...)}``
+    """
+
+    changed: Dict[str, Tuple[Any, Any]]
+    lists: Dict[str, ListDelta]
+
+    def __bool__(self):
+        return bool(self.changed or self.lists)
+
+
+def _raw(snapshot):
+    return snapshot.raw_data if isinstance(snapshot, BaseBox) else snapshot
+
+
+def _is_entry_list(value, key):
+    return isinstance(value, list) and (not value or isinstance(value[0], dict) and key in value[0])
+
+
+def _changed_fields(old, new, exclude=None):
+    changed = {}
+    for field, value in new.items():
+        previous = old.get(field)
+        if previous != value and field != exclude:
+            changed[field] = (previous, value)
+    for field in old.keys() - new.keys():
+        if field != exclude:
+            changed[field] = (old[field], None)
+    return changed
+
+
+def diff_lists(old, new, key: str='tag', rank: str='rank') -> ListDelta:
+    """Compares two snapshots of a list of entries by their ``key``.
+
+    Entries are matched through a dict of each snapshot, so this takes linear
+    time, and only the entries that are not equal are compared field by field.
+
+    Parameters
+    ----------
+    old : Union[BaseBoxList, List[dict]]
+        The previous snapshot, a list model or its raw data
+    new : Union[BaseBoxList, List[dict]]
+        The current snapshot
+    key : str, optional
+        The field identifying an entry, by default ``'tag'``
+    rank : str, optional
+        The field whose changes are reported in ``moved`` instead of ``changed``, by default ``'rank'``
+
+    Returns
+    -------
+    ListDelta
+        The added, removed, changed and moved entries.
+    """
+    old = {entry[key]: entry for entry in _raw(old)}
+    new_entries = _raw(new)
+    new = {entry[key]: entry for entry in new_entries}
+
+    added = [Box(entry, camel_killer_box=True) for entry in new_entries if entry[key] not in old]
+    removed = [Box(entry, camel_killer_box=True) for tag, entry in old.items() if tag not in new]
+    changed = {}
+    moved = {}
+    for tag, entry in new.items():
+        previous = old.get(tag)
+        if previous is None or previous == entry:
+            continue
+        if previous.get(rank) != entry.get(rank):
+            moved[tag] = (previous.get(rank), entry.get(rank))
+        fields = _changed_fields(previous, entry, exclude=rank)
+        if fields:
+            changed[tag] = fields
+    return ListDelta(added, removed, changed, moved)
+
+
+def diff_objects(old, new, key: str='tag') -> ObjectDelta:
+    """Compares two snapshots of an object field by field.
+
+    Fields holding a list of entries with a ``key``, such as the members of a
+    club, are compared with :func:`diff_lists`; other fields are compared whole.
+
+    Parameters
+    ----------
+    old : Union[BaseBox, dict]
+        The previous snapshot, a model or its raw data
+    new : Union[BaseBox, dict]
+        The current snapshot
+    key : str, optional
+        The field identifying the entries of lists, by default ``'tag'``
+
+    Returns
+    -------
+    ObjectDelta
+        The changed fields and the changes of each list of entries.
+    """
+    old, new = _raw(old), _raw(new)
+    changed = {}
+    lists = {}
+    for field, value in new.items():
+        previous = old.get(field)
+        if previous == value:
+            continue
+        if _is_entry_list(value, key) and _is_entry_list(previous, key):
+            delta = diff_lists(previous, value, key)
+            if delta:
+                lists[field] = delta
+        else:
+            changed[field] = (previous, value)
+    for field in old.keys() - new.keys():
+        changed[field] = (old[field], None)
+    return ObjectDelta(changed, lists)
+
+
+class ChangeTracker:
+    """Keeps the last snapshot of repeatedly fetched objects and returns only what changed since.
+
+    .. code:: py
+
+        tracker = brawlstats.ChangeTracker()
+        delta = tracker.update(client.get_club_members(tag), key=tag)
+        if delta:
+            print(delta.added, delta.removed)
+
+    Parameters
+    ----------
+    key : str, optional
+        The field identifying the entries of lists, by default ``'tag'``
+    """
+
+    def __init__(self, key: str='tag'):
+        self.key = key
+        self._snapshots = {}
+
+    def __repr__(self):
+        return f'<ChangeTracker tracked={len(self)}>'
+
+    def __len__(self):
+        return len(self._snapshots)
+
+    def __contains__(self, key):
+        return key in self._snapshots
+
+    def update(self, snapshot, key: str=None) -> Optional[Union[ListDelta, ObjectDelta]]:
+        """Stores a new snapshot and returns its changes since the previous snapshot of the same key.
+
+        Parameters
+        ----------
+        snapshot : Union[BaseBox, dict, list]
+            A model such as a :class:`Club`, :class:`Members` or :class:`Ranking`, or its raw data
+        key : str, optional
+            What the snapshot is of, e.g. the club tag or ``'rankings/global/players'``.
+            Required for lists, by default the ``tag`` of the snapshot.
+
+        Returns
+        -------
+        Optional[Union[ListDelta, ObjectDelta]]
+            A :class:`ListDelta` for lists and an :class:`ObjectDelta` for objects,
+            or None for the first snapshot of a key.
+        """
+        data = _raw(snapshot)
+        if key is None:
+            if not isinstance(data, dict) or 'tag' not in data:
+                raise ValueError('Pass a key to track snapshots without a tag.')
+            key = data['tag']
+
+        previous = self._snapshots.get(key)
+        self._snapshots[key] = data
+        if previous is None:
+            return None
+        if isinstance(data, list):
+            return diff_lists(previous, data, self.key)
+        return diff_objects(previous, data, self.key)
+
+    def forget(self, key: str):
+        """Drops the snapshot of a key, so that its next update returns None."""
+        self._snapshots.pop(key, None)
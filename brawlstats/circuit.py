@@ -0,0 +1,205 @@
+import asyncio
+import contextlib
+import threading
+import time
+from collections import deque
+
+import aiohttp
+import requests
+
+from .errors import ServerError, UnexpectedError
+
+__all__ = ['CircuitBreaker']
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitBreaker:
+    """Stops making requests while the API is down.
+
+    The breaker is closed while the API works. Once at least ``min_requests``
+    were made in the last ``window`` seconds and ``failure_rate`` of them
+    failed with a server error, timeout or connection error, it opens and
+    requests fail fast with :class:`CircuitOpenError` (or are served from the
+    cache) for ``recovery_time`` seconds. It then lets ``half_open_requests``
+    probes through: it closes again if they succeed and reopens if not.
+
+    Parameters
+    ----------
+    failure_rate : float, optional
+        The fraction of failed requests that opens the breaker, by default 0.5
+    min_requests : int, optional
+        The minimum number of requests in the window before the breaker can open, by default 10
+    window : float, optional
+        The number of seconds the failure rate is measured over, by default 30
+    recovery_time : float, optional
+        The number of seconds the breaker stays open before probing, by default 30
+    half_open_requests : int, optional
+        The number of concurrent probes while half-open, by default 1
+    on_state_change : Callable[[str, str], Any], optional
+        Called with the old and new state whenever the state changes, by default None
+    """
+
+    def __init__(
+        self, failure_rate: float=0.5, min_requests: int=10, window: float=30, recovery_time: float=30,
+        half_open_requests: int=1, on_state_change=None
+    ):
+        if not 0 < failure_rate <= 1:
+            raise ValueError('Make sure failure_rate is greater than 0 and at most 1.')
+        self.failure_rate = failure_rate
+        self.min_requests = max(1, min_requests)
+        self.window = window
+        self.recovery_time = recovery_time
+        self.half_open_requests = max(1, half_open_requests)
+        self.on_state_change = on_state_change
+
+        self.trips = 0
+        self._state = CLOSED
+        self._opened_at = None
+        self._probes = 0
+        self._outcomes = deque()  # (time, failed)
+        self._failures = 0
+        self._lock = threading.Lock()
+        self._changes = []  # state changes whose callback runs once the lock is released
+
+    def __repr__(self):
+        return f'<CircuitBreaker state={self.state!r} trips={self.trips}>'
+
+    @property
+    def state(self) -> str:
+        """``'closed'``, ``'open'`` or ``'half_open'``."""
+        with self._locked():
+            return self._update()
+
+    @property
+    def retry_after(self) -> float:
+        """The number of seconds until the open breaker lets probes through, 0 if it is not open."""
+        with self._locked():
+            if self._update() != OPEN:
+                return 0.0
+            return max(0.0, self._opened_at + self.recovery_time - time.monotonic())
+
+    def stats(self) -> dict:
+        """Gets the state of the breaker for monitoring.
+
+        Returns
+        -------
+        dict
+            ``state``, ``requests`` and ``failures`` in the window, ``failure_rate``,
+            ``trips`` (how many times it opened) and ``retry_after``
+        """
+        retry_after = self.retry_after
+        with self._locked():
+            self._prune(time.monotonic())
+            requests = len(self._outcomes)
+            return {
+                'state': self._update(), 'requests': requests, 'failures': self._failures,
+                'failure_rate': self._failures / requests if requests else 0.0,
+                'trips': self.trips, 'retry_after': retry_after
+            }
+
+    @contextlib.contextmanager
+    def _locked(self):
+        """Holds the lock, then calls ``on_state_change`` for the changes made meanwhile,
+        so that the callback can use the breaker without deadlocking."""
+        try:
+            with self._lock:
+                yield
+        finally:
+            if self._changes:
+                with self._lock:
+                    changes, self._changes = self._changes, []
+                for old, state in changes:
+                    self.on_state_change(old, state)
+
+    def _set_state(self, state):
+        old, self._state = self._state, state
+        if state == OPEN:
+            self._opened_at = time.monotonic()
+            self.trips += 1
+        self._probes = 0
+        if state == CLOSED:
+            self._outcomes.clear()
+            self._failures = 0
+        if self.on_state_change is not None and old != state:
+            self._changes.append((old, state))
+
+    def _update(self):
+        if self._state == OPEN and time.monotonic() >= self._opened_at + self.recovery_time:
+            self._set_state(HALF_OPEN)
+        return self._state
+
+    def _prune(self, now):
+        while self._outcomes and self._outcomes[0][0] < now - self.window:
+            _, failed = self._outcomes.popleft()
+            self._failures -= failed
+
+    def allow(self) -> bool:
+        """Checks whether a request may be made now. While half-open this reserves a probe,
+        so every allowed request must be followed by :meth:`record_success`,
+        :meth:`record_failure` or :meth:`release`, which :meth:`track` does."""
+        with self._locked():
+            state = self._update()
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN and self._probes < self.half_open_requests:
+                self._probes += 1
+                return True
+            return False
+
+    def record_success(self):
+        with self._locked():
+            if self._state == HALF_OPEN:
+                self._set_state(CLOSED)
+            elif self._state == CLOSED:
+                self._record(False)
+
+    def record_failure(self):
+        with self._locked():
+            if self._state == HALF_OPEN:
+                self._set_state(OPEN)
+            elif self._state == CLOSED:
+                self._record(True)
+                requests = len(self._outcomes)
+                if requests >= self.min_requests and self._failures >= self.failure_rate * requests:
+                    self._set_state(OPEN)
+
+    def release(self):
+        """Gives back a probe reserved by :meth:`allow` for a request that was not made."""
+        with self._locked():
+            if self._state == HALF_OPEN and self._probes:
+                self._probes -= 1
+
+    def _record(self, failed):
+        now = time.monotonic()
+        self._prune(now)
+        self._outcomes.append((now, failed))
+        self._failures += failed
+
+    @staticmethod
+    def is_failure(error: BaseException) -> bool:
+        """Whether an error means the API is unavailable, rather than a problem with the request."""
+        return isinstance(error, (
+            ServerError, UnexpectedError, asyncio.TimeoutError, TimeoutError,
+            aiohttp.ClientError, requests.RequestException
+        ))
+
+    @contextlib.contextmanager
+    def track(self):
+        """Records the outcome of the request made inside the ``with`` block."""
+        try:
+            yield
+        except Exception as e:
+            if self.is_failure(e):
+                self.record_failure()
+            else:
+                # Errors such as a tag not being found mean the API works
+                self.record_success()
+            raise
+        except BaseException:
+            self.release()
+            raise
+        else:
+            self.record_success()
@@ -1,19 +1,38 @@
 import asyncio
+import contextlib
 import json
 import logging
 import sys
-from typing import Union
+import threading
+import time
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterable, List, Union
 
 import aiohttp
 import requests
 from cachetools import TTLCache
 
-from .errors import Forbidden, NotFoundError, RateLimitError, ServerError, UnexpectedError
-from .models import BattleLog, Brawlers, Club, EventRotation, Members, Player, Ranking
-from .utils import API, bstag, typecasted
+from .archive import ResponseArchive
+from .circuit import OPEN, CircuitBreaker
+from .encoding import TransferStats, accept_encoding
+from .errors import (
+    CircuitOpenError, Forbidden, NotFoundError, RateLimitError, RequestTimeoutError, ServerError, UnexpectedError
+)
+from .hedging import HedgePolicy
+from .models import BattleLog, Brawlers, Club, EventRotation, Members, Player, Ranking, RankingTable
+from .profiling import Profiler
+from .ratelimit import INTERACTIVE, PRIORITIES, RateLimiter
+from .replay import ReplaySession, TrafficRecorder
+from .utils import API, REGIONS, CacheKey, bstag, tag_to_int, typecasted
 
 log = logging.getLogger(__name__)
 
+BRAWLERS_KEY = CacheKey('brawlers')
+EVENT_ROTATION_KEY = CacheKey('events/rotation')
+# The number of regions get_rankings_all_regions fetches at once without a rate limit or max_workers
+MAX_CONCURRENT_REGIONS = 16
+
 
 class Client:
     """A sync/async client class that lets you access the Brawl Stars API
@@ -23,15 +42,16 @@ class Client:
     token: str
         The API Key that you can get from https://developer.brawlstars.com
     session: Union[requests.Session, aiohttp.ClientSession], optional
-        Use a current session or a make new one, by default None
+        Use a current session or a make new one, by default None.
+        The sync client makes a session per thread if this is not passed.
     timeout: int, optional
-        How long to wait in seconds before shutting down requests, by default 30
+        How long to wait in seconds before shutting down requests, by default 30.
+        Timed out requests raise :class:`RequestTimeoutError`.
     is_async: bool, optional
         Setting this to ``True`` makes the client async, by default False
     loop: asyncio.AbstractEventLoop, optional
-        The event loop to use for asynchronous operations, by default None.
-        If you are passing in an aiohttp session, using this will not work:
-        you must set it when initializing the session.
+        Deprecated and ignored: the async client always uses the running event loop,
+        which may be any loop implementation such as uvloop.
     connector: aiohttp.BaseConnector, optional
         Pass a Connector into the client (aiohttp), by default None
         If you are passing in an aiohttp session, using this will not work:
@@ -40,6 +60,49 @@ class Client:
         Whether or not to log info for debugging, by default False
     base_url: str, optional
         Sets a different base URL to make request to, by default None
+    archive: Union[str, ResponseArchive], optional
+        A directory or :class:`ResponseArchive` that every raw response
+        fetched from the API is appended to, by default None
+    rate_limit: Union[float, RateLimiter], optional
+        The maximum number of requests per second, or a :class:`RateLimiter`
+        to share between clients, by default None (unlimited)
+    priority: str, optional
+        The default priority of requests waiting for the ``rate_limit``,
+        ``'interactive'`` or ``'bulk'``, by default ``'interactive'``.
+        Interactive requests are always made before waiting bulk requests.
+    circuit_breaker: Union[bool, CircuitBreaker], optional
+        Pass ``True`` or a :class:`CircuitBreaker` to stop making requests while the API
+        is down. Requests then raise :class:`CircuitOpenError` unless they are cached, by default None
+    hedge: Union[bool, HedgePolicy], optional
+        Pass ``True`` or a :class:`HedgePolicy` to make the async client send a second copy
+        of requests that are slower than usual and use the first response, by default None
+    accept_encoding: str, optional
+        The ``Accept-Encoding`` header, by default the best of zstd, brotli and gzip
+        that can be decoded with the installed packages. The bytes received are counted by ``transfer``.
+    brawler_registry: BrawlerRegistry, optional
+        Where the brawlers are looked up, by default the registry shared by every client
+        of the process, ``brawlstats.registry``. The brawlers are only fetched if it is
+        empty and refreshed in the background once they are older than its ``ttl``.
+    max_workers: int, optional
+        The number of threads :meth:`map` uses to make requests with the sync client,
+        by default None (requests are made one at a time)
+    record: Union[str, TrafficRecorder], optional
+        A file or :class:`TrafficRecorder` that the URL, timing, status and raw body
+        of every request made is recorded to, by default None
+    replay: Union[str, ReplaySession], optional
+        A recording or :class:`ReplaySession` to serve responses from instead of
+        making requests, by default None
+    profile: Union[bool, Profiler], optional
+        Pass ``True`` or a :class:`Profiler` to record how long the argument conversion,
+        request, JSON decoding and model building of every call take per endpoint,
+        and with ``Profiler(memory=True)`` how much memory they allocate, by default None
+
+    The async client creates its session on the first request inside the running
+    event loop, so it can be created outside of a coroutine. Close it with
+    ``await client.close()`` or ``async with``.
+
+    The sync client is thread-safe: the cache is locked and, unless a session is
+    passed, every thread uses its own ``requests.Session``.
     """
 
     REQUEST_LOG = '{method} {url} recieved {text} has returned {status}'
@@ -47,40 +110,150 @@ class Client:
     def __init__(self, token, session=None, timeout=30, is_async=False, **options):
         # Async options
         self.is_async = is_async
-        self.loop = options.get('loop', asyncio.get_event_loop()) if self.is_async else None
+        if options.get('loop') is not None:
+            warnings.warn('The loop option is deprecated and ignored.', DeprecationWarning, stacklevel=2)
         self.connector = options.get('connector')
+        self._in_flight = 0
+        self._idle = None  # asyncio.Event set whenever no request is in flight
 
         self.debug = options.get('debug', False)
         self.cache = TTLCache(3200 * 3, 60 * 3)  # 3200 requests per minute
+        self._lock = threading.Lock()  # guards the cache and the sessions made for each thread
 
         # Session and request options
-        self.session = session or (
-            aiohttp.ClientSession(loop=self.loop, connector=self.connector) if self.is_async else requests.Session()
-        )
+        self._session = session
+        replay = options.get('replay')
+        if replay is not None:
+            if session is not None:
+                raise ValueError('Pass either a session or a recording to replay, not both.')
+            if not isinstance(replay, ReplaySession):
+                replay = ReplaySession(replay, base_url=options.get('base_url'))
+            self._session = replay
+        self._thread_sessions = threading.local()
+        self._sessions = []  # sessions made for each thread by the sync client
         self.timeout = timeout
-        self.prevent_ratelimit = options.get('prevent_ratelimit', False)
-        if self.is_async and self.prevent_ratelimit:
-            self.lock = asyncio.Lock(loop=self.loop)
-        self.api = API(base_url=options.get('base_url'), version=1)
+
+        self.max_workers = options.get('max_workers')
+        self._executor = None
+        if self.max_workers is not None and not is_async:
+            # Created here so that threads calling map at once share one pool
+            self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix='brawlstats')
+        self.api = API(base_url=options.get('base_url'), version=1, registry=options.get('brawler_registry'))
+
+        self.rate_limiter = options.get('rate_limit')
+        if self.rate_limiter is not None and not isinstance(self.rate_limiter, RateLimiter):
+            self.rate_limiter = RateLimiter(self.rate_limiter)
+        self.priority = options.get('priority', INTERACTIVE)
+        if self.priority not in PRIORITIES:
+            raise ValueError(f"'priority' must be one of {', '.join(map(repr, PRIORITIES))}.")
+
+        self.circuit_breaker = options.get('circuit_breaker')
+        if self.circuit_breaker is True:
+            self.circuit_breaker = CircuitBreaker()
+        elif self.circuit_breaker is False:
+            self.circuit_breaker = None
+
+        self.hedging = options.get('hedge')
+        if self.hedging is True:
+            self.hedging = HedgePolicy()
+        elif self.hedging is False:
+            self.hedging = None
+        if self.hedging is not None and not self.is_async:
+            raise ValueError('Hedging requires an async client.')
+
+        self.profiler = options.get('profile')
+        if self.profiler is True:
+            self.profiler = Profiler()
+        elif self.profiler is False:
+            self.profiler = None
+
+        self.archive = options.get('archive')
+        self._owns_archive = isinstance(self.archive, str)
+        if self._owns_archive:
+            self.archive = ResponseArchive(self.archive)
+
+        self.recorder = options.get('record')
+        self._owns_recorder = isinstance(self.recorder, str)
+        if self._owns_recorder:
+            self.recorder = TrafficRecorder(self.recorder)
 
         # Request/response headers
         self.headers = {
             'Authorization': f'Bearer {token}',
             'User-Agent': f'brawlstats/{self.api.VERSION} (Python {sys.version_info[0]}.{sys.version_info[1]})',
-            'Accept-Encoding': 'gzip'
+            'Accept-Encoding': options.get('accept_encoding') or accept_encoding(is_async)
         }
+        self.transfer = TransferStats()
 
         # Load brawlers for get_rankings
+        registry = self.api.registry
+        if not registry:
+            registry.load()
+        self._brawlers_task = None
         if self.is_async:
-            self.loop.create_task(self._ainit())
-        else:
-            brawlers_info = self.get_brawlers()
-            self.api.set_brawlers(brawlers_info)
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                loop = None  # No running loop yet: loaded by the first get_rankings call that needs them
+            # The refresh is only claimed once a task can make it, so that other clients are not kept from it
+            if loop is not None and registry.stale and (not registry or registry.claim_refresh()):
+                self._brawlers_task = loop.create_task(self._ainit())
+                self._brawlers_task.add_done_callback(self._brawlers_loaded)
+        elif not registry:
+            registry.update(self.get_brawlers())
+        elif registry.claim_refresh():
+            threading.Thread(target=self._refresh_brawlers, name='brawlstats-brawlers', daemon=True).start()
 
     async def _ainit(self):
         """Task created to run `get_brawlers` asynchronously"""
         self.api.set_brawlers(await self.get_brawlers())
 
+    def _refresh_brawlers(self):
+        """Refreshes the stale brawlers of the registry in the background for the sync client."""
+        try:
+            self.api.set_brawlers(self.get_brawlers(use_cache=False))
+        except Exception as e:
+            log.debug(f'Refreshing the brawlers failed: {e!r}')
+
+    def _brawlers_loaded(self, task):
+        # Retrieve the error so that it is not reported as unhandled, _ensure_brawlers retries
+        if not task.cancelled() and task.exception() is not None:
+            log.debug(f'Loading the brawlers failed: {task.exception()!r}')
+
+    async def _ensure_brawlers(self):
+        """Waits until the brawlers for get_rankings are loaded."""
+        if self.api.registry:
+            return  # Stale brawlers are still used while they are refreshed
+        if self._brawlers_task is None:
+            self._brawlers_task = asyncio.ensure_future(self._ainit())
+        try:
+            await asyncio.shield(self._brawlers_task)
+        except Exception:
+            # Retry on the next call instead of failing forever
+            self._brawlers_task = None
+            raise
+
+    @property
+    def session(self) -> Union[requests.Session, aiohttp.ClientSession]:
+        """The session requests are made with, which is different for each thread with the sync client."""
+        if self._session is not None:
+            return self._session
+        if self.is_async:
+            # Created lazily so that it belongs to the running loop
+            self._session = aiohttp.ClientSession(connector=self.connector)
+            return self._session
+
+        session = getattr(self._thread_sessions, 'session', None)
+        if session is None:
+            session = self._thread_sessions.session = requests.Session()
+            with self._lock:
+                self._sessions.append(session)
+        return session
+
+    @session.setter
+    def session(self, session):
+        self._session = session
+
     def __repr__(self):
         return f'<Client async={self.is_async} timeout={self.timeout} debug={self.debug}>'
 
@@ -94,19 +267,49 @@ class Client:
         return self
 
     async def __aexit__(self, exc_type, exc_value, traceback):
-        self.close()
+        await self.close()
 
     def close(self):
-        return self.session.close()
-
-    def _raise_for_status(self, resp, text):
+        """Closes the client's sessions. With the async client this is a coroutine that
+        first waits for the requests in flight to finish, at most ``timeout`` seconds."""
+        if self.is_async:
+            return self._aclose()
+        if self._owns_archive:
+            self.archive.close()
+        if self._owns_recorder:
+            self.recorder.close()
+        if self._executor is not None:
+            self._executor.shutdown()
+        if self._session is None:
+            for session in self._sessions:
+                session.close()
+            return None
+        return self._session.close()
+
+    async def _aclose(self):
+        if self._brawlers_task is not None and not self._brawlers_task.done():
+            self._brawlers_task.cancel()
+        if self._in_flight:
+            try:
+                await asyncio.wait_for(self._idle.wait(), self.timeout)
+            except asyncio.TimeoutError:
+                log.warning(f'Closing the client with {self._in_flight} requests still in flight.')
+        if self._owns_archive:
+            self.archive.close()
+        if self._owns_recorder:
+            self.recorder.close()
+        if self._session is not None:
+            await self._session.close()
+
+    def _raise_for_status(self, resp, text, url):
         """
         Checks for invalid error codes returned by the API.
         """
-        try:
-            data = json.loads(text)
-        except json.JSONDecodeError:
-            data = text
+        with self._profile(url, 'decode'):
+            try:
+                data = json.loads(text)
+            except json.JSONDecodeError:
+                data = text
 
         code = getattr(resp, 'status', None) or getattr(resp, 'status_code')
         url = resp.url
@@ -124,80 +327,328 @@ class Client:
             raise RateLimitError(code, url)
         if code == 500:
             raise UnexpectedError(code, url, data)
-        if code == 503:
+        if code >= 500:
             raise ServerError(code, url)
 
-    def _resolve_cache(self, url):
-        """Find any cached response for the same requested url."""
-        data = self.cache.get(url)
+    def _profile(self, url, stage):
+        """Measures a stage of a call, if the client is profiled."""
+        if self.profiler is None:
+            return contextlib.nullcontext()
+        return self.profiler.measure(self.api.endpoint(url), stage)
+
+    def _profile_request(self, url, started):
+        """Records the time of a request once its body is read. Its memory is not measured,
+        as other requests of the async client or of other threads run while it waits."""
+        if self.profiler is not None:
+            self.profiler.record(self.api.endpoint(url), 'request', time.time() - started)
+
+    def _archive_response(self, url, text):
+        """Append a successful response to the archive, if there is one."""
+        if self.archive is None:
+            return
+        endpoint, tag = self.api.split_url(url)
+        self.archive.append(endpoint, tag, text)
+
+    def _record_response(self, url, status, started, text):
+        """Record a response, if the client records its traffic."""
+        if self.recorder is None:
+            return
+        relative = url[len(self.api.BASE):] if url.startswith(self.api.BASE) else url
+        self.recorder.record(relative, status, started, time.time() - started, text)
+
+    def _count_transfer(self, url, resp, wire_bytes, decoded_bytes):
+        """Counts the bytes of a response on the wire and decoded."""
+        headers = getattr(resp, 'headers', None) or {}
+        encoding = headers.get('Content-Encoding', 'identity')
+        if wire_bytes is None:
+            length = headers.get('Content-Length')
+            wire_bytes = int(length) if length and encoding != 'identity' else decoded_bytes
+        self.transfer.record(encoding, wire_bytes, decoded_bytes)
+        if self.debug:
+            log.debug(f'GET {url} received {wire_bytes} bytes ({encoding}), {decoded_bytes} bytes decoded')
+
+    def _cached(self, key):
+        """Gets the cached data of a key. Rankings are stored once with the largest limit fetched
+        and sliced for requests with a smaller limit."""
+        if key.limit is None:
+            with self._lock:
+                return self.cache.get(key)
+        with self._lock:
+            entry = self.cache.get(key._replace(limit=None))
+        if entry is None or entry[0] < key.limit:
+            return None
+        limit, data = entry
+        if limit == key.limit:
+            return data
+        return {**data, 'items': data['items'][:key.limit]}
+
+    def _resolve_cache(self, url, key):
+        """Find any cached response for the same request."""
+        data = self._cached(key)
         if not data:
             return None
         if self.debug:
             log.debug(f'GET {url} got result from cache.')
         return data
 
-    async def _arequest(self, url, use_cache=True):
+    def _store_cache(self, key, data):
+        with self._lock:
+            if key.limit is None:
+                self.cache[key] = data
+            else:
+                # A smaller ranking does not replace a larger one that still serves both
+                ranking_key = key._replace(limit=None)
+                cached = self.cache.get(ranking_key)
+                if cached is None or cached[0] <= key.limit:
+                    self.cache[ranking_key] = (key.limit, data)
+
+    def _circuit_open(self, url, key):
+        """Serves a request from the cache, even if it was made with use_cache=False, while the circuit is open."""
+        data = self._cached(key)
+        if data is not None:
+            return data
+        raise CircuitOpenError(503, url, self.circuit_breaker.retry_after)
+
+    def _allow_request(self):
+        """Checks the circuit breaker right before a request is made."""
+        return self.circuit_breaker is None or self.circuit_breaker.allow()
+
+    def _track_request(self):
+        if self.circuit_breaker is None:
+            return contextlib.nullcontext()
+        return self.circuit_breaker.track()
+
+    def _request_timeout(self, url, timeout, deadline):
+        """Gets the timeout of the HTTP request, which must end by the deadline of the call."""
+        if deadline is None:
+            return self.timeout
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise RequestTimeoutError(503, url, timeout)
+        return min(self.timeout, remaining)
+
+    async def _arequest(self, url, use_cache=True, priority=None, timeout=None, key=None):
         """Async method to request a url."""
+        if key is None:
+            key = self.api.cache_key(url)
         # Try and retrieve from cache
         if use_cache:
-            cache = self._resolve_cache(url)
+            cache = self._resolve_cache(url, key)
         else:
             cache = None
 
         if cache is not None:
             return cache
 
+        # Fail fast instead of waiting for the rate limit while the API is down
+        if self.circuit_breaker is not None and self.circuit_breaker.state == OPEN:
+            return self._circuit_open(url, key)
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        if self.rate_limiter is not None:
+            try:
+                await self.rate_limiter.aacquire(priority or self.priority, timeout)
+            except TimeoutError:
+                raise RequestTimeoutError(503, url, timeout) from None
+
+        request_timeout = self._request_timeout(url, timeout, deadline)
+        if not self._allow_request():
+            return self._circuit_open(url, key)
+        if self._idle is None:
+            self._idle = asyncio.Event()
+        self._in_flight += 1
+        self._idle.clear()
         try:
-            async with self.session.get(url, timeout=self.timeout, headers=self.headers) as resp:
-                data = self._raise_for_status(resp, await resp.text())
-        except asyncio.TimeoutError:
-            raise ServerError(503, url)
-        else:
+            if self.hedging is None:
+                text, data = await self._afetch(url, request_timeout, timeout)
+            else:
+                text, data = await self._afetch_hedged(url, request_timeout, timeout, priority or self.priority)
             # Cache the data if successful
-            self.cache[url] = data
+            self._store_cache(key, data)
+            self._archive_response(url, text)
+        finally:
+            self._in_flight -= 1
+            if not self._in_flight:
+                self._idle.set()
 
         return data
 
-    def _request(self, url, use_cache=True):
+    async def _afetch(self, url, request_timeout, timeout):
+        """Makes the HTTP request of _arequest and returns the text and data of the response."""
+        try:
+            with self._track_request():
+                started = time.time()
+                async with self.session.get(
+                    url, timeout=aiohttp.ClientTimeout(total=request_timeout), headers=self.headers
+                ) as resp:
+                    text = await resp.text()
+                    self._profile_request(url, started)
+                    content = getattr(resp, 'content', None)
+                    self._count_transfer(
+                        url, resp, getattr(content, 'total_raw_bytes', None),
+                        getattr(content, 'total_bytes', None) or len(text)
+                    )
+                    self._record_response(url, resp.status, started, text)
+                    return text, self._raise_for_status(resp, text, url)
+        except asyncio.TimeoutError:
+            raise RequestTimeoutError(503, url, min(self.timeout, timeout or self.timeout)) from None
+
+    async def _afetch_hedged(self, url, request_timeout, timeout, priority):
+        """Makes the HTTP request, and a second one if the first is slower than the hedging delay."""
+        loop = asyncio.get_running_loop()
+        # Every region, brawler and limit of a ranking shares the latencies of its endpoint
+        endpoint = self.api.endpoint(url)
+        delay = self.hedging.delay(endpoint)
+        start = loop.time()
+
+        def record(task):
+            # Cancelled requests were at least this slow
+            if task.cancelled() or task.exception() is None:
+                self.hedging.record(endpoint, loop.time() - start)
+
+        primary = asyncio.ensure_future(self._afetch(url, request_timeout, timeout))
+        primary.add_done_callback(record)
+        pending = {primary}
+        try:
+            if delay is not None and delay < request_timeout:
+                done, _ = await asyncio.wait(pending, timeout=delay)
+                if not done and self.hedging.allow_hedge():
+                    pending.add(asyncio.ensure_future(
+                        self._ahedge(url, request_timeout - (loop.time() - start), timeout, priority)
+                    ))
+
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not primary:
+                            self.hedging.hedge_wins += 1
+                        return task.result()
+                    if task is primary or error is None:
+                        error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _ahedge(self, url, request_timeout, timeout, priority):
+        # Hedges use the rate limit and circuit breaker like any other request
+        if self.rate_limiter is not None:
+            await self.rate_limiter.aacquire(priority)
+        if not self._allow_request():
+            raise CircuitOpenError(503, url, self.circuit_breaker.retry_after)
+        return await self._afetch(url, request_timeout, timeout)
+
+    def _request(self, url, use_cache=True, priority=None, timeout=None, key=None):
         """Sync method to request a url."""
         if self.is_async:
-            return self._arequest(url, use_cache=use_cache)
+            return self._arequest(url, use_cache=use_cache, priority=priority, timeout=timeout, key=key)
 
+        if key is None:
+            key = self.api.cache_key(url)
         # Try and retrieve from cache
         if use_cache:
-            cache = self._resolve_cache(url)
+            cache = self._resolve_cache(url, key)
         else:
             cache = None
         if cache is not None:
             return cache
 
+        # Fail fast instead of waiting for the rate limit while the API is down
+        if self.circuit_breaker is not None and self.circuit_breaker.state == OPEN:
+            return self._circuit_open(url, key)
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        if self.rate_limiter is not None:
+            try:
+                self.rate_limiter.acquire(priority or self.priority, timeout)
+            except TimeoutError:
+                raise RequestTimeoutError(503, url, timeout) from None
+
+        request_timeout = self._request_timeout(url, timeout, deadline)
+        if not self._allow_request():
+            return self._circuit_open(url, key)
         try:
-            with self.session.get(url, timeout=self.timeout, headers=self.headers) as resp:
-                data = self._raise_for_status(resp, resp.text)
+            started = time.time()
+            with self._track_request(), self.session.get(url, timeout=request_timeout, headers=self.headers) as resp:
+                text = resp.text
+                self._profile_request(url, started)
+                raw = getattr(resp, 'raw', None)
+                self._count_transfer(
+                    url, resp, raw.tell() if hasattr(raw, 'tell') else None,
+                    len(resp.content) if hasattr(resp, 'content') else len(text)
+                )
+                self._record_response(url, resp.status_code, started, text)
+                data = self._raise_for_status(resp, text, url)
         except requests.Timeout:
-            raise ServerError(503, url)
+            raise RequestTimeoutError(503, url, min(self.timeout, timeout or self.timeout)) from None
         else:
             # Cache the data if successful
-            self.cache[url] = data
+            self._store_cache(key, data)
+            self._archive_response(url, text)
 
         return data
 
-    async def _aget_model(self, url, model, use_cache=True, key=None):
+    async def _aget_model(self, url, model, use_cache=True, key=None, priority=None, timeout=None):
         """Method to turn the response data into a Model class for the async client."""
-        data = await self._arequest(url, use_cache=use_cache)
-        return model(self, data)
+        data = await self._arequest(url, use_cache=use_cache, priority=priority, timeout=timeout, key=key)
+        with self._profile(url, 'model'):
+            return model(self, data)
 
-    def _get_model(self, url, model, use_cache=True, key=None):
+    def _get_model(self, url, model, use_cache=True, key=None, priority=None, timeout=None):
         """Method to turn the response data into a Model class for the sync client."""
         if self.is_async:
             # Calls the async function
-            return self._aget_model(url, model=model, use_cache=use_cache, key=key)
+            return self._aget_model(url, model=model, use_cache=use_cache, key=key, priority=priority, timeout=timeout)
+
+        data = self._request(url, use_cache, priority, timeout, key)
+        with self._profile(url, 'model'):
+            return model(self, data)
+
+    def map(self, func: Callable, *iterables: Iterable, return_exceptions: bool=False) -> List[Any]:
+        """Calls a client method for every item of the iterables concurrently.
+
+        The sync client runs the calls on a pool of ``max_workers`` threads,
+        the async client gathers them. The results are in the same order as the items.
+
+        .. code:: py
+
+            players = client.map(client.get_player, tags)
+            # async
+            players = await client.map(client.get_player, tags)
+
+        Parameters
+        ----------
+        func : Callable
+            The method to call, e.g. ``client.get_player``
+        *iterables : Iterable
+            The arguments of every call, like the builtin ``map``
+        return_exceptions : bool, optional
+            Whether to put raised exceptions in the results instead of raising the first one, by default False
 
-        data = self._request(url, use_cache)
-        return model(self, data)
+        Returns
+        -------
+        List[Any]
+            The return values of the calls.
+        """
+        if self.is_async:
+            return asyncio.gather(*(func(*args) for args in zip(*iterables)), return_exceptions=return_exceptions)
+
+        def call(*args):
+            try:
+                return func(*args)
+            except Exception as e:
+                if not return_exceptions:
+                    raise
+                return e
+
+        if self._executor is None:
+            return [call(*args) for args in zip(*iterables)]
+        return list(self._executor.map(call, *iterables))
 
     @typecasted
-    def get_player(self, tag: bstag, use_cache=True) -> Player:
+    def get_player(self, tag: bstag, use_cache=True, priority: str=None, timeout: float=None) -> Player:
         """Gets a player's stats.
 
         Parameters
@@ -207,6 +658,11 @@ class Client:
             Valid characters: 0289PYLQGRJCUV
         use_cache : bool, optional
             Whether to use the internal 3 minutes cache, by default True
+        priority : str, optional
+            ``'interactive'`` or ``'bulk'``, by default the client's ``priority``
+        timeout : float, optional
+            The deadline of the call in seconds, which includes waiting for the ``rate_limit``,
+            by default None (only the request itself times out, after the client's ``timeout``)
 
         Returns
         -------
@@ -214,12 +670,13 @@ class Client:
             A player object with all of its attributes.
         """
         url = f'{self.api.PROFILE}/{tag}'
-        return self._get_model(url, model=Player, use_cache=use_cache)
+        key = CacheKey('players/{tag}', tag_to_int(tag))
+        return self._get_model(url, model=Player, use_cache=use_cache, key=key, priority=priority, timeout=timeout)
 
     get_profile = get_player
 
     @typecasted
-    def get_battle_logs(self, tag: bstag, use_cache=True) -> BattleLog:
+    def get_battle_logs(self, tag: bstag, use_cache=True, priority: str=None, timeout: float=None) -> BattleLog:
         """Gets a player's battle logs.
 
         Parameters
@@ -229,6 +686,11 @@ class Client:
             Valid characters: 0289PYLQGRJCUV
         use_cache : bool, optional
             Whether to use the internal 3 minutes cache, by default True
+        priority : str, optional
+            ``'interactive'`` or ``'bulk'``, by default the client's ``priority``
+        timeout : float, optional
+            The deadline of the call in seconds, which includes waiting for the ``rate_limit``,
+            by default None (only the request itself times out, after the client's ``timeout``)
 
         Returns
         -------
@@ -236,10 +698,11 @@ class Client:
             A player battle object with all of its attributes.
         """
         url = f'{self.api.PROFILE}/{tag}/battlelog'
-        return self._get_model(url, model=BattleLog, use_cache=use_cache)
+        key = CacheKey('players/{tag}/battlelog', tag_to_int(tag))
+        return self._get_model(url, model=BattleLog, use_cache=use_cache, key=key, priority=priority, timeout=timeout)
 
     @typecasted
-    def get_club(self, tag: bstag, use_cache=True) -> Club:
+    def get_club(self, tag: bstag, use_cache=True, priority: str=None, timeout: float=None) -> Club:
         """Gets a club's stats.
 
         Parameters
@@ -249,6 +712,11 @@ class Client:
             Valid characters: 0289PYLQGRJCUV
         use_cache : bool, optional
             Whether to use the internal 3 minutes cache, by default True
+        priority : str, optional
+            ``'interactive'`` or ``'bulk'``, by default the client's ``priority``
+        timeout : float, optional
+            The deadline of the call in seconds, which includes waiting for the ``rate_limit``,
+            by default None (only the request itself times out, after the client's ``timeout``)
 
         Returns
         -------
@@ -256,10 +724,11 @@ class Client:
             A club object with all of its attributes.
         """
         url = f'{self.api.CLUB}/{tag}'
-        return self._get_model(url, model=Club, use_cache=use_cache)
+        key = CacheKey('clubs/{tag}', tag_to_int(tag))
+        return self._get_model(url, model=Club, use_cache=use_cache, key=key, priority=priority, timeout=timeout)
 
     @typecasted
-    def get_club_members(self, tag: bstag, use_cache=True) -> Members:
+    def get_club_members(self, tag: bstag, use_cache=True, priority: str=None, timeout: float=None) -> Members:
         """Gets the members of a club.
 
         Parameters
@@ -269,6 +738,11 @@ class Client:
             Valid characters: 0289PYLQGRJCUV
         use_cache : bool, optional
             Whether to use the internal 3 minutes cache, by default True
+        priority : str, optional
+            ``'interactive'`` or ``'bulk'``, by default the client's ``priority``
+        timeout : float, optional
+            The deadline of the call in seconds, which includes waiting for the ``rate_limit``,
+            by default None (only the request itself times out, after the client's ``timeout``)
 
         Returns
         -------
@@ -276,11 +750,36 @@ class Client:
             A list of the members in a club.
         """
         url = f'{self.api.CLUB}/{tag}/members'
-        return self._get_model(url, model=Members, use_cache=use_cache)
+        key = CacheKey('clubs/{tag}/members', tag_to_int(tag))
+        return self._get_model(url, model=Members, use_cache=use_cache, key=key, priority=priority, timeout=timeout)
+
+    def _rankings_url(self, ranking, region, limit, brawler):
+        """Validates the parameters of a ranking and builds its url and cache key."""
+        if brawler is not None:
+            # Replace brawler name with ID
+            brawler = self.api.registry.get_id(brawler)
+            if brawler is None:
+                raise ValueError('Invalid brawler.')
+
+        if region is None:
+            region = 'global'
+
+        # Check for invalid parameters
+        if ranking not in ('players', 'clubs', 'brawlers'):
+            raise ValueError("'ranking' must be 'players', 'clubs' or 'brawlers'.")
+        if not 0 < limit <= 200:
+            raise ValueError('Make sure limit is between 1 and 200.')
+
+        # Construct URL
+        if ranking == 'brawlers':
+            endpoint = f'rankings/{region}/{ranking}/{brawler}'
+        else:
+            endpoint = f'rankings/{region}/{ranking}'
+        return f'{self.api.BASE}/{endpoint}?limit={limit}', CacheKey(endpoint, None, limit)
 
     def get_rankings(
         self, *, ranking: str, region: str=None, limit: int=200,
-        brawler: Union[str, int]=None, use_cache=True
+        brawler: Union[str, int]=None, use_cache=True, priority: str=None, timeout: float=None
     ) -> Ranking:
         """Gets the top count players/clubs/brawlers.
 
@@ -295,7 +794,13 @@ class Client:
         brawler : Union[str, int], optional
             The brawler name or ID, by default None
         use_cache : bool, optional
-            Whether to use the internal 3 minutes cache, by default True
+            Whether to use the internal 3 minutes cache, by default True.
+            A cached ranking also serves requests with a smaller limit.
+        priority : str, optional
+            ``'interactive'`` or ``'bulk'``, by default the client's ``priority``
+        timeout : float, optional
+            The deadline of the call in seconds, which includes waiting for the ``rate_limit``,
+            by default None (only the request itself times out, after the client's ``timeout``)
 
         Returns
         -------
@@ -311,59 +816,154 @@ class Client:
         ValueError
             `limit` is not between 1 and 200, inclusive.
         """
-        if brawler is not None:
-            if isinstance(brawler, str):
-                brawler = brawler.lower()
+        if self.is_async:
+            return self._aget_rankings(ranking, region, limit, brawler, use_cache, priority, timeout)
 
-            # Replace brawler name with ID
-            if brawler in self.api.CURRENT_BRAWLERS.keys():
-                brawler = self.api.CURRENT_BRAWLERS[brawler]
+        url, key = self._rankings_url(ranking, region, limit, brawler)
+        return self._get_model(url, model=Ranking, use_cache=use_cache, key=key, priority=priority, timeout=timeout)
 
-            if brawler not in self.api.CURRENT_BRAWLERS.values():
-                raise ValueError('Invalid brawler.')
+    async def _aget_rankings(self, ranking, region, limit, brawler, use_cache, priority, timeout):
+        if brawler is not None:
+            await self._ensure_brawlers()
+        url, key = self._rankings_url(ranking, region, limit, brawler)
+        return await self._aget_model(
+            url, model=Ranking, use_cache=use_cache, key=key, priority=priority, timeout=timeout
+        )
 
-        if region is None:
-            region = 'global'
+    def get_rankings_all_regions(
+        self, ranking: str, brawler: Union[str, int]=None, use_cache=True, regions: Iterable[str]=None,
+        priority: str=None
+    ) -> RankingTable:
+        """Gets the top 200 players/clubs/brawlers of every region merged into one table.
 
-        # Check for invalid parameters
-        if ranking not in ('players', 'clubs', 'brawlers'):
-            raise ValueError("'ranking' must be 'players', 'clubs' or 'brawlers'.")
-        if not 0 < limit <= 200:
-            raise ValueError('Make sure limit is between 1 and 200.')
+        All regions are fetched concurrently, limited by the client's ``rate_limit`` or else to 16
+        at a time. The sync client uses a pool of ``max_workers`` (by default 16) threads of its own,
+        so it can be called from :meth:`map`. Regions without a ranking are skipped, and the errors of
+        regions that could not be fetched are put in the table's ``errors`` instead of being raised.
 
-        # Construct URL
-        url = f'{self.api.RANKINGS}/{region}/{ranking}?limit={limit}'
-        if ranking == 'brawlers':
-            url = f'{self.api.RANKINGS}/{region}/{ranking}/{brawler}?limit={limit}'
+        Parameters
+        ----------
+        ranking : str
+            The type of ranking. Must be "players", "clubs", "brawlers".
+        brawler : Union[str, int], optional
+            The brawler name or ID, by default None
+        use_cache : bool, optional
+            Whether to use the internal 3 minutes cache, by default True
+        regions : Iterable[str], optional
+            The 2 letter country codes to fetch, by default every country
+        priority : str, optional
+            ``'interactive'`` or ``'bulk'``, by default the client's ``priority``
 
-        return self._get_model(url, model=Ranking, use_cache=use_cache)
+        Returns
+        -------
+        RankingTable
+            The columns tag, name, trophies, rank and region of every entry,
+            and the ``errors`` of the regions that failed.
 
-    def get_brawlers(self, use_cache=True) -> Brawlers:
+        Raises
+        ------
+        ValueError
+            The brawler name or ID is invalid.
+        ValueError
+            `rankings` is not "players", "clubs", or "brawlers"
+        """
+        if self.is_async:
+            return self._aget_rankings_all_regions(ranking, brawler, use_cache, regions, priority)
+
+        urls = self._all_regions_urls(ranking, brawler, regions)
+
+        def fetch(request):
+            try:
+                return self._request(request[0], use_cache, priority, key=request[1])
+            except Exception as e:
+                return e
+
+        # Not the pool of map, whose threads may be the ones waiting for these requests
+        with ThreadPoolExecutor(
+            self.max_workers or MAX_CONCURRENT_REGIONS, thread_name_prefix='brawlstats-regions'
+        ) as executor:
+            responses = list(executor.map(fetch, [request for _, request in urls]))
+        return self._ranking_table(urls, responses)
+
+    def _all_regions_urls(self, ranking, brawler, regions):
+        return [
+            (region, self._rankings_url(ranking, region, 200, brawler))
+            for region in (regions if regions is not None else REGIONS)
+        ]
+
+    async def _aget_rankings_all_regions(self, ranking, brawler, use_cache, regions, priority):
+        if brawler is not None:
+            await self._ensure_brawlers()
+        urls = self._all_regions_urls(ranking, brawler, regions)
+
+        # The rate limiter paces the requests, otherwise they are bounded here
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_REGIONS) if self.rate_limiter is None else None
+
+        async def fetch(url, key):
+            if semaphore is None:
+                return await self._arequest(url, use_cache, priority, key=key)
+            async with semaphore:
+                return await self._arequest(url, use_cache, priority, key=key)
+
+        responses = await asyncio.gather(*(fetch(*request) for _, request in urls), return_exceptions=True)
+        return self._ranking_table(urls, responses)
+
+    @staticmethod
+    def _ranking_table(urls, responses):
+        """Merges the responses of get_rankings_all_regions, keeping the errors of the failed regions."""
+        table = RankingTable()
+        for (region, _), data in zip(urls, responses):
+            if isinstance(data, NotFoundError):
+                continue
+            if isinstance(data, BaseException):
+                if not isinstance(data, Exception):
+                    raise data  # cancelled
+                table.errors[region] = data
+            else:
+                table.extend(region, data['items'])
+        return table
+
+    def get_brawlers(self, use_cache=True, priority: str=None, timeout: float=None) -> Brawlers:
         """Gets available brawlers and information about them.
 
         Parameters
         ----------
         use_cache : bool, optional
             Whether to use the internal 3 minutes cache, by default True
+        priority : str, optional
+            ``'interactive'`` or ``'bulk'``, by default the client's ``priority``
+        timeout : float, optional
+            The deadline of the call in seconds, which includes waiting for the ``rate_limit``,
+            by default None (only the request itself times out, after the client's ``timeout``)
 
         Returns
         -------
         Brawlers
             A list of available brawlers and information about them.
         """
-        return self._get_model(self.api.BRAWLERS, model=Brawlers, use_cache=use_cache)
+        return self._get_model(
+            self.api.BRAWLERS, model=Brawlers, use_cache=use_cache, key=BRAWLERS_KEY, priority=priority, timeout=timeout
+        )
 
-    def get_event_rotation(self, use_cache=True) -> EventRotation:
+    def get_event_rotation(self, use_cache=True, priority: str=None, timeout: float=None) -> EventRotation:
         """Gets the current events in rotation.
 
         Parameters
         ----------
         use_cache : bool, optional
             Whether to use the internal 3 minutes cache, by default True
+        priority : str, optional
+            ``'interactive'`` or ``'bulk'``, by default the client's ``priority``
+        timeout : float, optional
+            The deadline of the call in seconds, which includes waiting for the ``rate_limit``,
+            by default None (only the request itself times out, after the client's ``timeout``)
 
         Returns
         -------
         Events
             A list of the current events in rotation.
         """
-        return self._get_model(self.api.EVENT_ROTATION, model=EventRotation, use_cache=use_cache)
+        return self._get_model(
+            self.api.EVENT_ROTATION, model=EventRotation, use_cache=use_cache, key=EVENT_ROTATION_KEY,
+            priority=priority, timeout=timeout
+        )
@@ -0,0 +1,324 @@
+import asyncio
+import base64
+import hashlib
+import inspect
+import json
+import logging
+import math
+from collections import deque
+
+import aiohttp
+
+from .errors import NotFoundError, RateLimitError, ServerError, UnexpectedError
+from .ratelimit import BULK
+from .utils import int_to_tag, tag_to_int
+
+__all__ = ['BloomFilter', 'Crawler']
+
+log = logging.getLogger(__name__)
+
+PLAYER = 'player'
+CLUB = 'club'
+
+# Errors after which the same request may succeed later, including timeouts and an open circuit breaker
+TEMPORARY_ERRORS = (ServerError, RateLimitError, UnexpectedError, aiohttp.ClientError, asyncio.TimeoutError)
+
+
+class BloomFilter:
+    """A fixed-size probabilistic set of tag integers.
+
+    Uses about 1.2 bytes per tag for a 1% false positive rate instead of the
+    ~60 bytes a ``set`` entry takes. A false positive means a tag is treated as
+    already visited and skipped.
+
+    Parameters
+    ----------
+    capacity : int
+        The number of tags that will be added.
+    error_rate : float, optional
+        The acceptable false positive rate, by default 0.01
+    """
+
+    def __init__(self, capacity: int, error_rate: float=0.01):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        # Optimal size and number of hashes for the capacity and error rate
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+        self._count = 0
+
+    def __repr__(self):
+        return f'<BloomFilter count={len(self)} capacity={self.capacity}>'
+
+    def __len__(self):
+        return self._count
+
+    def _positions(self, key):
+        digest = hashlib.blake2b(key.to_bytes(8, 'little'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, key: int):
+        new = False
+        for position in self._positions(key):
+            byte, bit = divmod(position, 8)
+            if not self._bits[byte] & (1 << bit):
+                self._bits[byte] |= 1 << bit
+                new = True
+        self._count += new
+
+    def __contains__(self, key: int):
+        return all(self._bits[p // 8] & (1 << (p % 8)) for p in self._positions(key))
+
+    def to_dict(self):
+        return {
+            'capacity': self.capacity, 'error_rate': self.error_rate, 'count': self._count,
+            'bits': base64.b64encode(bytes(self._bits)).decode('ascii')
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        bloom = cls(data['capacity'], data['error_rate'])
+        bloom._bits = bytearray(base64.b64decode(data['bits']))
+        bloom._count = data['count']
+        return bloom
+
+
+class Crawler:
+    """Discovers players and clubs breadth-first with an async client.
+
+    Starting from seed players, clubs or rankings, every crawled player leads
+    to their club (and optionally the players in their battle log), and every
+    crawled club leads to its members. Each player and club is only fetched
+    once; visited tags are kept as integers (see :func:`utils.tag_to_int`) or
+    in a :class:`BloomFilter`. The frontier can be saved with :meth:`save` and
+    resumed later with :meth:`load`.
+
+    Players and clubs that fail with a temporary error, such as a server error,
+    timeout or connection error, are queued again after an exponential backoff.
+    Those that still fail after ``max_retries`` attempts, or fail otherwise, are
+    kept in ``failed`` and saved with the frontier, so a resumed crawl tries them again.
+    Only players and clubs that are not found are dropped.
+
+    Parameters
+    ----------
+    client : Client
+        An async client, preferably created with ``rate_limit``.
+    on_player : Callable[[Player], Any], optional
+        Called (and awaited if it is a coroutine function) with every crawled player.
+    on_club : Callable[[Club], Any], optional
+        Called (and awaited if it is a coroutine function) with every crawled club.
+    workers : int, optional
+        The number of concurrent requests, by default 16
+    follow_battle_logs : bool, optional
+        Whether to also crawl the players found in battle logs, by default False
+    bloom_capacity : int, optional
+        Track visited tags in :class:`BloomFilter` objects sized for this many tags instead of sets, by default None
+    priority : str, optional
+        The priority of the crawl's requests, by default ``'bulk'`` so that other requests made
+        with the same client or rate limiter go first
+    max_retries : int, optional
+        The number of times a player or club is queued again after a temporary error, by default 5
+    retry_delay : float, optional
+        The number of seconds before the first retry, doubled for every further one, by default 1.
+        While a circuit breaker is open, its ``retry_after`` is waited instead.
+    """
+
+    def __init__(
+        self, client, on_player=None, on_club=None, *, workers: int=16,
+        follow_battle_logs: bool=False, bloom_capacity: int=None, priority: str=BULK,
+        max_retries: int=5, retry_delay: float=1
+    ):
+        if not client.is_async:
+            raise ValueError('Crawler requires an async client.')
+        self.client = client
+        self.on_player = on_player
+        self.on_club = on_club
+        self.workers = workers
+        self.follow_battle_logs = follow_battle_logs
+        self.priority = priority
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+
+        if bloom_capacity:
+            self.visited = {PLAYER: BloomFilter(bloom_capacity), CLUB: BloomFilter(bloom_capacity)}
+        else:
+            self.visited = {PLAYER: set(), CLUB: set()}
+        self.frontier = deque()
+        self.failed = []
+        self._in_flight = set()
+        self._attempts = {}  # item -> number of failed attempts
+        self._retrying = {}  # item -> handle of its scheduled retry
+        self._wakeup = asyncio.Event()
+        self._running = False
+
+    def __repr__(self):
+        return (
+            f'<Crawler players={len(self.visited[PLAYER])} clubs={len(self.visited[CLUB])} '
+            f'frontier={len(self.frontier)}>'
+        )
+
+    def _enqueue(self, kind, tag):
+        key = tag_to_int(tag) if isinstance(tag, str) else tag
+        visited = self.visited[kind]
+        if key in visited:
+            return
+        visited.add(key)
+        self.frontier.append((kind, key))
+        self._wakeup.set()
+
+    def add_player(self, tag: str):
+        """Adds a player to crawl."""
+        self._enqueue(PLAYER, tag)
+
+    def add_club(self, tag: str):
+        """Adds a club to crawl."""
+        self._enqueue(CLUB, tag)
+
+    async def add_ranking(self, ranking: str='players', region: str=None):
+        """Adds every player or club of a ranking to crawl.
+
+        Parameters
+        ----------
+        ranking : str, optional
+            The type of ranking. Must be "players" or "clubs", by default "players"
+        region : str, optional
+            The region to retrieve from. Must be a 2 letter country code, 'global', or None: by default None
+        """
+        kind = {'players': PLAYER, 'clubs': CLUB}.get(ranking)
+        if kind is None:
+            raise ValueError("'ranking' must be 'players' or 'clubs'.")
+        for item in (await self.client.get_rankings(ranking=ranking, region=region, priority=self.priority)).raw_data:
+            self._enqueue(kind, item['tag'])
+
+    async def run(self):
+        """Crawls until the frontier is exhausted or :meth:`stop` is called."""
+        self._running = True
+        try:
+            await asyncio.gather(*(self._worker() for _ in range(self.workers)))
+        finally:
+            self._running = False
+            # Retries that have not come up yet are kept in the frontier
+            for item, handle in self._retrying.items():
+                handle.cancel()
+                self.frontier.append(item)
+            self._retrying.clear()
+
+    def stop(self):
+        """Stops the crawl once the requests in flight are done."""
+        self._running = False
+        self._wakeup.set()
+
+    async def _worker(self):
+        while self._running:
+            if not self.frontier:
+                if not self._in_flight and not self._retrying:
+                    # Nothing left to crawl and no running request or retry can add more
+                    self._wakeup.set()
+                    return
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            item = self.frontier.popleft()
+            self._in_flight.add(item)
+            try:
+                await self._visit(*item)
+            except asyncio.CancelledError:
+                # Put interrupted work back so that a saved frontier resumes it
+                self.frontier.appendleft(item)
+                raise
+            finally:
+                self._in_flight.discard(item)
+                self._wakeup.set()
+
+    async def _visit(self, kind, key):
+        tag = int_to_tag(key)
+        try:
+            if kind == PLAYER:
+                await self._visit_player(tag)
+            else:
+                await self._visit_club(tag)
+        except NotFoundError:
+            log.debug(f'Skipped {kind} {tag}: not found.')
+        except TEMPORARY_ERRORS as e:
+            self._retry((kind, key), e)
+        except Exception:
+            # e.g. a failing callback or an invalid token, which a retry would not fix right away
+            log.exception(f'Crawling {kind} {tag} failed.')
+            self._attempts.pop((kind, key), None)
+            self.failed.append((kind, key))
+        else:
+            self._attempts.pop((kind, key), None)
+
+    def _retry(self, item, error):
+        kind, key = item
+        attempts = self._attempts.get(item, 0) + 1
+        if attempts > self.max_retries:
+            log.warning(f'Crawling {kind} {int_to_tag(key)} failed {attempts} times, last with {error!r}.')
+            del self._attempts[item]
+            self.failed.append(item)
+            return
+
+        self._attempts[item] = attempts
+        delay = getattr(error, 'retry_after', 0) or self.retry_delay * 2 ** (attempts - 1)
+        log.debug(f'Crawling {kind} {int_to_tag(key)} failed with {error!r}, retrying in {delay:.1f}s.')
+        self._retrying[item] = asyncio.get_running_loop().call_later(delay, self._requeue, item)
+
+    def _requeue(self, item):
+        del self._retrying[item]
+        self.frontier.append(item)
+        self._wakeup.set()
+
+    async def _visit_player(self, tag):
+        player = await self.client.get_player(tag, priority=self.priority)
+        if player.raw_data.get('club'):
+            self._enqueue(CLUB, player.raw_data['club']['tag'])
+        await _call(self.on_player, player)
+
+        if self.follow_battle_logs:
+            battle_log = await self.client.get_battle_logs(tag, priority=self.priority)
+            for item in battle_log.raw_data:
+                battle = item.get('battle', {})
+                for team in battle.get('teams', []):
+                    for battle_player in team:
+                        self._enqueue(PLAYER, battle_player['tag'])
+                for battle_player in battle.get('players', []):
+                    self._enqueue(PLAYER, battle_player['tag'])
+
+    async def _visit_club(self, tag):
+        club = await self.client.get_club(tag, priority=self.priority)
+        for member in club.raw_data.get('members', []):
+            self._enqueue(PLAYER, member['tag'])
+        await _call(self.on_club, club)
+
+    def save(self, path):
+        """Writes the frontier, including the players and clubs waiting for a retry or that failed,
+        and the visited tags to a JSON checkpoint file."""
+        frontier = list(self._in_flight) + list(self._retrying) + list(self.frontier) + self.failed
+        visited = {
+            kind: tags.to_dict() if isinstance(tags, BloomFilter) else sorted(tags)
+            for kind, tags in self.visited.items()
+        }
+        with open(path, 'w') as f:
+            json.dump({'frontier': frontier, 'visited': visited}, f)
+
+    def load(self, path):
+        """Resumes from a checkpoint written by :meth:`save`."""
+        with open(path) as f:
+            data = json.load(f)
+        self.frontier = deque((kind, key) for kind, key in data['frontier'])
+        self.visited = {
+            kind: BloomFilter.from_dict(tags) if isinstance(tags, dict) else set(tags)
+            for kind, tags in data['visited'].items()
+        }
+
+
+async def _call(callback, *args):
+    if callback is None:
+        return
+    result = callback(*args)
+    if inspect.isawaitable(result):
+        await result
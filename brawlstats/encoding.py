@@ -0,0 +1,103 @@
+import threading
+
+__all__ = ['TransferStats', 'accept_encoding']
+
+# The encodings the API may use, best first: zstd and brotli are smaller and decode faster than gzip
+PREFERRED = ('zstd', 'br', 'gzip')
+
+
+def supported_encodings(is_async: bool) -> set:
+    """Gets the content encodings the HTTP library of the client can decode with the installed packages."""
+    if is_async:
+        try:
+            from aiohttp import compression_utils
+        except ImportError:
+            return {'gzip', 'deflate'}
+        supported = {'gzip', 'deflate'}
+        if getattr(compression_utils, 'HAS_BROTLI', False):
+            supported.add('br')
+        if getattr(compression_utils, 'HAS_ZSTD', False):
+            supported.add('zstd')
+        return supported
+
+    from urllib3.util.request import ACCEPT_ENCODING
+    return {encoding.strip() for encoding in ACCEPT_ENCODING.split(',')}
+
+
+def accept_encoding(is_async: bool) -> str:
+    """Gets the ``Accept-Encoding`` header asking for the best encoding the client can decode.
+
+    brotli and zstd are only asked for when ``brotli`` (or ``brotlicffi``) and
+    ``zstandard`` are installed, gzip always is.
+
+    Parameters
+    ----------
+    is_async : bool
+        Whether the header is for the async client (aiohttp) or the sync client (requests)
+    """
+    supported = supported_encodings(is_async)
+    return ', '.join(encoding for encoding in PREFERRED if encoding in supported or encoding == 'gzip')
+
+
+class TransferStats:
+    """Counts the bytes of the responses on the wire and once decoded, to measure the bandwidth compression saves.
+
+    Every client keeps one as its ``transfer`` attribute.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def __repr__(self):
+        return f'<TransferStats responses={self.responses} wire_bytes={self.wire_bytes}>'
+
+    def reset(self):
+        with self._lock:
+            self.responses = 0
+            self.wire_bytes = 0
+            self.decoded_bytes = 0
+            self._encodings = {}  # encoding -> [responses, wire bytes, decoded bytes]
+
+    def record(self, encoding: str, wire_bytes: int, decoded_bytes: int):
+        """Records a response.
+
+        Parameters
+        ----------
+        encoding : str
+            The ``Content-Encoding`` of the response, ``'identity'`` if it was not compressed
+        wire_bytes : int
+            The size of the body as it was sent.
+        decoded_bytes : int
+            The size of the body once decompressed.
+        """
+        with self._lock:
+            self.responses += 1
+            self.wire_bytes += wire_bytes
+            self.decoded_bytes += decoded_bytes
+            counts = self._encodings.get(encoding)
+            if counts is None:
+                counts = self._encodings[encoding] = [0, 0, 0]
+            counts[0] += 1
+            counts[1] += wire_bytes
+            counts[2] += decoded_bytes
+
+    def stats(self) -> dict:
+        """Gets the totals since the client was created or :meth:`reset`.
+
+        Returns
+        -------
+        dict
+            ``responses``, ``wire_bytes``, ``decoded_bytes``, ``savings`` (the fraction of
+            the decoded bytes that were not sent) and the same numbers for each encoding in ``encodings``
+        """
+        def summary(responses, wire_bytes, decoded_bytes):
+            return {
+                'responses': responses, 'wire_bytes': wire_bytes, 'decoded_bytes': decoded_bytes,
+                'savings': 1 - wire_bytes / decoded_bytes if decoded_bytes else 0.0
+            }
+
+        with self._lock:
+            result = summary(self.responses, self.wire_bytes, self.decoded_bytes)
+            result['encodings'] = {encoding: summary(*counts) for encoding, counts in self._encodings.items()}
+            return result
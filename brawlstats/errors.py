@@ -61,3 +61,28 @@ class ServerError(RequestError):
         self.url = url
         self.message = 'The API is down. Please be patient and try again later.'
         super().__init__(self.code, self.message)
+
+
+class RequestTimeoutError(ServerError, TimeoutError):
+    """Raised if a request or the deadline of a call times out.
+
+    It is a ``TimeoutError`` as well as a :class:`ServerError`, so timeouts can
+    be told apart from the API being down.
+    """
+
+    def __init__(self, code, url, timeout=None):
+        super().__init__(code, url)
+        self.timeout = timeout
+        self.message = f'The request timed out after {timeout} seconds.'
+
+    def __reduce__(self):
+        return type(self), (self.code, self.url, self.timeout)
+
+
+class CircuitOpenError(ServerError):
+    """Raised instead of making a request while the client's circuit breaker is open."""
+
+    def __init__(self, code, url, retry_after=0.0):
+        super().__init__(code, url)
+        self.retry_after = retry_after
+        self.message = f'The API is down. Requests are paused for {retry_after:.1f} more seconds.'
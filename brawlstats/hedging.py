@@ -0,0 +1,102 @@
+import threading
+from collections import deque
+from typing import Optional
+
+__all__ = ['HedgePolicy']
+
+
+class HedgePolicy:
+    """Decides when the async client sends a second copy of a slow request.
+
+    The latencies of recent requests are tracked per endpoint. A request that
+    has not completed after the ``percentile`` latency of its endpoint is
+    hedged: the same request is sent again and whichever response arrives
+    first is used. Every request earns ``max_ratio`` of a hedge, so at most
+    that fraction of requests are hedged over time. Hedges count against the
+    client's ``rate_limit`` like any other request.
+
+    Parameters
+    ----------
+    percentile : float, optional
+        The latency percentile after which a request is hedged, by default 95
+    max_ratio : float, optional
+        The maximum number of hedges per request, by default 0.05
+    min_delay : float, optional
+        The minimum number of seconds to wait before hedging, by default 0.01
+    samples : int, optional
+        The number of recent latencies kept per endpoint, by default 200
+    min_samples : int, optional
+        The number of latencies needed before an endpoint's requests are hedged, by default 20
+    """
+
+    def __init__(
+        self, percentile: float=95, max_ratio: float=0.05, min_delay: float=0.01,
+        samples: int=200, min_samples: int=20
+    ):
+        if not 0 < percentile < 100:
+            raise ValueError('Make sure percentile is between 0 and 100.')
+        if not 0 < max_ratio <= 1:
+            raise ValueError('Make sure max_ratio is greater than 0 and at most 1.')
+        self.percentile = percentile
+        self.max_ratio = max_ratio
+        self.min_delay = min_delay
+        self.samples = samples
+        self.min_samples = max(1, min_samples)
+
+        self.requests = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self._latencies = {}  # endpoint -> deque of seconds
+        self._delays = {}  # endpoint -> (cached delay, number of latencies since it was computed)
+        self._budget = 0.0
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return f'<HedgePolicy percentile={self.percentile} requests={self.requests} hedges={self.hedges}>'
+
+    def record(self, endpoint: str, latency: float):
+        """Records how many seconds a request to an endpoint took."""
+        with self._lock:
+            latencies = self._latencies.get(endpoint)
+            if latencies is None:
+                latencies = self._latencies[endpoint] = deque(maxlen=self.samples)
+            latencies.append(latency)
+            delay, stale = self._delays.get(endpoint, (None, 0))
+            self._delays[endpoint] = (delay, stale + 1)
+
+    def delay(self, endpoint: str) -> Optional[float]:
+        """Gets how long to wait before hedging a request to an endpoint, None if it is not hedged yet.
+
+        Also counts the request towards the hedge budget.
+        """
+        with self._lock:
+            self.requests += 1
+            self._budget = min(self._budget + self.max_ratio, max(1.0, self.max_ratio * self.samples))
+
+            latencies = self._latencies.get(endpoint, ())
+            if len(latencies) < self.min_samples:
+                return None
+            delay, stale = self._delays[endpoint]
+            # Sorting is only worth it once enough new latencies came in
+            if delay is None or stale >= max(1, len(latencies) // 16):
+                ordered = sorted(latencies)
+                delay = max(self.min_delay, ordered[min(len(ordered) - 1, int(len(ordered) * self.percentile / 100))])
+                self._delays[endpoint] = (delay, 0)
+            return delay
+
+    def allow_hedge(self) -> bool:
+        """Takes a hedge from the budget, returns False if there is none left."""
+        with self._lock:
+            if self._budget < 1 - 1e-9:  # tolerate the rounding of the added ratios
+                return False
+            self._budget -= 1
+            self.hedges += 1
+            return True
+
+    def stats(self) -> dict:
+        """Gets ``requests``, ``hedges``, ``hedge_wins`` (hedges that returned first) and ``delays`` per endpoint."""
+        with self._lock:
+            return {
+                'requests': self.requests, 'hedges': self.hedges, 'hedge_wins': self.hedge_wins,
+                'delays': {endpoint: delay for endpoint, (delay, _) in self._delays.items() if delay is not None}
+            }
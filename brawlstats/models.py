@@ -1,8 +1,23 @@
+import heapq
+import json
+import re
+import struct
+from array import array
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, NamedTuple
+
 from box import Box, BoxList
 
 from .utils import bstag
 
-__all__ = ['Player', 'Club', 'Members', 'Ranking', 'BattleLog', 'Brawlers', 'EventRotation']
+# The format of to_bytes: a header followed by the name of the model and its encoded raw data.
+# SCHEMA_VERSION changes whenever the format does, so that old bytes are rejected instead of misread.
+SCHEMA_MAGIC = b'BSM'
+SCHEMA_VERSION = 1
+SCHEMA_HEADER = struct.Struct('<3sBBB')  # magic, schema version, codec, length of the model name
+CODECS = ('json', 'msgpack')
+
+__all__ = ['Player', 'Club', 'Members', 'Ranking', 'RankingTable', 'BattleLog', 'Brawlers', 'EventRotation']
 
 
 class BaseBox:
@@ -10,12 +25,74 @@ class BaseBox:
         self.client = client
         self.from_data(data)
 
-    def from_data(self, data):
+    def from_data(self, data, lazy: bool=False):
         self.raw_data = data
-        self._boxed_data = Box(data, camel_killer_box=True)
+        if lazy:
+            # Models received from another process are often only partly read, so their Box is built on first use
+            self.__dict__.pop('_boxed_data', None)
+        else:
+            self._boxed_data = self._box(data)
         return self
 
+    @staticmethod
+    def _box(data):
+        return Box(data, camel_killer_box=True)
+
+    def __getstate__(self):
+        # Only pickle the raw data, the boxed data is rebuilt from it
+        state = self.__dict__.copy()
+        state.pop('_boxed_data', None)
+        state.pop('_indices', None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.from_data(self.raw_data, lazy=True)
+
+    def to_bytes(self, codec: str=None) -> bytes:
+        """Serializes the model to compact bytes for another process, without its client.
+
+        Only the raw data is encoded, with the name of the model and a schema version.
+        Unlike a pickle, the bytes do not need the client to be detached first, can be read
+        by other languages and do not run code when loaded. Read them back with
+        :meth:`from_bytes` of the same class.
+
+        Parameters
+        ----------
+        codec : str, optional
+            ``'msgpack'`` (requires msgpack) or ``'json'``, by default msgpack if it is installed
+        """
+        return _dump(type(self).__name__, self.raw_data, codec)
+
+    @classmethod
+    def from_bytes(cls, data: bytes):
+        """Rebuilds a model serialized by :meth:`to_bytes`.
+
+        The model has no client: set its ``client`` attribute to use methods that make requests,
+        such as :meth:`Player.get_club`. Like unpickled models, its ``Box`` is built on first use,
+        so models only read through ``raw_data`` cost no more than decoding.
+
+        Raises
+        ------
+        ValueError
+            The bytes are not a model, or were written with another schema version.
+        TypeError
+            The bytes are a model of another class.
+        """
+        name, raw_data = _load(data)
+        model = _MODELS.get(name)
+        if model is None or not issubclass(model, cls):
+            raise TypeError(f'Expected {cls.__name__}, got {name}.')
+        instance = model.__new__(model)
+        instance.client = None
+        return instance.from_data(raw_data, lazy=True)
+
     def __getattr__(self, attr):
+        if attr == '_boxed_data' and 'raw_data' in self.__dict__:
+            self._boxed_data = self._box(self.raw_data)
+            return self._boxed_data
+        if attr in ('_boxed_data', '_indices'):
+            raise AttributeError(attr)
         try:
             return getattr(self._boxed_data, attr)
         except AttributeError:
@@ -32,13 +109,95 @@ class BaseBox:
 
 
 class BaseBoxList(BaseBox):
-    def from_data(self, data):
-        self.raw_data = data
-        self._boxed_data = BoxList(data, camel_killer_box=True)
+    def from_data(self, data, lazy: bool=False):
+        super().from_data(data, lazy)
+        self._indices = {}  # lookups and sorted views, built on first use
         return self
 
+    @staticmethod
+    def _box(data):
+        return BoxList(data, camel_killer_box=True)
+
     def __len__(self):
-        return sum(1 for i in self)
+        return len(self.raw_data)
+
+    def _index(self, field, normalize=None):
+        """Maps the values of a field to the items, keeping the first item of duplicate values."""
+        index = self._indices.get(field)
+        if index is None:
+            index = {}
+            for i, item in enumerate(self.raw_data):
+                value = item.get(field)
+                if value is not None:
+                    index.setdefault(normalize(value) if normalize else value, self._boxed_data[i])
+            self._indices[field] = index
+        return index
+
+    @property
+    def by_tag(self) -> Dict[str, Box]:
+        """The items by their tag, e.g. ``members.by_tag['#V2LQY9UY']``"""
+        return self._index('tag')
+
+    @property
+    def by_name(self) -> Dict[str, Box]:
+        """The items by their lowercase name, e.g. ``brawlers.by_name['shelly']``"""
+        return self._index('name', str.lower)
+
+    @property
+    def by_id(self) -> Dict[int, Box]:
+        """The items by their ID, e.g. ``brawlers.by_id[16000000]``"""
+        return self._index('id')
+
+    def sorted_by(self, field: str='trophies', reverse: bool=True) -> List[Box]:
+        """Gets the items sorted by a field, highest first by default. The view is built once and reused.
+
+        Parameters
+        ----------
+        field : str, optional
+            The field to sort by as named by the API, by default ``'trophies'``.
+            Items without the field are last.
+        reverse : bool, optional
+            Whether to sort from highest to lowest, by default True
+
+        Returns
+        -------
+        List[Box]
+            The sorted items.
+        """
+        view = self._indices.get((field, reverse))
+        if view is None:
+            present = [i for i, item in enumerate(self.raw_data) if item.get(field) is not None]
+            present.sort(key=lambda i: self.raw_data[i][field], reverse=reverse)
+            missing = [i for i, item in enumerate(self.raw_data) if item.get(field) is None]
+            view = self._indices[(field, reverse)] = [self._boxed_data[i] for i in present + missing]
+        return view
+
+    def _rows(self) -> Iterator[dict]:
+        """Yields one flat dict per row of the columnar export."""
+        for item in self.raw_data:
+            yield _flatten(item)
+
+    def to_columns(self) -> Dict[str, list]:
+        """Gets the items as a dict of column name to list of values, built straight from the raw data.
+
+        Nested objects are flattened into dotted snake_case names such as ``club.name`` or ``icon.id``,
+        and values missing from an item are None. A :class:`BattleLog` has one row per player of every
+        battle, with the ``player.*``, ``team`` and ``is_star_player`` columns describing the player.
+
+        Returns
+        -------
+        Dict[str, list]
+            The columns, each with one value per row.
+        """
+        return _to_columns(self._rows())
+
+    def to_arrow(self):
+        """Gets the items as a ``pyarrow.Table`` with the columns of :meth:`to_columns`. Requires pyarrow."""
+        return _to_arrow(self.to_columns())
+
+    def to_pandas(self):
+        """Gets the items as a ``pandas.DataFrame`` with the columns of :meth:`to_columns`. Requires pandas."""
+        return _to_pandas(self.to_columns())
 
 
 class Members(BaseBoxList):
@@ -57,6 +216,30 @@ class BattleLog(BaseBoxList):
     def __init__(self, client, data):
         super().__init__(client, data['items'])
 
+    def _rows(self):
+        """Yields one row per player of every battle, with the battle's columns repeated in each row.
+
+        ``team`` is the index of the player's team, or of the player for modes without teams.
+        """
+        for item in self.raw_data:
+            battle = item.get('battle', {})
+            star_player = (battle.get('starPlayer') or {}).get('tag')
+            base = _flatten({k: v for k, v in item.items() if k != 'battle'})
+            # Players are flattened into their own rows, and is_star_player replaces starPlayer
+            details = {k: v for k, v in battle.items() if k not in ('teams', 'players', 'starPlayer')}
+            base.update(_flatten(details, 'battle.'))
+
+            if 'teams' in battle:
+                players = ((team, p) for team, members in enumerate(battle['teams']) for p in members)
+            else:
+                players = enumerate(battle.get('players', []))
+            for team, player in players:
+                row = dict(base)
+                row['team'] = team
+                row.update(_flatten(player, 'player.'))
+                row['is_star_player'] = player.get('tag') == star_player
+                yield row
+
 
 class Club(BaseBox):
     """A club object with all of its attributes."""
@@ -85,9 +268,10 @@ class Club(BaseBox):
 class Player(BaseBox):
     """A player object with all of its attributes."""
 
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.team_victories = self.x3vs3_victories
+    @property
+    def team_victories(self):
+        """Same as ``x3vs3_victories``."""
+        return self.x3vs3_victories
 
     def __repr__(self):
         return f"<Player object name='{self.name}' tag='{self.tag}'>"
@@ -135,6 +319,90 @@ class Ranking(BaseBoxList):
         return '<Ranking object count={}>'.format(len(self))
 
 
+class RankingEntry(NamedTuple):
+    tag: str
+    name: str
+    trophies: int
+    rank: int
+    region: str
+
+
+class RankingTable:
+    """The merged rankings of many regions, stored column by column.
+
+    Each column is a list (or an ``array`` for the integer columns) with one
+    value per entry, so the table can be built and searched without creating
+    a ``Box`` per entry.
+
+    ``errors`` maps the regions that :meth:`Client.get_rankings_all_regions`
+    could not fetch to the exception raised for them.
+    """
+
+    def __init__(self):
+        self.tag = []
+        self.name = []
+        self.trophies = array('q')
+        self.rank = array('l')
+        self.region = []
+        self.errors = {}
+
+    def __repr__(self):
+        return f'<RankingTable count={len(self)} regions={len(set(self.region))}>'
+
+    def __len__(self):
+        return len(self.tag)
+
+    def __getitem__(self, i) -> RankingEntry:
+        return RankingEntry(self.tag[i], self.name[i], self.trophies[i], self.rank[i], self.region[i])
+
+    def __iter__(self):
+        return map(RankingEntry, self.tag, self.name, self.trophies, self.rank, self.region)
+
+    def extend(self, region: str, items: Iterable[dict]):
+        """Appends the raw ``items`` of a region's ranking response."""
+        for item in items:
+            self.tag.append(item['tag'])
+            self.name.append(item['name'])
+            self.trophies.append(item['trophies'])
+            self.rank.append(item['rank'])
+            self.region.append(region)
+
+    def top(self, k: int) -> List[RankingEntry]:
+        """Gets the ``k`` entries with the most trophies across all regions, using a heap of size ``k``."""
+        return [self[i] for i in heapq.nlargest(k, range(len(self)), key=self.trophies.__getitem__)]
+
+    def to_bytes(self, codec: str=None) -> bytes:
+        """Serializes the table column by column, see :meth:`Player.to_bytes`."""
+        return _dump(type(self).__name__, self.to_columns(), codec)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'RankingTable':
+        """Rebuilds a table serialized by :meth:`to_bytes`."""
+        name, columns = _load(data)
+        if name != cls.__name__:
+            raise TypeError(f'Expected {cls.__name__}, got {name}.')
+        table = cls()
+        table.tag, table.name, table.region = columns['tag'], columns['name'], columns['region']
+        table.trophies.extend(columns['trophies'])
+        table.rank.extend(columns['rank'])
+        return table
+
+    def to_columns(self) -> Dict[str, list]:
+        """Gets the table as a dict of column name to list of values."""
+        return {
+            'tag': list(self.tag), 'name': list(self.name), 'trophies': list(self.trophies),
+            'rank': list(self.rank), 'region': list(self.region)
+        }
+
+    def to_arrow(self):
+        """Gets the table as a ``pyarrow.Table``. Requires pyarrow."""
+        return _to_arrow(self.to_columns())
+
+    def to_pandas(self):
+        """Gets the table as a ``pandas.DataFrame``. Requires pandas."""
+        return _to_pandas(self.to_columns())
+
+
 class Brawlers(BaseBoxList):
     """A list of available brawlers and information about them."""
 
@@ -145,3 +413,101 @@ class Brawlers(BaseBoxList):
 class EventRotation(BaseBoxList):
     """A list of events in the current rotation."""
     pass
+
+
+_MODELS = {model.__name__: model for model in (Player, Club, Members, Ranking, BattleLog, Brawlers, EventRotation)}
+
+
+def _msgpack():
+    try:
+        import msgpack
+    except ImportError:
+        return None
+    return msgpack
+
+
+def _dump(name, payload, codec):
+    if codec is None:
+        codec = 'json' if _msgpack() is None else 'msgpack'
+    if codec == 'msgpack':
+        msgpack = _msgpack()
+        if msgpack is None:
+            raise ImportError('msgpack is required for the msgpack codec: pip install msgpack')
+        body = msgpack.packb(payload, use_bin_type=True)
+    elif codec == 'json':
+        body = json.dumps(payload, separators=(',', ':'), ensure_ascii=False).encode()
+    else:
+        raise ValueError(f"'codec' must be one of {', '.join(map(repr, CODECS))}.")
+    name = name.encode()
+    return SCHEMA_HEADER.pack(SCHEMA_MAGIC, SCHEMA_VERSION, CODECS.index(codec), len(name)) + name + body
+
+
+def _load(data):
+    data = memoryview(data)
+    try:
+        magic, version, codec, length = SCHEMA_HEADER.unpack_from(data)
+    except struct.error:
+        raise ValueError('The data is not a serialized model.') from None
+    if magic != SCHEMA_MAGIC or codec >= len(CODECS):
+        raise ValueError('The data is not a serialized model.')
+    if version != SCHEMA_VERSION:
+        raise ValueError(f'Unsupported schema version {version}, expected {SCHEMA_VERSION}.')
+    start = SCHEMA_HEADER.size + length
+    name = bytes(data[SCHEMA_HEADER.size:start]).decode()
+    if CODECS[codec] == 'msgpack':
+        msgpack = _msgpack()
+        if msgpack is None:
+            raise ImportError('msgpack is required to read models serialized with it: pip install msgpack')
+        return name, msgpack.unpackb(data[start:], raw=False)
+    return name, json.loads(bytes(data[start:]))
+
+
+@lru_cache(maxsize=None)
+def _snake_case(key):
+    """Converts a camelCase API key to the snake_case key used by Box, e.g. trophyChange -> trophy_change"""
+    return re.sub(r'(?<=[a-z0-9])(?=[A-Z])', '_', key).lower()
+
+
+def _flatten(item, prefix=''):
+    flat = {}
+    for key, value in item.items():
+        name = prefix + _snake_case(key)
+        if isinstance(value, dict):
+            flat.update(_flatten(value, name + '.'))
+        else:
+            flat[name] = value
+    return flat
+
+
+def _to_columns(rows):
+    columns = {}
+    count = 0
+    for row in rows:
+        for name, value in row.items():
+            column = columns.get(name)
+            if column is None:
+                column = columns[name] = [None] * count
+            column.append(value)
+        count += 1
+        if len(row) != len(columns):
+            # Pad the columns this row did not have
+            for column in columns.values():
+                if len(column) < count:
+                    column.append(None)
+    return columns
+
+
+def _to_arrow(columns):
+    try:
+        import pyarrow
+    except ImportError:
+        raise ImportError('pyarrow is required for to_arrow(): pip install pyarrow') from None
+    return pyarrow.table(columns)
+
+
+def _to_pandas(columns):
+    try:
+        import pandas
+    except ImportError:
+        raise ImportError('pandas is required for to_pandas(): pip install pandas') from None
+    return pandas.DataFrame(columns)
@@ -0,0 +1,288 @@
+import asyncio
+import itertools
+import multiprocessing
+import pickle
+import queue
+import threading
+import time
+from typing import Any, Callable, Iterable, Iterator, Tuple, Union
+
+from .ratelimit import RateLimiter
+
+__all__ = ['SharedRateLimiter', 'ProcessPool']
+
+
+class SharedRateLimiter(RateLimiter):
+    """A :class:`RateLimiter` whose state lives in shared memory, so that the
+    clients of several processes together never exceed ``rate``.
+
+    It must be passed to the other processes when they are started, e.g. as an
+    argument of ``multiprocessing.Process``. Priorities are respected between
+    the requests of each process.
+
+    Parameters
+    ----------
+    rate : float
+        The maximum number of requests per second across all processes.
+    burst : int, optional
+        How many requests may be made at once after being idle, by default 1
+    reserved : float, optional
+        The fraction of ``rate`` that bulk requests may not use, by default 0
+    context : multiprocessing.context.BaseContext, optional
+        The multiprocessing context the processes are started with, by default the default context
+    """
+
+    def __init__(self, rate: float, burst: int=1, reserved: float=0.0, context=None):
+        super().__init__(rate, burst, reserved)
+        # time.monotonic is system-wide, so the theoretical arrival times can be compared across processes
+        self._state = (context or multiprocessing).Array('d', 2)
+        self._state_lock = self._state.get_lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        # The queue of waiting requests is local to every process
+        del state['_lock'], state['_waiters']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+        self._waiters = []
+
+
+class ProcessPool:
+    """Runs async clients in several worker processes to use more than one CPU core.
+
+    Every worker process runs its own async :class:`Client` with ``concurrency``
+    requests at a time. All clients share one :class:`SharedRateLimiter` so the
+    pool as a whole stays under ``rate_limit``. JSON decoding and model
+    construction happen in the workers and results are streamed back to the
+    parent as they complete.
+
+    .. code:: py
+
+        with ProcessPool('token', processes=4, rate_limit=30) as pool:
+            for tag, player in pool.map('get_player', tags):
+                ...
+
+    Parameters
+    ----------
+    token : str
+        The API Key that you can get from https://developer.brawlstars.com
+    processes : int, optional
+        The number of worker processes, by default the number of CPUs
+    rate_limit : float, optional
+        The maximum number of requests per second of the whole pool, by default None (unlimited)
+    concurrency : int, optional
+        The number of concurrent requests of every worker, by default 16
+    context : multiprocessing.context.BaseContext, optional
+        The multiprocessing context to start the workers with, by default the default context
+    **options
+        Any other option of :class:`Client`, e.g. ``base_url`` or ``timeout``
+    """
+
+    def __init__(
+        self, token: str, processes: int=None, rate_limit: float=None, concurrency: int=16, context=None, **options
+    ):
+        self.token = token
+        self.processes = processes or multiprocessing.cpu_count()
+        self.concurrency = concurrency
+        self.options = options
+        self._context = context or multiprocessing.get_context()
+        self.rate_limiter = SharedRateLimiter(rate_limit, context=self._context) if rate_limit else None
+
+        self._jobs = None
+        self._results = None
+        self._workers = []
+
+    def __repr__(self):
+        return f'<ProcessPool processes={self.processes} concurrency={self.concurrency}>'
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def start(self):
+        """Starts the worker processes."""
+        if self._workers:
+            return
+        self._jobs = self._context.Queue()
+        self._results = self._context.Queue()
+        for _ in range(self.processes):
+            worker = self._context.Process(
+                target=_worker_main,
+                args=(self.token, self.options, self.rate_limiter, self.concurrency, self._jobs, self._results),
+                daemon=True
+            )
+            worker.start()
+            self._workers.append(worker)
+
+    def close(self, timeout: float=None):
+        """Stops the worker processes once the jobs they are running are done.
+
+        Jobs that were submitted but not started, e.g. when the iteration of :meth:`map`
+        was stopped early, are dropped along with the results nobody will read.
+
+        Parameters
+        ----------
+        timeout : float, optional
+            The number of seconds after which the workers still running are terminated, by default None
+        """
+        if not self._workers:
+            return
+        _drain(self._jobs)
+        for _ in range(self.processes * self.concurrency):
+            self._jobs.put(None)
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for worker in self._workers:
+            while worker.is_alive():
+                # A worker only exits once the results it sent have been read
+                _drain(self._results)
+                worker.join(0.05)
+                if deadline is not None and time.monotonic() > deadline:
+                    worker.terminate()
+                    worker.join()
+        self._workers.clear()
+
+    def map(
+        self, func: Union[str, Callable], items: Iterable[Any], max_pending: int=None, deduplicate: bool=False
+    ) -> Iterator[Tuple[Any, Any]]:
+        """Runs ``func`` for every item in the workers and yields the results as they complete.
+
+        Parameters
+        ----------
+        func : Union[str, Callable]
+            The name of a client method called with the item, e.g. ``'get_player'``, whose model is
+            sent back. Or a module-level ``async def func(client, item)`` whose return value is sent
+            back, which lets the workers do more of the processing.
+        items : Iterable[Any]
+            The arguments of every call. They must be picklable.
+        max_pending : int, optional
+            The maximum number of submitted jobs without a result, by default 4 per concurrent request
+        deduplicate : bool, optional
+            Whether items that are submitted again while they are still pending are only run and
+            yielded once, by default False. The items must then be hashable.
+
+        Yields
+        ------
+        Tuple[Any, Any]
+            The item and its result, or the exception raised for it.
+
+        Raises
+        ------
+        RuntimeError
+            A worker process could not create its client or exited unexpectedly,
+            so the results of its jobs will never arrive.
+        """
+        self.start()
+        max_pending = max_pending or self.processes * self.concurrency * 4
+        pending = {}  # job id -> item
+        submitted = set()  # the pending items, if deduplicated
+        jobs = itertools.count()
+        items = iter(items)
+        exhausted = False
+
+        while True:
+            while not exhausted and len(pending) < max_pending:
+                try:
+                    item = next(items)
+                except StopIteration:
+                    exhausted = True
+                    break
+                if deduplicate:
+                    if item in submitted:
+                        continue
+                    submitted.add(item)
+                job = next(jobs)
+                pending[job] = item
+                self._jobs.put((job, func, item))
+
+            if not pending:
+                return
+            job, result = self._get_result()
+            item = pending.pop(job)
+            if deduplicate:
+                submitted.discard(item)
+            yield item, result
+
+    def _get_result(self):
+        """Waits for the next result, checking that the workers that would send it are still running."""
+        while True:
+            try:
+                job, result = self._results.get(timeout=1)
+            except queue.Empty:
+                # Workers only exit when closed, so the jobs of a dead worker are lost
+                for worker in self._workers:
+                    if worker.exitcode is not None:
+                        raise RuntimeError(
+                            f'A worker process exited unexpectedly with code {worker.exitcode}.'
+                        ) from None
+                continue
+            if job is None:
+                raise RuntimeError('A worker process could not create its client.') from result
+            return job, result
+
+
+def _worker_main(token, options, rate_limiter, concurrency, jobs, results):
+    asyncio.run(_worker(token, options, rate_limiter, concurrency, jobs, results))
+
+
+async def _worker(token, options, rate_limiter, concurrency, jobs, results):
+    from .core import Client
+
+    loop = asyncio.get_running_loop()
+    try:
+        client = Client(token, is_async=True, rate_limit=rate_limiter, **options)
+    except Exception as e:
+        # Tell the parent instead of leaving it waiting for results that never come
+        results.put((None, _picklable(e)))
+        return
+
+    async with client:
+        async def run():
+            while True:
+                job = await loop.run_in_executor(None, _get, jobs)
+                if job is None:
+                    return
+                job, func, item = job
+                try:
+                    if isinstance(func, str):
+                        result = await getattr(client, func)(item)
+                    else:
+                        result = await func(client, item)
+                except Exception as e:
+                    result = e
+                results.put((job, _picklable(result)))
+
+        await asyncio.gather(*(run() for _ in range(concurrency)))
+
+
+def _get(jobs):
+    while True:
+        try:
+            return jobs.get(timeout=1)
+        except queue.Empty:
+            continue
+
+
+def _drain(items):
+    while True:
+        try:
+            items.get_nowait()
+        except queue.Empty:
+            return
+
+
+def _picklable(result):
+    # Models hold a reference to the worker's client, which can not be sent to the parent
+    if hasattr(result, 'client') and hasattr(result, 'raw_data'):
+        result.client = None
+    try:
+        pickle.dumps(result)
+    except Exception as e:
+        return RuntimeError(f'Unpicklable result {result!r}: {e}')
+    return result
@@ -0,0 +1,352 @@
+import asyncio
+import heapq
+import inspect
+import logging
+import time
+from array import array
+from bisect import bisect_left
+from typing import List, Optional
+
+from box import Box
+
+from .errors import NotFoundError, RequestError
+from .models import BattleLog
+from .ratelimit import BULK
+from .utils import get_datetime, int_to_tag, tag_to_int
+
+__all__ = ['HighWaterMarks', 'BattleLogPoller', 'PollingScheduler']
+
+log = logging.getLogger(__name__)
+
+
+class HighWaterMarks:
+    """A compact mapping of player tags to the time of the newest battle seen.
+
+    Marks are kept in two sorted ``array('q')`` columns (16 bytes per tag)
+    and looked up with a binary search. New tags are buffered in a small dict
+    that is merged into the arrays once it grows past a fraction of their size,
+    so millions of tracked players only take a few dozen megabytes.
+
+    Parameters
+    ----------
+    merge_threshold : int, optional
+        The minimum number of buffered tags before merging, by default 4096
+    """
+
+    def __init__(self, merge_threshold=4096):
+        self.merge_threshold = merge_threshold
+        self._tags = array('q')
+        self._times = array('q')
+        self._pending = {}
+
+    def __repr__(self):
+        return f'<HighWaterMarks count={len(self)}>'
+
+    def __len__(self):
+        self._merge()
+        return len(self._tags)
+
+    def __contains__(self, tag):
+        return self.get(tag) is not None
+
+    def _find(self, key):
+        i = bisect_left(self._tags, key)
+        if i < len(self._tags) and self._tags[i] == key:
+            return i
+        return None
+
+    def get(self, tag) -> Optional[int]:
+        """Gets the POSIX timestamp of the newest battle seen for a tag.
+
+        Parameters
+        ----------
+        tag : Union[str, int]
+            A player tag, or its integer form from :func:`utils.tag_to_int`
+
+        Returns
+        -------
+        Optional[int]
+            The timestamp, or None if the tag has not been seen yet.
+        """
+        key = tag_to_int(tag) if isinstance(tag, str) else tag
+        if key in self._pending:
+            return self._pending[key]
+        i = self._find(key)
+        return None if i is None else self._times[i]
+
+    def set(self, tag, timestamp: int):
+        """Raises the mark of a tag to ``timestamp``. Lower timestamps are ignored."""
+        key = tag_to_int(tag) if isinstance(tag, str) else tag
+        i = self._find(key)
+        if i is not None:
+            if timestamp > self._times[i]:
+                self._times[i] = timestamp
+            return
+
+        if timestamp > self._pending.get(key, timestamp - 1):
+            self._pending[key] = timestamp
+        if len(self._pending) >= max(self.merge_threshold, len(self._tags) // 16):
+            self._merge()
+
+    def _merge(self):
+        if not self._pending:
+            return
+        tags, times = array('q'), array('q')
+        pending = sorted(self._pending.items())
+        i = j = 0
+        while i < len(self._tags) and j < len(pending):
+            if self._tags[i] < pending[j][0]:
+                tags.append(self._tags[i])
+                times.append(self._times[i])
+                i += 1
+            else:
+                tags.append(pending[j][0])
+                times.append(pending[j][1])
+                j += 1
+        tags.extend(self._tags[i:])
+        times.extend(self._times[i:])
+        tags.extend(key for key, _ in pending[j:])
+        times.extend(timestamp for _, timestamp in pending[j:])
+
+        self._tags, self._times = tags, times
+        self._pending.clear()
+
+    def save(self, path):
+        """Writes the marks to a file."""
+        self._merge()
+        with open(path, 'wb') as f:
+            array('q', [len(self._tags)]).tofile(f)
+            self._tags.tofile(f)
+            self._times.tofile(f)
+
+    @classmethod
+    def load(cls, path, **kwargs):
+        """Reads marks written by :meth:`save`."""
+        marks = cls(**kwargs)
+        with open(path, 'rb') as f:
+            count = array('q')
+            count.fromfile(f, 1)
+            marks._tags.fromfile(f, count[0])
+            marks._times.fromfile(f, count[0])
+        return marks
+
+
+class BattleLogPoller:
+    """Polls players' battle logs and only returns battles that were not seen before.
+
+    Parameters
+    ----------
+    client : Client
+        The client to fetch battle logs with. Polling bypasses the client's cache.
+    marks : HighWaterMarks, optional
+        The store of the newest battle time per tag, by default a new empty store
+    priority : str, optional
+        The priority of the polls' requests, by default the client's ``priority``
+    """
+
+    def __init__(self, client, marks: HighWaterMarks=None, priority: str=None):
+        self.client = client
+        self.marks = marks if marks is not None else HighWaterMarks()
+        self.priority = priority
+
+    def __repr__(self):
+        return f'<BattleLogPoller tracked={len(self.marks)}>'
+
+    def poll(self, tag: str) -> List[Box]:
+        """Fetches a player's battle log and returns the battles newer than the last poll.
+
+        Parameters
+        ----------
+        tag : str
+            A valid player tag.
+            Valid characters: 0289PYLQGRJCUV
+
+        Returns
+        -------
+        List[Box]
+            The new battles, newest first.
+        """
+        if self.client.is_async:
+            return self._apoll(tag)
+        return self.new_battles(tag, self.client.get_battle_logs(tag, use_cache=False, priority=self.priority))
+
+    async def _apoll(self, tag):
+        return self.new_battles(tag, await self.client.get_battle_logs(tag, use_cache=False, priority=self.priority))
+
+    def new_battles(self, tag: str, battle_log: BattleLog) -> List[Box]:
+        """Filters an already fetched battle log down to the unseen battles and advances the mark of ``tag``."""
+        key = tag_to_int(tag)
+        mark = self.marks.get(key)
+        newest = None
+        new = []
+        # The battle log is sorted newest first, so stop at the first battle already seen
+        for i, item in enumerate(battle_log.raw_data):
+            battle_time = get_datetime(item['battleTime'])
+            if mark is not None and battle_time <= mark:
+                break
+            if newest is None or battle_time > newest:
+                newest = battle_time
+            new.append(battle_log[i])
+
+        if newest is not None:
+            self.marks.set(key, newest)
+        return new
+
+
+class PollingScheduler:
+    """Continuously polls many players' battle logs with an async client.
+
+    Tags are kept in a priority queue keyed by the time their next poll is due.
+    After every poll a tag's interval is adapted to how many new battles were
+    found: it shrinks towards ``min_interval`` for active players and grows
+    towards ``max_interval`` for dormant ones. The workers pull due tags as fast
+    as the client's ``rate_limit`` allows, so pass a rate limit to the client
+    and enough workers to saturate it.
+
+    Parameters
+    ----------
+    client : Client
+        An async client, preferably created with ``rate_limit``.
+    callback : Callable[[str, List[Box]], Any]
+        Called (and awaited if it is a coroutine function) with the tag and
+        new battles of every poll that found new battles.
+    workers : int, optional
+        The number of concurrent polls, by default 16
+    min_interval : float, optional
+        The shortest interval between polls of a tag in seconds, by default 60
+    max_interval : float, optional
+        The longest interval between polls of a tag in seconds, by default 6 hours
+    target_battles : int, optional
+        The number of new battles per poll the intervals are adapted towards, by default 10
+    poller : BattleLogPoller, optional
+        The poller that tracks the newest battle per tag, by default a new poller making ``'bulk'`` requests
+    """
+
+    def __init__(
+        self, client, callback, *, workers: int=16, min_interval: float=60, max_interval: float=6 * 60 * 60,
+        target_battles: int=10, poller: BattleLogPoller=None
+    ):
+        if not client.is_async:
+            raise ValueError('PollingScheduler requires an async client.')
+        self.client = client
+        self.callback = callback
+        self.workers = workers
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.target_battles = target_battles
+        self.poller = poller or BattleLogPoller(client, priority=BULK)
+
+        self._queue = []  # (due, sequence, tag int)
+        self._intervals = {}  # tag int -> current interval
+        self._entries = {}  # tag int -> sequence of its live queue entry, older entries are skipped
+        self._sequence = 0
+        self._wakeup = asyncio.Event()
+        self._running = False
+
+    def __repr__(self):
+        return f'<PollingScheduler tracked={len(self)} workers={self.workers}>'
+
+    def __len__(self):
+        return len(self._intervals)
+
+    def _push(self, key, due):
+        self._sequence += 1
+        self._entries[key] = self._sequence
+        heapq.heappush(self._queue, (due, self._sequence, key))
+
+    def add(self, tag: str, interval: float=None, due: float=None):
+        """Starts tracking a player.
+
+        Parameters
+        ----------
+        tag : str
+            A valid player tag.
+        interval : float, optional
+            The initial interval in seconds, by default ``min_interval``
+        due : float, optional
+            The :func:`time.monotonic` time of the first poll, by default now
+        """
+        key = tag_to_int(tag)
+        if key in self._intervals:
+            return
+        self._intervals[key] = interval or self.min_interval
+        self._push(key, time.monotonic() if due is None else due)
+
+        # Wake the idle workers up so they see the new tag
+        self._wakeup.set()
+        self._wakeup = asyncio.Event()
+
+    def remove(self, tag: str):
+        """Stops tracking a player."""
+        key = tag_to_int(tag)
+        self._intervals.pop(key, None)
+        self._entries.pop(key, None)
+
+    def next_interval(self, interval: float, new_battles: int) -> float:
+        """Adapts a tag's interval to the number of new battles found by its last poll."""
+        if new_battles == 0:
+            factor = 2
+        else:
+            factor = min(2, max(0.5, self.target_battles / new_battles))
+        return min(self.max_interval, max(self.min_interval, interval * factor))
+
+    async def run(self):
+        """Polls the tracked players until :meth:`stop` is called."""
+        self._running = True
+        try:
+            await asyncio.gather(*(self._worker() for _ in range(self.workers)))
+        finally:
+            self._running = False
+
+    def stop(self):
+        """Stops the workers once their current polls are done."""
+        self._running = False
+        self._wakeup.set()
+
+    async def _worker(self):
+        while self._running:
+            if not self._queue:
+                await self._sleep(None)
+                continue
+
+            due, sequence, key = self._queue[0]
+            if self._entries.get(key) != sequence:
+                heapq.heappop(self._queue)  # removed tag, or replaced by a newer entry when re-added
+                continue
+            delay = due - time.monotonic()
+            if delay > 0:
+                await self._sleep(delay)
+                continue
+
+            heapq.heappop(self._queue)
+            await self._poll(key)
+
+    async def _sleep(self, timeout):
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _poll(self, key):
+        tag = int_to_tag(key)
+        interval = self._intervals[key]
+        try:
+            new = await self.poller.poll(tag)
+            interval = self.next_interval(interval, len(new))
+            if new:
+                result = self.callback(tag, new)
+                if inspect.isawaitable(result):
+                    await result
+        except NotFoundError:
+            log.debug(f'Stopped polling {tag}: player not found.')
+            self._intervals.pop(key, None)
+            self._entries.pop(key, None)
+        except RequestError as e:
+            log.debug(f'Polling {tag} failed: {e.code} {e.message}')
+        except Exception:
+            # A connection error or a failing callback only affects this poll
+            log.exception(f'Polling {tag} failed.')
+        finally:
+            if key in self._intervals:
+                self._intervals[key] = interval
+                self._push(key, time.monotonic() + interval)
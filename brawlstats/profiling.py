@@ -0,0 +1,138 @@
+import contextlib
+import threading
+import time
+import tracemalloc
+from typing import Dict
+
+__all__ = ['Profiler']
+
+# The stages of a call, in the order they happen
+STAGES = ('typecast', 'request', 'decode', 'model')
+
+
+class Profiler:
+    """Records the time, and optionally the memory, that each stage of a client's calls takes per endpoint.
+
+    Pass ``profile=True``, or a profiler, to the :class:`Client` to profile it. The stages are:
+
+    - ``typecast``: converting the arguments of a client method, mostly checking tags with
+      ``bstag``. It is recorded under the name of the method, e.g. ``get_player``,
+      as the endpoint is not known before the arguments are.
+    - ``request``: the HTTP request until its body is read, without waiting for the rate limit
+    - ``decode``: decoding the JSON body
+    - ``model``: building the model and its ``Box`` from the data, which is also done for cached responses
+
+    .. code:: py
+
+        client = brawlstats.Client('token', profile=brawlstats.Profiler(memory=True))
+        ...
+        print(client.profiler.report())
+
+    Parameters
+    ----------
+    memory : bool, optional
+        Whether to also measure the memory allocated by the typecast, decode and model
+        stages with ``tracemalloc``, which slows every allocation of the process down, by default False.
+        Tracing starts with the profiler and stops when it is closed.
+    """
+
+    def __init__(self, memory: bool=False):
+        self.memory = memory
+        self._lock = threading.Lock()
+        self._started_tracing = memory and not tracemalloc.is_tracing()
+        if self._started_tracing:
+            tracemalloc.start()
+        self.reset()
+
+    def __repr__(self):
+        return f'<Profiler endpoints={len(self._stages)} memory={self.memory}>'
+
+    def close(self):
+        """Stops tracing the memory allocations, if the profiler started it."""
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def reset(self):
+        with self._lock:
+            self._stages = {}  # endpoint -> stage -> [calls, seconds, max seconds, allocated bytes]
+
+    def record(self, endpoint: str, stage: str, seconds: float, allocated: int=0):
+        """Records a stage of a call.
+
+        Parameters
+        ----------
+        endpoint : str
+            The endpoint of the call, e.g. ``'players/{tag}'``
+        stage : str
+            The stage, e.g. ``'decode'``
+        seconds : float
+            How long the stage took
+        allocated : int, optional
+            The net number of bytes the stage allocated, by default 0
+        """
+        with self._lock:
+            stages = self._stages.get(endpoint)
+            if stages is None:
+                stages = self._stages[endpoint] = {}
+            counts = stages.get(stage)
+            if counts is None:
+                counts = stages[stage] = [0, 0.0, 0.0, 0]
+            counts[0] += 1
+            counts[1] += seconds
+            counts[2] = max(counts[2], seconds)
+            counts[3] += allocated
+
+    @contextlib.contextmanager
+    def measure(self, endpoint: str, stage: str):
+        """Records the time, and the memory if ``memory`` is set, of a block as a stage of a call."""
+        memory = self.memory and tracemalloc.is_tracing()
+        before = tracemalloc.get_traced_memory()[0] if memory else 0
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            allocated = tracemalloc.get_traced_memory()[0] - before if memory else 0
+            self.record(endpoint, stage, seconds, allocated)
+
+    def stats(self) -> Dict[str, Dict[str, dict]]:
+        """Gets the totals of every stage of every endpoint since the profiler was created or :meth:`reset`.
+
+        Returns
+        -------
+        Dict[str, Dict[str, dict]]
+            ``{endpoint: {stage: stats}}`` where the stats of a stage are its ``calls``, the ``total``,
+            ``mean`` and ``max`` seconds, and the net bytes ``allocated`` in total and ``allocated_per_call``
+        """
+        with self._lock:
+            return {
+                endpoint: {
+                    stage: {
+                        'calls': calls, 'total': total, 'mean': total / calls, 'max': longest,
+                        'allocated': allocated, 'allocated_per_call': allocated / calls
+                    }
+                    for stage, (calls, total, longest, allocated) in stages.items()
+                }
+                for endpoint, stages in self._stages.items()
+            }
+
+    def report(self) -> str:
+        """Gets the :meth:`stats` as a table, with the endpoints taking the most time first."""
+        stats = self.stats()
+        order = sorted(stats, key=lambda endpoint: -sum(s['total'] for s in stats[endpoint].values()))
+        width = max([len('endpoint')] + [len(endpoint) for endpoint in stats])
+        header = f'{"endpoint":<{width}} {"stage":<8} {"calls":>7} {"total ms":>10} {"mean ms":>9} {"max ms":>9}'
+        lines = [header + (f' {"KiB/call":>9}' if self.memory else '')]
+        for endpoint in order:
+            stages = stats[endpoint]
+            for stage in sorted(stages, key=lambda stage: STAGES.index(stage) if stage in STAGES else len(STAGES)):
+                s = stages[stage]
+                line = (
+                    f'{endpoint:<{width}} {stage:<8} {s["calls"]:>7} {s["total"] * 1e3:>10.1f} '
+                    f'{s["mean"] * 1e3:>9.3f} {s["max"] * 1e3:>9.3f}'
+                )
+                if self.memory:
+                    line += f' {s["allocated_per_call"] / 1024:>9.1f}'
+                lines.append(line)
+        return '\n'.join(lines)
@@ -0,0 +1,189 @@
+import asyncio
+import contextlib
+import heapq
+import threading
+import time
+
+__all__ = ['RateLimiter']
+
+INTERACTIVE = 'interactive'
+BULK = 'bulk'
+PRIORITIES = {INTERACTIVE: 0, BULK: 1}
+
+
+class RateLimiter:
+    """A thread-safe rate limiter shared by every request of a client.
+
+    Waiting requests are queued by priority: an ``'interactive'`` request is
+    always let through before any waiting ``'bulk'`` request, and requests of
+    the same priority are served in order. Bulk requests can also be kept to a
+    fraction of the rate with ``reserved``, so that interactive requests find
+    free capacity even while a crawl saturates the limit.
+
+    Parameters
+    ----------
+    rate : float
+        The maximum number of requests per second.
+    burst : int, optional
+        How many requests may be made at once after being idle, by default 1
+    reserved : float, optional
+        The fraction of ``rate`` that bulk requests may not use, by default 0
+    """
+
+    def __init__(self, rate: float, burst: int=1, reserved: float=0.0):
+        if rate <= 0:
+            raise ValueError('Make sure rate is greater than 0.')
+        if not 0 <= reserved < 1:
+            raise ValueError('Make sure reserved is at least 0 and less than 1.')
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.reserved = reserved
+        self._interval = 1 / rate
+        self._bulk_interval = 1 / (rate * (1 - reserved))
+        # Theoretical arrival times of the next request and of the next bulk request
+        self._state = [0.0, 0.0]
+        self._state_lock = contextlib.nullcontext()
+        self._lock = threading.Lock()
+        self._waiters = []  # (priority, sequence, wake)
+        self._sequence = 0
+
+    def __repr__(self):
+        return f'<RateLimiter rate={self.rate} burst={self.burst} reserved={self.reserved}>'
+
+    @property
+    def waiting(self) -> int:
+        """The number of requests waiting for a slot."""
+        return len(self._waiters)
+
+    def reserve(self) -> float:
+        """Reserves a slot ahead of any waiting request and returns how many seconds to wait before using it."""
+        with self._lock, self._state_lock:
+            now = time.monotonic()
+            tat = max(self._state[0], now)
+            self._state[0] = tat + self._interval
+        return max(0.0, tat - now - (self.burst - 1) * self._interval)
+
+    def _take(self, bulk):
+        """Takes a slot if one is free, otherwise returns how many seconds until one is."""
+        now = time.monotonic()
+        with self._state_lock:
+            tat, bulk_tat = max(self._state[0], now), max(self._state[1], now)
+            delay = tat - now - (self.burst - 1) * self._interval
+            if bulk:
+                delay = max(delay, bulk_tat - now - (self.burst - 1) * self._bulk_interval)
+            if delay > 0:
+                return delay
+            self._state[0] = tat + self._interval
+            if bulk:
+                self._state[1] = bulk_tat + self._bulk_interval
+        return 0.0
+
+    def _push(self, priority, wake):
+        if priority not in PRIORITIES:
+            raise ValueError(f"'priority' must be one of {', '.join(map(repr, PRIORITIES))}.")
+        with self._lock:
+            self._sequence += 1
+            waiter = (PRIORITIES[priority], self._sequence, wake)
+            heapq.heappush(self._waiters, waiter)
+        return waiter
+
+    def _poll(self, waiter):
+        """Takes a slot for a waiter if it is first in line. Returns 0 if it did, None if the
+        waiter is not first in line, or how many seconds until a slot is free."""
+        with self._lock:
+            if self._waiters[0] is not waiter:
+                return None
+            delay = self._take(waiter[0] == PRIORITIES[BULK])
+            if delay:
+                return delay
+            heapq.heappop(self._waiters)
+            if self._waiters:
+                self._waiters[0][2]()
+        return 0.0
+
+    def _cancel(self, waiter):
+        """Removes a waiter that gave up, letting the next one in line take over."""
+        with self._lock:
+            for i, other in enumerate(self._waiters):
+                if other is waiter:
+                    self._waiters[i] = self._waiters[-1]
+                    self._waiters.pop()
+                    heapq.heapify(self._waiters)
+                    if self._waiters:
+                        self._waiters[0][2]()
+                    return
+
+    def acquire(self, priority: str=INTERACTIVE, timeout: float=None):
+        """Blocks until a request may be made.
+
+        Parameters
+        ----------
+        priority : str, optional
+            ``'interactive'`` or ``'bulk'``, by default ``'interactive'``
+        timeout : float, optional
+            The longest time to wait in seconds, by default None (no limit)
+
+        Raises
+        ------
+        TimeoutError
+            No slot is free within ``timeout``. This is raised as soon as it is known.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        event = threading.Event()
+        waiter = self._push(priority, event.set)
+        try:
+            while True:
+                event.clear()
+                delay = self._poll(waiter)
+                if delay == 0:
+                    return
+                event.wait(_until(delay, deadline))
+        except BaseException:
+            self._cancel(waiter)
+            raise
+
+    async def aacquire(self, priority: str=INTERACTIVE, timeout: float=None):
+        """Waits until a request may be made without blocking the event loop.
+
+        Cancelling the waiting task removes it from the queue.
+
+        Parameters
+        ----------
+        priority : str, optional
+            ``'interactive'`` or ``'bulk'``, by default ``'interactive'``
+        timeout : float, optional
+            The longest time to wait in seconds, by default None (no limit)
+
+        Raises
+        ------
+        TimeoutError
+            No slot is free within ``timeout``. This is raised as soon as it is known.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        loop = asyncio.get_running_loop()
+        event = asyncio.Event()
+        waiter = self._push(priority, lambda: loop.call_soon_threadsafe(event.set))
+        try:
+            while True:
+                event.clear()
+                delay = self._poll(waiter)
+                if delay == 0:
+                    return
+                delay = _until(delay, deadline)
+                try:
+                    await asyncio.wait_for(event.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+        except BaseException:
+            self._cancel(waiter)
+            raise
+
+
+def _until(delay, deadline):
+    """Shortens a wait to the deadline. Raises TimeoutError if the deadline would pass before the wait is over."""
+    if deadline is None:
+        return delay
+    remaining = deadline - time.monotonic()
+    if remaining <= 0 or (delay is not None and delay > remaining):
+        raise TimeoutError('No request can be made before the deadline.')
+    return remaining if delay is None else delay
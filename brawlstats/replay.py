@@ -0,0 +1,380 @@
+import asyncio
+import json
+import struct
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, NamedTuple
+
+import aiohttp
+import requests
+
+from .errors import RequestError
+from .models import BattleLog, Brawlers, Club, EventRotation, Members, Player, Ranking
+
+__all__ = ['RecordedResponse', 'TrafficRecorder', 'ReplaySession', 'read_recording', 'replay']
+
+MAGIC = b'BSREC1'
+# timestamp, latency, status, url length, compressed body length
+RECORD_HEADER = struct.Struct('<ddHHI')
+
+MODELS = {
+    'players/{tag}': Player, 'players/{tag}/battlelog': BattleLog, 'clubs/{tag}': Club,
+    'clubs/{tag}/members': Members, 'brawlers': Brawlers, 'events/rotation': EventRotation
+}
+NOT_RECORDED = json.dumps({'reason': 'notFound', 'message': 'The request was not recorded'})
+
+
+class RecordedResponse(NamedTuple):
+    """A response captured by a :class:`TrafficRecorder`."""
+
+    url: str
+    timestamp: float
+    latency: float
+    status: int
+    body: bytes
+
+    @property
+    def data(self):
+        """The decoded JSON body of the response."""
+        return json.loads(self.body)
+
+
+class TrafficRecorder:
+    """Records the requests a client makes and the raw responses to a compact file.
+
+    Every record holds the URL relative to the client's base URL, the time the
+    request was made, how long the response took, its status and its
+    zlib-compressed body. Records are appended, so one file can hold the
+    traffic of several runs. Pass it as the client's ``record`` option, then
+    serve the file with :class:`ReplaySession` or :func:`replay` it.
+
+    Parameters
+    ----------
+    path : str
+        The file to append the records to.
+    level : int, optional
+        The zlib compression level of the bodies, by default 1 (the fastest)
+    """
+
+    def __init__(self, path, level=1):
+        self.path = path
+        self.level = level
+        self.count = 0
+        self._lock = threading.Lock()
+        self._file = open(path, 'ab')
+        if self._file.tell() == 0:
+            self._file.write(MAGIC)
+
+    def __repr__(self):
+        return f"<TrafficRecorder path='{self.path}' count={self.count}>"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def record(self, url: str, status: int, timestamp: float, latency: float, body):
+        """Appends a response to the recording.
+
+        Parameters
+        ----------
+        url : str
+            The requested URL relative to the base URL, e.g. ``/players/%23V2LQY9UY``
+        status : int
+            The status code of the response.
+        timestamp : float
+            The POSIX timestamp at which the request was made.
+        latency : float
+            The number of seconds until the response was read.
+        body : Union[str, bytes]
+            The raw response body.
+        """
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        url_bytes = url.encode('utf-8')
+        body = zlib.compress(body, self.level)
+        header = RECORD_HEADER.pack(timestamp, latency, status, len(url_bytes), len(body))
+        with self._lock:
+            self._file.write(header + url_bytes + body)
+            self.count += 1
+
+    def flush(self):
+        with self._lock:
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+def read_recording(path: str) -> Iterator[RecordedResponse]:
+    """Iterates over the responses of a recording in the order they were recorded.
+
+    Parameters
+    ----------
+    path : str
+        The file written by a :class:`TrafficRecorder`.
+    """
+    for response in _read_compressed(path):
+        yield response._replace(body=zlib.decompress(response.body))
+
+
+def _read_compressed(path):
+    with open(path, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f'{path} is not a traffic recording.')
+        while True:
+            header = f.read(RECORD_HEADER.size)
+            # Ignore a partially written trailing record
+            if len(header) < RECORD_HEADER.size:
+                return
+            timestamp, latency, status, url_len, body_len = RECORD_HEADER.unpack(header)
+            url = f.read(url_len)
+            body = f.read(body_len)
+            if len(body) < body_len:
+                return
+            yield RecordedResponse(url.decode('utf-8'), timestamp, latency, status, body)
+
+
+class _SyncResponse:
+    def __init__(self, url, status, text):
+        self.url = url
+        self.status_code = status
+        self.text = text
+
+
+class _AsyncResponse:
+    def __init__(self, url, status, text):
+        self.url = url
+        self.status = status
+        self._text = text
+
+    async def text(self):
+        return self._text
+
+
+class _ReplayRequest:
+    """The context manager returned by :meth:`ReplaySession.get`, sync or async like the session it stands in for."""
+
+    def __init__(self, url, latency, status, body, timeout):
+        self.url = url
+        self.latency = latency
+        self.status = status
+        self.body = body
+        self.timeout = getattr(timeout, 'total', timeout)
+
+    def _timed_out(self):
+        return self.timeout is not None and self.latency > self.timeout
+
+    def __enter__(self):
+        if self._timed_out():
+            time.sleep(self.timeout)
+            raise requests.Timeout(f'Replayed {self.url} took longer than {self.timeout}s')
+        if self.latency:
+            time.sleep(self.latency)
+        return _SyncResponse(self.url, self.status, zlib.decompress(self.body).decode('utf-8'))
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        pass
+
+    async def __aenter__(self):
+        if self._timed_out():
+            await asyncio.sleep(self.timeout)
+            raise asyncio.TimeoutError()
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return _AsyncResponse(self.url, self.status, zlib.decompress(self.body).decode('utf-8'))
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        pass
+
+
+class _Closed:
+    """Lets ``close`` be called by the sync client and awaited by the async client."""
+
+    def __await__(self):
+        return iter(())
+
+
+class ReplaySession:
+    """Serves the responses of a recording instead of making requests, for the sync and async clients.
+
+    Every URL is answered with its recorded responses in the order they were
+    recorded, repeating the last one once they run out. URLs that were not
+    recorded return a 404. Pass it, or the path of the recording, as the
+    client's ``replay`` option.
+
+    Parameters
+    ----------
+    path : str
+        The file written by a :class:`TrafficRecorder`.
+    speed : float, optional
+        How many times faster than recorded responses are served, by default 1.
+        Pass None to serve them without any delay.
+    base_url : str, optional
+        The base URL of the client, by default the API's
+    """
+
+    def __init__(self, path, speed: float=1.0, base_url: str=None):
+        self.path = path
+        self.speed = speed
+        self.base_url = base_url or 'https://api.brawlstars.com/v1'
+        self.requests = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._responses = {}  # url -> [position, [(latency, status, compressed body)]]
+        for response in _read_compressed(path):
+            responses = self._responses.setdefault(response.url, [0, []])[1]
+            responses.append((response.latency, response.status, response.body))
+
+    def __repr__(self):
+        return f"<ReplaySession path='{self.path}' urls={len(self._responses)} speed={self.speed}>"
+
+    def get(self, url, timeout=None, headers=None):
+        relative = url[len(self.base_url):] if url.startswith(self.base_url) else url
+        with self._lock:
+            self.requests += 1
+            entry = self._responses.get(relative)
+            if entry is None:
+                self.misses += 1
+                return _ReplayRequest(url, 0, 404, zlib.compress(NOT_RECORDED.encode('utf-8')), timeout)
+            position, responses = entry
+            latency, status, body = responses[position]
+            entry[0] = min(position + 1, len(responses) - 1)
+        latency = latency / self.speed if self.speed else 0
+        return _ReplayRequest(url, latency, status, body, timeout)
+
+    def close(self):
+        return _Closed()
+
+
+def _model_for(endpoint):
+    if endpoint.startswith('rankings/'):
+        return Ranking
+    return MODELS.get(endpoint)
+
+
+def _summarize(latencies, errors, lags, elapsed):
+    latencies.sort()
+
+    def percentile(p):
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))] if latencies else 0.0
+
+    return {
+        'requests': len(latencies), 'errors': errors, 'elapsed': elapsed,
+        'requests_per_second': len(latencies) / elapsed if elapsed else 0.0,
+        'p50': percentile(0.5), 'p99': percentile(0.99), 'max_lag': max(lags, default=0.0)
+    }
+
+
+def replay(client, path: str, speed: float=1.0, concurrency: int=64):
+    """Makes the recorded requests again with a client, at the pace they were recorded.
+
+    The responses are turned into models like the client's methods do and the
+    client's cache is used, so this measures the whole client on a real
+    workload. Combine it with a :class:`ReplaySession` to run without the network.
+
+    .. code:: py
+
+        report = brawlstats.replay(client, 'traffic.bsrec', speed=10)
+        # async
+        report = await brawlstats.replay(client, 'traffic.bsrec', speed=10)
+
+    Parameters
+    ----------
+    client : Client
+        The client to make the requests with.
+    path : str
+        The file written by a :class:`TrafficRecorder`.
+    speed : float, optional
+        How many times faster than recorded the requests are made, by default 1.
+        Pass None to make them as fast as possible.
+    concurrency : int, optional
+        The maximum number of requests in flight, by default 64
+
+    Returns
+    -------
+    dict
+        ``requests``, ``errors``, ``elapsed`` seconds, ``requests_per_second``, the ``p50``
+        and ``p99`` latency, and ``max_lag``, the most seconds a request was made late
+        because ``concurrency`` requests were in flight
+    """
+    recorded = [(r.timestamp, r.url) for r in _read_compressed(path)]
+    recorded.sort()
+    if client.is_async:
+        return _areplay(client, recorded, speed, concurrency)
+
+    latencies, lags = [], []
+    errors = 0
+    lock = threading.Lock()
+
+    def call(url):
+        nonlocal errors
+        start = time.perf_counter()
+        try:
+            _fetch_model(client, url)
+        except (RequestError, requests.RequestException):
+            with lock:
+                errors += 1
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency, thread_name_prefix='brawlstats-replay') as executor:
+        slots = threading.Semaphore(concurrency)
+        for due, url in _schedule(recorded, speed):
+            delay = start + due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            slots.acquire()
+            if speed:
+                lags.append(max(0.0, time.perf_counter() - start - due))
+            executor.submit(call, url).add_done_callback(lambda _: slots.release())
+    return _summarize(latencies, errors, lags, time.perf_counter() - start)
+
+
+def _schedule(recorded, speed):
+    """Yields the number of seconds after the start each request is due at, and its URL."""
+    first = recorded[0][0] if recorded else 0
+    for timestamp, url in recorded:
+        yield ((timestamp - first) / speed if speed else 0.0), url
+
+
+def _fetch_model(client, url):
+    endpoint, _ = client.api.split_url(client.api.BASE + url)
+    model = _model_for(endpoint.split('?')[0])
+    if model is None:
+        return client._request(client.api.BASE + url)
+    return client._get_model(client.api.BASE + url, model)
+
+
+async def _areplay(client, recorded, speed, concurrency):
+    latencies, lags = [], []
+    errors = 0
+    slots = asyncio.Semaphore(concurrency)
+
+    async def call(url):
+        nonlocal errors
+        begin = time.perf_counter()
+        try:
+            await _fetch_model(client, url)
+        except (RequestError, aiohttp.ClientError, asyncio.TimeoutError):
+            errors += 1
+        finally:
+            slots.release()
+        latencies.append(time.perf_counter() - begin)
+
+    start = time.perf_counter()
+    tasks = []
+    for due, url in _schedule(recorded, speed):
+        delay = start + due - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        await slots.acquire()
+        if speed:
+            lags.append(max(0.0, time.perf_counter() - start - due))
+        tasks.append(asyncio.ensure_future(call(url)))
+    await asyncio.gather(*tasks)
+    return _summarize(latencies, errors, lags, time.perf_counter() - start)
@@ -1,15 +1,45 @@
+import calendar
 import inspect
 import os
 import re
-from datetime import datetime
-from functools import wraps
-from typing import Union
+from array import array
+from datetime import datetime, timezone
+from functools import lru_cache, wraps
+from typing import Iterable, NamedTuple, Optional, Union
 
+from .brawlers import registry as brawler_registry
 from .errors import NotFoundError
 
 
+# ISO 3166-1 alpha-2 country codes accepted as a ranking region
+REGIONS = (
+    'AD', 'AE', 'AF', 'AG', 'AI', 'AL', 'AM', 'AO', 'AQ', 'AR', 'AS', 'AT', 'AU', 'AW', 'AX', 'AZ', 'BA', 'BB', 'BD',
+    'BE', 'BF', 'BG', 'BH', 'BI', 'BJ', 'BL', 'BM', 'BN', 'BO', 'BQ', 'BR', 'BS', 'BT', 'BV', 'BW', 'BY', 'BZ', 'CA',
+    'CC', 'CD', 'CF', 'CG', 'CH', 'CI', 'CK', 'CL', 'CM', 'CN', 'CO', 'CR', 'CU', 'CV', 'CW', 'CX', 'CY', 'CZ', 'DE',
+    'DJ', 'DK', 'DM', 'DO', 'DZ', 'EC', 'EE', 'EG', 'EH', 'ER', 'ES', 'ET', 'FI', 'FJ', 'FK', 'FM', 'FO', 'FR', 'GA',
+    'GB', 'GD', 'GE', 'GF', 'GG', 'GH', 'GI', 'GL', 'GM', 'GN', 'GP', 'GQ', 'GR', 'GS', 'GT', 'GU', 'GW', 'GY', 'HK',
+    'HM', 'HN', 'HR', 'HT', 'HU', 'ID', 'IE', 'IL', 'IM', 'IN', 'IO', 'IQ', 'IR', 'IS', 'IT', 'JE', 'JM', 'JO', 'JP',
+    'KE', 'KG', 'KH', 'KI', 'KM', 'KN', 'KP', 'KR', 'KW', 'KY', 'KZ', 'LA', 'LB', 'LC', 'LI', 'LK', 'LR', 'LS', 'LT',
+    'LU', 'LV', 'LY', 'MA', 'MC', 'MD', 'ME', 'MF', 'MG', 'MH', 'MK', 'ML', 'MM', 'MN', 'MO', 'MP', 'MQ', 'MR', 'MS',
+    'MT', 'MU', 'MV', 'MW', 'MX', 'MY', 'MZ', 'NA', 'NC', 'NE', 'NF', 'NG', 'NI', 'NL', 'NO', 'NP', 'NR', 'NU', 'NZ',
+    'OM', 'PA', 'PE', 'PF', 'PG', 'PH', 'PK', 'PL', 'PM', 'PN', 'PR', 'PS', 'PT', 'PW', 'PY', 'QA', 'RE', 'RO', 'RS',
+    'RU', 'RW', 'SA', 'SB', 'SC', 'SD', 'SE', 'SG', 'SH', 'SI', 'SJ', 'SK', 'SL', 'SM', 'SN', 'SO', 'SR', 'SS', 'ST',
+    'SV', 'SX', 'SY', 'SZ', 'TC', 'TD', 'TF', 'TG', 'TH', 'TJ', 'TK', 'TL', 'TM', 'TN', 'TO', 'TR', 'TT', 'TV', 'TW',
+    'TZ', 'UA', 'UG', 'UM', 'US', 'UY', 'UZ', 'VA', 'VC', 'VE', 'VG', 'VI', 'VN', 'VU', 'WF', 'WS', 'YE', 'YT', 'ZA',
+    'ZM', 'ZW'
+)
+
+
+class CacheKey(NamedTuple):
+    """The key of a response in the client's cache, which does not depend on how its url was written."""
+
+    endpoint: str
+    tag: Optional[int] = None
+    limit: Optional[int] = None  # of a ranking, smaller rankings are sliced from a cached larger one
+
+
 class API:
-    def __init__(self, base_url, version=1):
+    def __init__(self, base_url, version=1, registry=None):
         self.BASE = base_url or f'https://api.brawlstars.com/v{version}'
         self.PROFILE = self.BASE + '/players'
         self.CLUB = self.BASE + '/clubs'
@@ -22,12 +52,48 @@ class API:
         with open(os.path.join(path, '__init__.py')) as f:
             self.VERSION = re.search(r'^__version__ = [\'"]([^\'"]*)[\'"]', f.read(), re.MULTILINE).group(1)
 
-        self.CURRENT_BRAWLERS = {}
+        self.registry = registry if registry is not None else brawler_registry
+
+    @property
+    def CURRENT_BRAWLERS(self):
+        """The brawler IDs by lowercase name, from the :class:`BrawlerRegistry`."""
+        return self.registry.ids
 
     def set_brawlers(self, brawlers):
-        self.CURRENT_BRAWLERS = {b['name'].lower(): int(b['id']) for b in brawlers}
+        self.registry.update(brawlers)
 
+    def split_url(self, url):
+        """Splits a request url into its endpoint and tag, e.g.
+        ``.../players/%23V2LQY9UY/battlelog`` becomes ``('players/{tag}/battlelog', '#V2LQY9UY')``"""
+        path = url[len(self.BASE) + 1:] if url.startswith(self.BASE) else url
+        parts = path.split('/')
+        for i, part in enumerate(parts):
+            if part.startswith('%23'):
+                parts[i] = '{tag}'
+                return '/'.join(parts), '#' + part[3:]
+        return path, None
 
+    def endpoint(self, url):
+        """Gets the endpoint of a request url without its tag, region, brawler or limit, e.g.
+        ``.../rankings/FR/brawlers/16000000?limit=50`` becomes ``'rankings/{region}/brawlers/{brawler}'``"""
+        parts = self.cache_key(url).endpoint.split('/')
+        if parts[0] == 'rankings' and len(parts) > 2:
+            parts[1] = '{region}'
+            if len(parts) > 3:
+                parts[3] = '{brawler}'
+        return '/'.join(parts)
+
+    def cache_key(self, url):
+        """Gets the :class:`CacheKey` of a request url, e.g. ``.../rankings/global/players?limit=50``
+        becomes ``CacheKey('rankings/global/players', None, 50)``"""
+        endpoint, tag = self.split_url(url)
+        path, _, query = endpoint.partition('?')
+        if query.startswith('limit=') and query[6:].isdigit():
+            return CacheKey(path, None, int(query[6:]))
+        return CacheKey(endpoint, tag_to_int(tag) if tag else None)
+
+
+@lru_cache(maxsize=65536)
 def bstag(tag):
     tag = tag.strip('#').upper()
     allowed = '0289PYLQGRJCUV'
@@ -44,6 +110,82 @@ def bstag(tag):
     return tag
 
 
+TAG_CHARACTERS = '0289PYLQGRJCUV'
+TAG_VALUES = {c: i for i, c in enumerate(TAG_CHARACTERS)}
+
+
+@lru_cache(maxsize=65536)
+def tag_to_int(tag: str) -> int:
+    """Converts a player or club tag to the integer it encodes, e.g. for compact storage
+
+    Parameters
+    ----------
+    tag : str
+        A valid tag, with or without a leading ``#`` or ``%23``
+
+    Returns
+    -------
+    int
+        The integer representation of the tag
+    """
+    tag = tag.upper()
+    if tag.startswith('%23'):
+        tag = tag[3:]
+    value = 0
+    for c in tag.lstrip('#'):
+        try:
+            value = value * 14 + TAG_VALUES[c]
+        except KeyError:
+            raise NotFoundError(404, invalid_chars=[c])
+    return value
+
+
+def int_to_tag(value: int) -> str:
+    """Converts an integer created by :func:`tag_to_int` back to a tag, including the leading ``#``.
+    Tags never start with ``0`` so the conversion is lossless."""
+    chars = []
+    while True:
+        value, remainder = divmod(value, 14)
+        chars.append(TAG_CHARACTERS[remainder])
+        if not value:
+            break
+    return '#' + ''.join(reversed(chars))
+
+
+@lru_cache(maxsize=65536)
+def _parse_timestamp(timestamp):
+    """Parses a %Y%m%dT%H%M%S.%fZ timestamp by slicing, returning its fields.
+    Invalid timestamps raise ValueError like ``datetime.strptime``."""
+    error = ValueError(f'time data {timestamp!r} does not match format \'%Y%m%dT%H%M%S.%fZ\'')
+    if len(timestamp) != 20 or timestamp[8] != 'T' or timestamp[15] != '.' or timestamp[19] != 'Z':
+        raise error
+    # int() would also accept spaces, signs and non-ASCII digits
+    digits = timestamp[0:8] + timestamp[9:15] + timestamp[16:19]
+    if not (digits.isascii() and digits.isdigit()):
+        raise error
+
+    year, month, day = int(timestamp[0:4]), int(timestamp[4:6]), int(timestamp[6:8])
+    hour, minute, second = int(timestamp[9:11]), int(timestamp[11:13]), int(timestamp[13:15])
+    if not 1 <= month <= 12 or not 1 <= day <= calendar.monthrange(year, month)[1]:
+        raise error
+    if hour > 23 or minute > 59 or second > 59:
+        raise error
+    return year, month, day, hour, minute, second, int(timestamp[16:19]) * 1000
+
+
+@lru_cache(maxsize=65536)
+def _unix_timestamp(timestamp):
+    year, month, day, hour, minute, second, _ = _parse_timestamp(timestamp)
+    # Days since the epoch in the proleptic Gregorian calendar
+    year -= month <= 2
+    era = year // 400
+    year_of_era = year - era * 400
+    day_of_year = (153 * (month + (-3 if month > 2 else 9)) + 2) // 5 + day - 1
+    day_of_era = year_of_era * 365 + year_of_era // 4 - year_of_era // 100 + day_of_year
+    days = era * 146097 + day_of_era - 719468
+    return days * 86400 + hour * 3600 + minute * 60 + second
+
+
 def get_datetime(timestamp: str, unix: bool=True) -> Union[int, datetime]:
     """Converts a %Y%m%dT%H%M%S.%fZ to a UNIX timestamp or a datetime.datetime object
 
@@ -58,14 +200,28 @@ def get_datetime(timestamp: str, unix: bool=True) -> Union[int, datetime]:
     Returns
     -------
     Union[int, datetime.datetime]
-        If unix=True it will return int, otherwise datetime.datetime
+        If unix=True it will return int, otherwise a UTC datetime.datetime
     """
-    time = datetime.strptime(timestamp, '%Y%m%dT%H%M%S.%fZ')
-
     if unix:
-        return int(time.timestamp())
+        return _unix_timestamp(timestamp)
+
+    return datetime(*_parse_timestamp(timestamp), tzinfo=timezone.utc)
+
+
+def get_timestamps(timestamps: Iterable[str]) -> array:
+    """Converts many %Y%m%dT%H%M%S.%fZ timestamps to UNIX timestamps
+
+    Parameters
+    ----------
+    timestamps : Iterable[str]
+        Timestamps in the format of ``battleTime``, e.g. 20200925T184431.000Z
 
-    return time
+    Returns
+    -------
+    array.array
+        An int64 (``'q'``) array of seconds since the epoch
+    """
+    return array('q', map(_unix_timestamp, timestamps))
 
 
 def nothing(value):
@@ -73,24 +229,38 @@ def nothing(value):
     return value
 
 
+def _optional(converter):
+    """Wraps a converter so that it passes None through"""
+    @wraps(converter)
+    def convert(value):
+        return None if value is None else converter(value)
+    return convert
+
+
 def typecasted(func):
     """Decorator that converts arguments via annotations.
     Source: https://github.com/cgrok/clashroyale/blob/master/clashroyale/official_api/utils.py#L11"""
-    signature = inspect.signature(func).parameters.items()
+    signature = []
+    for param in inspect.signature(func).parameters.values():
+        converter = param.annotation
+        if converter is inspect._empty:
+            converter = nothing
+        elif param.kind is param.POSITIONAL_OR_KEYWORD and param.default is None:
+            # An explicit None keeps meaning "the default", e.g. priority=None or timeout=None
+            converter = _optional(converter)
+        signature.append((converter, param))
 
-    @wraps(func)
-    def wrapper(*args, **kwargs):
+    def convert(args, kwargs):
         args = list(args)
         new_args = []
         new_kwargs = {}
-        for _, param in signature:
-            converter = param.annotation
-            if converter is inspect._empty:
-                converter = nothing
+        for converter, param in signature:
             if param.kind is param.POSITIONAL_OR_KEYWORD:
                 if args:
                     to_conv = args.pop(0)
                     new_args.append(converter(to_conv))
+                elif param.name in kwargs:
+                    new_kwargs[param.name] = converter(kwargs[param.name])
             elif param.kind is param.VAR_POSITIONAL:
                 for a in args:
                     new_args.append(converter(a))
@@ -98,5 +268,16 @@ def typecasted(func):
                 for k, v in kwargs.items():
                     nk, nv = converter(k, v)
                     new_kwargs[nk] = nv
+        return new_args, new_kwargs
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        profiler = getattr(args[0], 'profiler', None) if args else None
+        if profiler is None:
+            new_args, new_kwargs = convert(args, kwargs)
+        else:
+            # Recorded under the method name, as the endpoint is not known before the arguments are
+            with profiler.measure(func.__name__, 'typecast'):
+                new_args, new_kwargs = convert(args, kwargs)
         return func(*new_args, **new_kwargs)
     return wrapper
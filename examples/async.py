@@ -42,6 +42,8 @@ async def main():
     battles = await client.get_battle_logs('UL0GCC8')
     print(battles[0].battle.mode)
 
+    # close the client's session once you are done
+    await client.close()
+
 # run the async loop
-loop = asyncio.get_event_loop()
-loop.run_until_complete(main())
+asyncio.run(main())
@@ -29,6 +29,10 @@ setup(
     ],
     packages=find_packages(),
     install_requires=requirements,
+    extras_require={
+        'analytics': ['numpy'],
+        'msgpack': ['msgpack'],
+    },
     python_requires='>=3.9.0',
     project_urls={
         'Source Code': 'https://github.com/SharpBit/brawlstats',
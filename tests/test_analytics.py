@@ -0,0 +1,80 @@
+import unittest
+from calendar import timegm
+from datetime import datetime
+
+import brawlstats
+import pytest
+
+np = pytest.importorskip('numpy')
+from brawlstats.analytics import BattleFrame, parse_battle_times  # noqa: E402
+
+PLAYER_TAG = '#V2LQY9UY'
+
+
+def battle(time, result, brawler, mode='gemGrab', trophy_change=8):
+    me = {'tag': PLAYER_TAG, 'name': 'a', 'brawler': {'id': 16000000 + len(brawler), 'name': brawler}}
+    other = {'tag': '#UL0GCC8', 'name': 'b', 'brawler': {'id': 16000000, 'name': 'SHELLY'}}
+    return {
+        'battleTime': time, 'event': {'mode': mode, 'map': 'Hard Rock Mine'},
+        'battle': {'mode': mode, 'result': result, 'trophyChange': trophy_change, 'teams': [[me], [other]]}
+    }
+
+
+class TestAnalytics(unittest.TestCase):
+
+    def setUp(self):
+        self.battle_log = brawlstats.BattleLog(None, {'items': [
+            battle('20200925T184431.000Z', 'victory', 'COLT'),
+            battle('20200925T183000.000Z', 'defeat', 'COLT', trophy_change=-6),
+            battle('20200925T182000.000Z', 'victory', 'BULL', mode='brawlBall'),
+            battle('20200925T181000.000Z', 'draw', 'BULL', trophy_change=0),
+            {
+                'battleTime': '20200925T180000.000Z', 'event': {'mode': 'soloShowdown', 'map': 'Skull Creek'},
+                'battle': {'mode': 'soloShowdown', 'rank': 2, 'trophyChange': 9, 'players': [
+                    {'tag': f'#{"2" * (i + 3)}', 'brawler': {'id': 16000000, 'name': 'SHELLY'}} for i in range(9)
+                ] + [{'tag': PLAYER_TAG, 'brawler': {'id': 16000001, 'name': 'COLT'}}]}
+            },
+        ]})
+
+    def test_parse_battle_times(self):
+        times = ['20200925T184431.000Z', '19991231T235959.000Z', '20240229T120000.000Z']
+        expected = [timegm(datetime.strptime(t, '%Y%m%dT%H%M%S.%fZ').timetuple()) for t in times]
+        self.assertEqual(parse_battle_times(times).tolist(), expected)
+        self.assertEqual(len(parse_battle_times([])), 0)
+        self.assertRaises(ValueError, parse_battle_times, ['2020-09-25'])
+
+        invalid = [
+            '20200925T184431.000Z0', '2020-925T184431.000Z', '20200925 184431.000Z', '20200925T184431:000Z',
+            '20200925T184431.000+', '2020092aT184431.000Z', '20201325T184431.000Z', '20200931T184431.000Z',
+            '20210229T184431.000Z', '20200925T244431.000Z', '20200925T186031.000Z'
+        ]
+        for timestamp in invalid:
+            self.assertRaises(ValueError, parse_battle_times, times + [timestamp])
+
+        # Strided arrays are copied before their code points are read
+        strings = np.array(times * 2, dtype='U20')[::2]
+        self.assertEqual(parse_battle_times(strings).tolist(), expected[:1] + expected[2:] + expected[1:2])
+
+    def test_aggregations(self):
+        frame = BattleFrame.from_battle_logs({PLAYER_TAG: self.battle_log})
+        self.assertEqual(len(frame), 5)
+
+        stats = frame.aggregate('brawler_name')
+        self.assertEqual(stats['COLT']['battles'], 3)
+        self.assertEqual(stats['COLT']['wins'], 2)
+        self.assertEqual(stats['BULL']['draws'], 1)
+        self.assertEqual(stats['BULL']['win_rate'], 1.0)
+        self.assertEqual(frame.usage()['COLT'], 0.6)
+        self.assertEqual(frame.mode_stats()[('soloShowdown', 'Skull Creek')]['wins'], 1)
+        self.assertEqual(frame.trophy_deltas(), {PLAYER_TAG: 19})
+        self.assertEqual(frame.trophy_deltas(since=frame['battle_time'][1]), {PLAYER_TAG: 2})
+
+    def test_from_columns(self):
+        expected = BattleFrame.from_battle_logs([(PLAYER_TAG, self.battle_log)])
+        frame = BattleFrame.from_columns(self.battle_log.to_columns(), PLAYER_TAG)
+        for column in BattleFrame.COLUMNS:
+            self.assertEqual(frame[column].tolist(), expected[column].tolist(), column)
+
+
+if __name__ == '__main__':
+    unittest.main()
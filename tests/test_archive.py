@@ -0,0 +1,89 @@
+import json
+import os
+import tempfile
+import unittest
+
+import brawlstats
+
+
+class TestResponseArchive(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = self.tmp.name
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_append_and_scan(self):
+        with brawlstats.ResponseArchive(self.path) as archive:
+            archive.append('players/{tag}', '#V2LQY9UY', '{"tag": "#V2LQY9UY"}')
+            archive.append('players/{tag}/battlelog', 'v2lqy9uy', '{"items": []}')
+            archive.append('brawlers', None, b'{"items": []}')
+
+        with brawlstats.ArchiveReader(self.path) as reader:
+            records = list(reader.scan())
+            self.assertEqual([r.endpoint for r in records], ['players/{tag}', 'players/{tag}/battlelog', 'brawlers'])
+            self.assertEqual(records[1].tag, '#V2LQY9UY')
+            self.assertEqual(records[0].data, {'tag': '#V2LQY9UY'})
+
+            battle_logs = list(reader.scan(endpoint='players/{tag}/battlelog', tag='#V2LQY9UY'))
+            self.assertEqual(len(battle_logs), 1)
+            self.assertEqual(battle_logs[0].data, {'items': []})
+
+    def test_segments_and_latest(self):
+        with brawlstats.ResponseArchive(self.path, segment_size=64) as archive:
+            for i in range(10):
+                archive.append('clubs/{tag}', '#UL0GCC8', f'{{"version": {i}}}')
+
+        with brawlstats.ArchiveReader(self.path) as reader:
+            self.assertEqual([r.data['version'] for r in reader.history('clubs/{tag}', '#UL0GCC8')], list(range(10)))
+            self.assertEqual(reader.latest('clubs/{tag}', '#UL0GCC8').data, {'version': 9})
+            self.assertIsNone(reader.latest('clubs/{tag}', '#2PPPPPPP'))
+
+    def test_reopen_appends(self):
+        with brawlstats.ResponseArchive(self.path) as archive:
+            archive.append('brawlers', None, '[1]')
+        with brawlstats.ResponseArchive(self.path) as archive:
+            archive.append('brawlers', None, '[2]')
+
+        with brawlstats.ArchiveReader(self.path) as reader:
+            self.assertEqual([r.data for r in reader.history('brawlers')], [[1], [2]])
+
+    def test_scan_while_appending(self):
+        with brawlstats.ResponseArchive(self.path) as archive:
+            for i in range(3):
+                archive.append('brawlers', None, f'[{i}]')
+
+            with brawlstats.ArchiveReader(self.path) as reader:
+                scan = reader.scan()
+                self.assertEqual(next(scan).data, [0])
+                # Remaps the grown segment and index while the scan still reads the old mappings
+                archive.append('brawlers', None, '[3]')
+                self.assertEqual(reader.latest('brawlers').data, [3])
+                self.assertEqual([r.data for r in scan], [[1], [2]])
+
+                # Closing the reader does not fail while a scan still holds the index
+                unfinished = reader.scan()
+                next(unfinished)
+
+    def test_client(self):
+        path = os.path.join(self.path, 'traffic.bsrec')
+        brawlers = json.dumps({'items': [{'id': 16000000, 'name': 'SHELLY', 'starPowers': [], 'gadgets': []}]})
+        with brawlstats.TrafficRecorder(path) as recorder:
+            recorder.record('/brawlers', 200, 1000.0, 0.01, brawlers)
+            recorder.record('/players/%23V2LQY9UY', 200, 1000.0, 0.01, json.dumps({'tag': '#V2LQY9UY', 'name': 'A'}))
+
+        archive = os.path.join(self.path, 'archive')
+        with brawlstats.Client('token', replay=brawlstats.ReplaySession(path, speed=None), archive=archive) as client:
+            client.get_player('#V2LQY9UY')
+            self.assertRaises(brawlstats.NotFoundError, client.get_club, '#UL0GCC8')
+
+        # Only the successful responses are archived
+        with brawlstats.ArchiveReader(archive) as reader:
+            self.assertEqual(reader.latest('players/{tag}', '#V2LQY9UY').data, {'tag': '#V2LQY9UY', 'name': 'A'})
+            self.assertIsNone(reader.latest('clubs/{tag}', '#UL0GCC8'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import os
+import tempfile
+import time
+import unittest
+
+import brawlstats
+
+BRAWLERS = [
+    {'id': 16000000, 'name': 'SHELLY', 'starPowers': [{'id': 23000076, 'name': 'SHELL SHOCK'}],
+     'gadgets': [{'id': 23000255, 'name': 'FAST FORWARD'}]},
+    {'id': 16000001, 'name': 'COLT', 'starPowers': [], 'gadgets': []}
+]
+
+
+class TestBrawlerRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.registry = brawlstats.BrawlerRegistry()
+        self.registry.update(BRAWLERS)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_lookups(self):
+        self.assertEqual(self.registry.get_id('shelly'), 16000000)
+        self.assertEqual(self.registry.get_id(16000001), 16000001)
+        self.assertEqual(self.registry.get_id('16000001'), 16000001)
+        self.assertIsNone(self.registry.get_id('spike'))
+        self.assertEqual(self.registry.name(16000001), 'COLT')
+        brawler, star_power = self.registry.star_power(23000076)
+        self.assertEqual((brawler.name, star_power.name), ('SHELLY', 'SHELL SHOCK'))
+        self.assertEqual(self.registry.gadget(23000255)[1].name, 'FAST FORWARD')
+
+    def test_snapshot(self):
+        path = os.path.join(self.tmp.name, 'brawlers.json')
+        self.registry.save(path)
+        registry = brawlstats.BrawlerRegistry(path=path, ttl=60)
+        self.assertTrue(registry.load())
+        self.assertEqual(len(registry), 2)
+        self.assertFalse(registry.stale)
+
+        registry.update(BRAWLERS, updated_at=time.time() - 120)
+        self.assertTrue(registry.stale)
+        self.assertTrue(registry.claim_refresh())
+        self.assertFalse(registry.claim_refresh())  # another client is refreshing
+
+    def test_client(self):
+        path = os.path.join(self.tmp.name, 'traffic.bsrec')
+        brawlstats.TrafficRecorder(path).close()
+        session = brawlstats.ReplaySession(path, speed=None)
+        with brawlstats.Client('token', replay=session, brawler_registry=self.registry) as client:
+            self.assertEqual(session.requests, 0)  # the brawlers are already loaded
+            self.assertIn('?limit=1', client._rankings_url('brawlers', None, 1, 'Colt')[0])
+            self.assertRaises(ValueError, client._rankings_url, 'brawlers', None, 1, 'spike')
+
+    def test_async_client_outside_loop(self):
+        self.registry.update(BRAWLERS, updated_at=time.time() - 2 * self.registry.ttl)
+        # Without a running loop the client can not refresh the stale brawlers, so it leaves the claim
+        brawlstats.Client('token', is_async=True, brawler_registry=self.registry)
+        self.assertTrue(self.registry.claim_refresh())
+
+
+if __name__ == '__main__':
+    unittest.main()
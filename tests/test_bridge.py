@@ -0,0 +1,59 @@
+import json
+import os
+import tempfile
+import threading
+import unittest
+
+import brawlstats
+
+TAGS = ['#V2LQY9UY', '#8L2P0G2J', '#2PP']
+
+
+class TestBatchClient(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        path = os.path.join(self.tmp.name, 'traffic.bsrec')
+        with brawlstats.TrafficRecorder(path) as recorder:
+            for tag in TAGS[:2]:
+                player = {'tag': tag, 'name': tag[1:], 'club': {'tag': '#UL0GCC8'}}
+                recorder.record(f'/players/%23{tag[1:]}', 200, 1000.0, 0.01, json.dumps(player))
+            recorder.record('/clubs/%23UL0GCC8', 200, 1001.0, 0.01, json.dumps({'tag': '#UL0GCC8', 'name': 'C'}))
+        self.client = brawlstats.BatchClient('token', replay=path, concurrency=2)
+
+    def tearDown(self):
+        self.client.close()
+        self.tmp.cleanup()
+
+    def test_get_players(self):
+        players = self.client.get_players(TAGS[:2])
+        self.assertEqual([p.tag for p in players], TAGS[:2])
+        self.assertIsInstance(players[0], brawlstats.Player)
+        # The models call back the BatchClient, so their methods block too
+        self.assertEqual(players[0].get_club().name, 'C')
+
+        self.assertRaises(brawlstats.NotFoundError, self.client.get_players, TAGS)
+        results = self.client.get_players(TAGS, return_exceptions=True)
+        self.assertIsInstance(results[2], brawlstats.NotFoundError)
+
+    def test_threads(self):
+        results = []
+
+        def fetch():
+            results.append(self.client.map(self.client.get_player, TAGS[:2]))
+
+        threads = [threading.Thread(target=fetch) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual([[p.name for p in players] for players in results], [['V2LQY9UY', '8L2P0G2J']] * 4)
+
+    def test_close(self):
+        self.assertEqual(self.client.get_club('#UL0GCC8').name, 'C')
+        self.client.close()
+        self.assertRaises(RuntimeError, self.client.get_club, '#UL0GCC8')
+
+
+if __name__ == '__main__':
+    unittest.main()
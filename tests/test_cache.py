@@ -0,0 +1,41 @@
+import json
+import os
+import tempfile
+import unittest
+
+import brawlstats
+from brawlstats.utils import CacheKey
+
+
+class TestCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'traffic.bsrec')
+        brawlers = json.dumps({'items': [{'id': 16000000, 'name': 'SHELLY', 'starPowers': [], 'gadgets': []}]})
+        with brawlstats.TrafficRecorder(self.path) as recorder:
+            recorder.record('/brawlers', 200, 1000.0, 0.05, brawlers)
+            ranking = {'items': [{'tag': f'#{i}', 'name': str(i), 'rank': i + 1} for i in range(200)]}
+            recorder.record('/rankings/global/players?limit=200', 200, 1003.0, 0.1, json.dumps(ranking))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_ranking_cache(self):
+        session = brawlstats.ReplaySession(self.path, speed=None)
+        with brawlstats.Client('token', replay=session) as client:
+            self.assertEqual(len(client.get_rankings(ranking='players')), 200)
+            requests = session.requests
+            ranking = client.get_rankings(ranking='players', limit=50)
+            self.assertEqual(len(ranking), 50)
+            self.assertEqual(ranking[49].rank, 50)
+            self.assertEqual(session.requests, requests)  # sliced from the cached ranking
+
+            # A smaller ranking stored later does not replace the larger cached one
+            client._store_cache(CacheKey('rankings/global/players', None, 50), {'items': ranking.raw_data})
+            self.assertEqual(len(client.get_rankings(ranking='players')), 200)
+            self.assertEqual(session.requests, requests)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,39 @@
+import unittest
+
+import brawlstats
+
+
+def member(tag, trophies, role='member'):
+    return {'tag': tag, 'name': tag[1:], 'trophies': trophies, 'role': role}
+
+
+class TestChangeTracker(unittest.TestCase):
+
+    def test_members(self):
+        tracker = brawlstats.ChangeTracker()
+        self.assertIsNone(tracker.update([member('#A', 100), member('#B', 200)], key='#CLUB'))
+        delta = tracker.update([member('#B', 250, 'senior'), member('#C', 50)], key='#CLUB')
+        self.assertEqual([m.tag for m in delta.added], ['#C'])
+        self.assertEqual([m.tag for m in delta.removed], ['#A'])
+        self.assertEqual(delta.changed, {'#B': {'trophies': (200, 250), 'role': ('member', 'senior')}})
+        self.assertEqual(delta.moved, {})
+        self.assertFalse(tracker.update([member('#B', 250, 'senior'), member('#C', 50)], key='#CLUB'))
+        self.assertRaises(ValueError, tracker.update, [])
+
+    def test_ranking(self):
+        old = [{'tag': '#A', 'trophies': 900, 'rank': 1}, {'tag': '#B', 'trophies': 800, 'rank': 2}]
+        new = [{'tag': '#B', 'trophies': 950, 'rank': 1}, {'tag': '#A', 'trophies': 900, 'rank': 2}]
+        delta = brawlstats.diff_lists(old, new)
+        self.assertEqual(delta.moved, {'#A': (1, 2), '#B': (2, 1)})
+        self.assertEqual(delta.changed, {'#B': {'trophies': (800, 950)}})
+
+    def test_club(self):
+        tracker = brawlstats.ChangeTracker()
+        tracker.update({'tag': '#CLUB', 'trophies': 300, 'members': [member('#A', 100), member('#B', 200)]})
+        delta = tracker.update({'tag': '#CLUB', 'trophies': 250, 'members': [member('#B', 200)]})
+        self.assertEqual(delta.changed, {'trophies': (300, 250)})
+        self.assertEqual([m.tag for m in delta.lists['members'].removed], ['#A'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,130 @@
+import asyncio
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+import brawlstats
+
+
+class TestCircuitBreaker(unittest.TestCase):
+
+    def test_trip_and_recover(self):
+        changes = []
+        breaker = brawlstats.CircuitBreaker(
+            failure_rate=0.5, min_requests=4, recovery_time=0.05, on_state_change=lambda *c: changes.append(c)
+        )
+        breaker.record_success()
+        breaker.record_failure()
+        breaker.record_failure()
+        self.assertEqual(breaker.state, 'closed')  # fewer than min_requests
+        breaker.record_failure()
+        self.assertEqual(breaker.state, 'open')
+        self.assertFalse(breaker.allow())
+        self.assertEqual(breaker.stats()['trips'], 1)
+
+        time.sleep(0.06)
+        self.assertEqual(breaker.state, 'half_open')
+        self.assertTrue(breaker.allow())
+        self.assertFalse(breaker.allow())  # only one probe at a time
+        with self.assertRaises(brawlstats.ServerError):
+            with breaker.track():
+                raise brawlstats.ServerError(502, 'url')
+        self.assertEqual(breaker.state, 'open')
+
+        time.sleep(0.06)
+        self.assertTrue(breaker.allow())
+        with self.assertRaises(brawlstats.NotFoundError):
+            with breaker.track():
+                raise brawlstats.NotFoundError(404)
+        self.assertEqual(breaker.state, 'closed')
+        self.assertEqual(changes[0], ('closed', 'open'))
+        self.assertEqual(changes[-1], ('half_open', 'closed'))
+
+    def test_callback_uses_breaker(self):
+        seen = []
+
+        def on_state_change(old, new):
+            # Monitoring callbacks read the breaker, which must not deadlock
+            seen.append((old, new, breaker.state, breaker.stats()['trips']))
+
+        breaker = brawlstats.CircuitBreaker(min_requests=1, recovery_time=0.05, on_state_change=on_state_change)
+        thread = threading.Thread(target=breaker.record_failure, daemon=True)
+        thread.start()
+        thread.join(5)
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(seen, [('closed', 'open', 'open', 1)])
+
+        time.sleep(0.06)
+        self.assertTrue(breaker.allow())
+        breaker.record_success()
+        self.assertEqual([change[:2] for change in seen[1:]], [('open', 'half_open'), ('half_open', 'closed')])
+
+    def test_cancelled_probe(self):
+        breaker = brawlstats.CircuitBreaker(min_requests=1, recovery_time=0)
+        breaker.record_failure()
+        self.assertTrue(breaker.allow())
+        with self.assertRaises(KeyboardInterrupt):
+            with breaker.track():
+                raise KeyboardInterrupt
+        # The probe was not made, so another one is allowed
+        self.assertTrue(breaker.allow())
+
+
+class TestClientCircuitBreaker(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'traffic.bsrec')
+        with brawlstats.TrafficRecorder(self.path) as recorder:
+            recorder.record('/players/%23V2LQY9UY', 200, 1000.0, 0.01, json.dumps({'tag': '#V2LQY9UY', 'name': 'A'}))
+            recorder.record('/players/%23V2LQY9UY', 503, 1001.0, 0.01, json.dumps({'reason': 'maintenance'}))
+            recorder.record('/clubs/%23UL0GCC8', 503, 1002.0, 0.01, json.dumps({'reason': 'maintenance'}))
+        self.registry = brawlstats.BrawlerRegistry()
+        self.registry.update([{'id': 16000000, 'name': 'SHELLY', 'starPowers': [], 'gadgets': []}])
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def client(self, session, **options):
+        breaker = brawlstats.CircuitBreaker(min_requests=2, recovery_time=60)
+        return brawlstats.Client(
+            'token', replay=session, circuit_breaker=breaker, brawler_registry=self.registry, **options
+        )
+
+    def test_open(self):
+        session = brawlstats.ReplaySession(self.path, speed=None)
+        with self.client(session) as client:
+            self.assertEqual(client.get_player('#V2LQY9UY').name, 'A')
+            self.assertRaises(brawlstats.ServerError, client.get_player, '#V2LQY9UY', use_cache=False)
+            self.assertEqual(client.circuit_breaker.state, 'open')
+
+            # While open, cached data is served even with use_cache=False and nothing else is requested
+            requests = session.requests
+            self.assertEqual(client.get_player('#V2LQY9UY', use_cache=False).name, 'A')
+            with self.assertRaises(brawlstats.CircuitOpenError) as context:
+                client.get_club('#UL0GCC8')
+            self.assertGreater(context.exception.retry_after, 0)
+            self.assertEqual(session.requests, requests)
+
+    def test_open_async(self):
+        async def main():
+            session = brawlstats.ReplaySession(self.path, speed=None)
+            async with self.client(session, is_async=True) as client:
+                self.assertEqual((await client.get_player('#V2LQY9UY')).name, 'A')
+                with self.assertRaises(brawlstats.ServerError):
+                    await client.get_player('#V2LQY9UY', use_cache=False)
+
+                requests = session.requests
+                self.assertEqual((await client.get_player('#V2LQY9UY', use_cache=False)).name, 'A')
+                with self.assertRaises(brawlstats.CircuitOpenError):
+                    await client.get_club('#UL0GCC8')
+                self.assertEqual(session.requests, requests)
+
+        asyncio.run(main())
+
+
+if __name__ == '__main__':
+    unittest.main()
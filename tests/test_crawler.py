@@ -0,0 +1,144 @@
+import asyncio
+import os
+import tempfile
+import types
+import unittest
+
+import aiohttp
+
+import brawlstats
+
+
+class FakeClient:
+    is_async = True
+
+    def __init__(self, clubs, failing=None, delay=0, error=aiohttp.ClientConnectionError):
+        self.clubs = clubs
+        self.failing = dict(failing or {})  # tag -> number of requests that fail
+        self.delay = delay
+        self.error = error
+        self.requests = []
+
+    async def get_player(self, tag, priority=None):
+        self.requests.append(tag)
+        await asyncio.sleep(self.delay)
+        if self.failing.get(tag):
+            self.failing[tag] -= 1
+            raise self.error()
+        return types.SimpleNamespace(raw_data={'tag': tag})
+
+    async def get_club(self, tag, priority=None):
+        self.requests.append(tag)
+        await asyncio.sleep(self.delay)
+        return types.SimpleNamespace(raw_data={'tag': tag, 'members': [{'tag': t} for t in self.clubs[tag]]})
+
+
+class TestCrawler(unittest.TestCase):
+
+    def setUp(self):
+        self.client = types.SimpleNamespace(is_async=True)
+
+    def test_bloom_filter(self):
+        bloom = brawlstats.BloomFilter(1000)
+        for i in range(1000):
+            bloom.add(i)
+        self.assertTrue(all(i in bloom for i in range(1000)))
+        false_positives = sum(i in bloom for i in range(1000, 11000))
+        self.assertLess(false_positives, 300)
+
+        restored = brawlstats.BloomFilter.from_dict(bloom.to_dict())
+        self.assertTrue(all(i in restored for i in range(1000)))
+
+    def test_checkpoint(self):
+        for bloom_capacity in (None, 100):
+            crawler = brawlstats.Crawler(self.client, bloom_capacity=bloom_capacity)
+            crawler.add_player('#V2LQY9UY')
+            crawler.add_player('V2LQY9UY')
+            crawler.add_club('#UL0GCC8')
+            self.assertEqual(len(crawler.frontier), 2)
+
+            with tempfile.TemporaryDirectory() as tmp:
+                path = os.path.join(tmp, 'crawl.json')
+                crawler.save(path)
+                resumed = brawlstats.Crawler(self.client)
+                resumed.load(path)
+
+            self.assertEqual(list(resumed.frontier), list(crawler.frontier))
+            resumed.add_player('#V2LQY9UY')
+            self.assertEqual(len(resumed.frontier), 2)
+
+    def test_errors(self):
+        client = FakeClient({'#UL0GCC8': ['#V2LQY9UY', '#2PP', '#8QQ']}, failing={'#V2LQY9UY': 10})
+        crawled = []
+
+        def on_player(player):
+            crawled.append(player.raw_data['tag'])
+            if player.raw_data['tag'] == '#2PP':
+                raise RuntimeError('callback failed')
+
+        crawler = brawlstats.Crawler(client, on_player=on_player, workers=2, max_retries=2, retry_delay=0.01)
+        crawler.add_club('#UL0GCC8')
+        with self.assertLogs('brawlstats.crawler', 'WARNING') as logs:
+            asyncio.run(crawler.run())
+        # The failed requests and the failing callback do not stop the crawl
+        self.assertEqual([record.levelname for record in logs.records].count('ERROR'), 1)
+        self.assertEqual(client.requests.count('#V2LQY9UY'), 3)
+        self.assertEqual(sorted(set(client.requests)), ['#2PP', '#8QQ', '#UL0GCC8', '#V2LQY9UY'])
+        self.assertEqual(sorted(crawled), ['#2PP', '#8QQ'])
+
+        # Both failed players are kept in the checkpoint
+        failed = sorted(brawlstats.utils.int_to_tag(key) for _, key in crawler.failed)
+        self.assertEqual(failed, ['#2PP', '#V2LQY9UY'])
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'crawl.json')
+            crawler.save(path)
+            resumed = brawlstats.Crawler(client)
+            resumed.load(path)
+        self.assertEqual(sorted(brawlstats.utils.int_to_tag(key) for _, key in resumed.frontier), failed)
+
+    def test_retry(self):
+        tags = ['#V2LQY9UY', '#2PP', '#8QQ']
+        client = FakeClient({}, failing={tag: 2 for tag in tags}, error=lambda: brawlstats.ServerError(503, 'url'))
+        crawled = []
+        crawler = brawlstats.Crawler(client, on_player=crawled.append, max_retries=2, retry_delay=0.01)
+        for tag in tags:
+            crawler.add_player(tag)
+
+        async def main():
+            task = asyncio.ensure_future(crawler.run())
+            await asyncio.sleep(0.005)
+            # Waiting for a retry is part of the checkpoint
+            self.assertEqual(len(crawler.frontier) + len(crawler._retrying), 3)
+            await task
+
+        asyncio.run(main())
+        self.assertEqual(len(crawled), 3)
+        self.assertEqual(len(client.requests), 9)
+        self.assertEqual(crawler.failed, [])
+        self.assertFalse(crawler.frontier)
+
+    def test_cancel(self):
+        client = FakeClient({}, delay=10)
+        crawler = brawlstats.Crawler(client, workers=2)
+        for tag in ('#V2LQY9UY', '#2PP', '#8QQ'):
+            crawler.add_player(tag)
+
+        async def main():
+            task = asyncio.ensure_future(crawler.run())
+            await asyncio.sleep(0.05)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(main())
+        # The cancelled requests are put back in front of the frontier
+        self.assertEqual(len(client.requests), 2)
+        self.assertEqual(
+            sorted(brawlstats.utils.int_to_tag(key) for _, key in crawler.frontier), ['#2PP', '#8QQ', '#V2LQY9UY']
+        )
+        self.assertEqual(crawler.frontier[-1][1], brawlstats.utils.tag_to_int('#8QQ'))
+        self.assertFalse(crawler._in_flight)
+
+
+if __name__ == '__main__':
+    unittest.main()
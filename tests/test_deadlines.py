@@ -0,0 +1,67 @@
+import asyncio
+import json
+import os
+import tempfile
+import time
+import unittest
+
+import brawlstats
+
+
+class TestDeadlines(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'traffic.bsrec')
+        brawlers = json.dumps({'items': [{'id': 16000000, 'name': 'SHELLY', 'starPowers': [], 'gadgets': []}]})
+        with brawlstats.TrafficRecorder(self.path) as recorder:
+            recorder.record('/brawlers', 200, 1000.0, 0.05, brawlers)
+            recorder.record('/players/%23V2LQY9UY', 200, 1001.0, 0.1, json.dumps({'tag': '#V2LQY9UY', 'name': 'A'}))
+            recorder.record('/players/%23V2LQY9UY', 200, 1002.0, 0.1, json.dumps({'tag': '#V2LQY9UY', 'name': 'B'}))
+            recorder.record('/clubs/%23UL0GCC8', 200, 1003.0, 5, json.dumps({'tag': '#UL0GCC8', 'members': []}))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_explicit_defaults(self):
+        with brawlstats.Client('token', replay=brawlstats.ReplaySession(self.path, speed=None)) as client:
+            player = client.get_player('#V2LQY9UY', use_cache=False, priority=None, timeout=None)
+            self.assertEqual(player.name, 'A')
+            self.assertEqual(client.get_player('#V2LQY9UY', False, None, 5).name, 'B')
+
+    def test_rate_limit_deadline(self):
+        session = brawlstats.ReplaySession(self.path, speed=None)
+        with brawlstats.Client('token', replay=session, rate_limit=1) as client:
+            client.get_player('#V2LQY9UY', use_cache=False)
+            start = time.monotonic()
+            # The next slot is a second away, after the deadline
+            with self.assertRaises(brawlstats.RequestTimeoutError):
+                client.get_player('#V2LQY9UY', use_cache=False, timeout=0.1)
+            self.assertLess(time.monotonic() - start, 0.5)
+
+        async def main():
+            async with brawlstats.Client('token', is_async=True, replay=session, rate_limit=1) as client:
+                await client.get_player('#V2LQY9UY', use_cache=False)
+                with self.assertRaises(brawlstats.RequestTimeoutError):
+                    await client.get_player('#V2LQY9UY', use_cache=False, timeout=0.1)
+
+        asyncio.run(main())
+
+    def test_slow_response_deadline(self):
+        session = brawlstats.ReplaySession(self.path)
+        with brawlstats.Client('token', replay=session) as client:
+            start = time.monotonic()
+            with self.assertRaises(brawlstats.RequestTimeoutError):
+                client.get_club('#UL0GCC8', timeout=0.1)
+            self.assertLess(time.monotonic() - start, 1)
+
+        async def main():
+            async with brawlstats.Client('token', is_async=True, replay=session) as client:
+                with self.assertRaises(brawlstats.RequestTimeoutError):
+                    await client.get_club('#UL0GCC8', timeout=0.1)
+
+        asyncio.run(main())
+
+
+if __name__ == '__main__':
+    unittest.main()
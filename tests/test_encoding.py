@@ -0,0 +1,30 @@
+import unittest
+from unittest import mock
+
+import brawlstats
+from brawlstats import encoding
+
+
+class TestEncoding(unittest.TestCase):
+
+    def test_accept_encoding(self):
+        with mock.patch.object(encoding, 'supported_encodings', return_value={'gzip', 'deflate'}):
+            self.assertEqual(brawlstats.accept_encoding(is_async=True), 'gzip')
+        with mock.patch.object(encoding, 'supported_encodings', return_value={'gzip', 'deflate', 'br', 'zstd'}):
+            self.assertEqual(brawlstats.accept_encoding(is_async=False), 'zstd, br, gzip')
+        self.assertIn('gzip', brawlstats.accept_encoding(is_async=False))
+
+    def test_transfer_stats(self):
+        transfer = brawlstats.TransferStats()
+        transfer.record('gzip', 100, 1000)
+        transfer.record('identity', 500, 500)
+        stats = transfer.stats()
+        self.assertEqual((stats['responses'], stats['wire_bytes'], stats['decoded_bytes']), (2, 600, 1500))
+        self.assertAlmostEqual(stats['savings'], 0.6)
+        self.assertAlmostEqual(stats['encodings']['gzip']['savings'], 0.9)
+        transfer.reset()
+        self.assertEqual(transfer.stats()['responses'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
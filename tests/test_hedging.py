@@ -0,0 +1,62 @@
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+
+import brawlstats
+
+
+class TestHedgePolicy(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_delay(self):
+        policy = brawlstats.HedgePolicy(percentile=90, min_samples=10)
+        for i in range(9):
+            policy.record('players/{tag}', i / 100)
+        self.assertIsNone(policy.delay('players/{tag}'))  # not enough latencies yet
+
+        for i in range(9, 100):
+            policy.record('players/{tag}', i / 100)
+        self.assertAlmostEqual(policy.delay('players/{tag}'), 0.9)
+        self.assertIsNone(policy.delay('clubs/{tag}'))
+
+    def test_budget(self):
+        policy = brawlstats.HedgePolicy(max_ratio=0.1)
+        hedges = 0
+        for _ in range(100):
+            policy.delay('players/{tag}')
+            hedges += policy.allow_hedge()
+        self.assertEqual(hedges, 10)
+        self.assertEqual(policy.stats()['hedges'], 10)
+        self.assertRaises(ValueError, brawlstats.Client, 'token', hedge=True)
+
+    def test_endpoint_latencies(self):
+        path = os.path.join(self.tmp.name, 'traffic.bsrec')
+        ranking = json.dumps({'items': [{'tag': '#V2LQY9UY', 'name': 'a', 'rank': 1}]})
+        with brawlstats.TrafficRecorder(path) as recorder:
+            recorder.record('/brawlers', 200, 1000.0, 0.01, json.dumps({'items': []}))
+            for region in ('global', 'fr', 'us'):
+                recorder.record(f'/rankings/{region}/players?limit=200', 200, 1000.0, 0.01, ranking)
+
+        async def main():
+            policy = brawlstats.HedgePolicy()
+            session = brawlstats.ReplaySession(path, speed=None)
+            async with brawlstats.Client('token', is_async=True, replay=session, hedge=policy) as client:
+                for region in ('global', 'fr', 'us'):
+                    await client.get_rankings(ranking='players', region=region)
+            return policy
+
+        policy = asyncio.run(main())
+        rankings = [endpoint for endpoint in policy._latencies if endpoint.startswith('rankings')]
+        self.assertEqual(rankings, ['rankings/{region}/players'])
+        self.assertEqual(len(policy._latencies['rankings/{region}/players']), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
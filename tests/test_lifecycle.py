@@ -0,0 +1,54 @@
+import asyncio
+import unittest
+
+from aiohttp import web
+
+import brawlstats
+from brawlstats.utils import int_to_tag
+
+
+class TestAsyncClose(unittest.TestCase):
+
+    def test_close_in_flight(self):
+        async def get_brawlers(request):
+            return web.json_response({'items': []})
+
+        async def get_player(request):
+            await asyncio.sleep(0.2)
+            return web.json_response({'tag': request.match_info['tag'], 'name': 'a'})
+
+        async def main(tags):
+            app = web.Application()
+            app.router.add_get('/v1/brawlers', get_brawlers)
+            app.router.add_get('/v1/players/{tag}', get_player)
+            runner = web.AppRunner(app)
+            await runner.setup()
+            site = web.TCPSite(runner, '127.0.0.1', 0)
+            await site.start()
+            port = runner.addresses[0][1]
+
+            try:
+                # The session is only made by the first request
+                client = brawlstats.Client(
+                    'token', is_async=True, base_url=f'http://127.0.0.1:{port}/v1',
+                    brawler_registry=brawlstats.BrawlerRegistry()
+                )
+                self.assertIsNone(client._session)
+                requests = [asyncio.ensure_future(client.get_player(tag)) for tag in tags]
+                await asyncio.sleep(0.05)
+                self.assertEqual(client._in_flight, len(tags))
+
+                await client.close()
+                self.assertTrue(all(request.done() for request in requests))
+                self.assertTrue(client.session.closed)
+                return [request.result() for request in requests]
+            finally:
+                await runner.cleanup()
+
+        tags = [int_to_tag(i) for i in range(1000, 1005)]
+        players = asyncio.run(main(tags))
+        self.assertEqual([player.tag for player in players], tags)
+
+
+if __name__ == '__main__':
+    unittest.main()
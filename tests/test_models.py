@@ -0,0 +1,97 @@
+import pickle
+import unittest
+
+import brawlstats
+from brawlstats.models import _msgpack
+
+
+def ranking_items(prefix, trophies):
+    return [
+        {'tag': f'#{prefix}{"2" * (i + 2)}', 'name': f'{prefix}{i}', 'trophies': t, 'rank': i + 1}
+        for i, t in enumerate(trophies)
+    ]
+
+
+class TestModels(unittest.TestCase):
+
+    def test_ranking_table(self):
+        table = brawlstats.RankingTable()
+        table.extend('US', ranking_items('P', [900, 500, 100]))
+        table.extend('FR', ranking_items('Y', [950, 400]))
+
+        self.assertEqual(len(table), 5)
+        self.assertEqual(table[3].region, 'FR')
+        self.assertEqual([(e.region, e.trophies) for e in table.top(3)], [('FR', 950), ('US', 900), ('US', 500)])
+        self.assertEqual(table.to_columns()['rank'], [1, 2, 3, 1, 2])
+        self.assertEqual(len(list(table)), 5)
+
+    def test_pickle(self):
+        player = brawlstats.Player(None, {'tag': '#V2LQY9UY', 'name': 'a', '3vs3Victories': 5, 'club': {}})
+        player = pickle.loads(pickle.dumps(player))
+        self.assertEqual(player.name, 'a')
+        self.assertEqual(player.team_victories, 5)
+
+    def test_to_bytes(self):
+        player = brawlstats.Player(None, {'tag': '#V2LQY9UY', 'name': 'é', '3vs3Victories': 5, 'club': {}})
+        codecs = ['json'] + (['msgpack'] if _msgpack() is not None else [])
+        for codec in codecs:
+            loaded = brawlstats.Player.from_bytes(player.to_bytes(codec))
+            self.assertEqual((loaded.name, loaded.team_victories), ('é', 5))
+            self.assertIsNone(loaded.client)
+
+        ranking = brawlstats.Ranking(None, {'items': ranking_items('P', [900, 500])})
+        self.assertEqual(brawlstats.Ranking.from_bytes(ranking.to_bytes()).by_tag['#P22'].trophies, 900)
+        self.assertRaises(TypeError, brawlstats.Club.from_bytes, player.to_bytes())
+        self.assertRaises(ValueError, brawlstats.Player.from_bytes, b'{"tag": "#V2LQY9UY"}')
+        self.assertRaises(ValueError, brawlstats.Player.from_bytes, player.to_bytes()[:3] + b'\xff' + b'\0' * 4)
+
+        table = brawlstats.RankingTable()
+        table.extend('US', ranking_items('P', [900, 500]))
+        self.assertEqual(list(brawlstats.RankingTable.from_bytes(table.to_bytes())), list(table))
+
+    def test_indices(self):
+        ranking = brawlstats.Ranking(None, {'items': ranking_items('P', [500, 900, 100])})
+        self.assertEqual(len(ranking), 3)
+        self.assertEqual(ranking.by_tag[ranking[1].tag].trophies, 900)
+        self.assertEqual([item.trophies for item in ranking.sorted_by('trophies')], [900, 500, 100])
+        self.assertIs(ranking.sorted_by('trophies'), ranking.sorted_by('trophies'))
+
+        brawlers = brawlstats.Brawlers(None, {'items': [{'id': 16000000, 'name': 'SHELLY'}]})
+        self.assertEqual(brawlers.by_name['shelly'].id, 16000000)
+        self.assertEqual(brawlers.by_id[16000000].name, 'SHELLY')
+        self.assertNotIn('colt', brawlers.by_name)
+
+    def test_to_columns(self):
+        members = brawlstats.Members(None, {'items': [
+            {'tag': '#V2LQY9UY', 'name': 'a', 'nameColor': '0xffffffff', 'trophies': 100, 'icon': {'id': 1}},
+            {'tag': '#UL0GCC8', 'name': 'b', 'trophies': 50, 'icon': {'id': 2}},
+        ]})
+        columns = members.to_columns()
+        self.assertEqual(columns['icon.id'], [1, 2])
+        self.assertEqual(columns['name_color'], ['0xffffffff', None])
+
+        player = {'tag': '#V2LQY9UY', 'name': 'a', 'brawler': {'id': 16000000, 'name': 'SHELLY'}}
+        battle_log = brawlstats.BattleLog(None, {'items': [
+            {
+                'battleTime': '20200925T184431.000Z', 'event': {'mode': 'gemGrab'},
+                'battle': {
+                    'result': 'victory', 'trophyChange': 8, 'starPlayer': player,
+                    'teams': [[player], [{'tag': '#UL0GCC8', 'name': 'b', 'brawler': {'id': 16000001}}]]
+                }
+            },
+            {
+                'battleTime': '20200925T183000.000Z', 'event': {'mode': 'soloShowdown'},
+                'battle': {'rank': 3, 'players': [player, player, player]}
+            }
+        ]})
+        columns = battle_log.to_columns()
+        self.assertEqual(columns['team'], [0, 1, 0, 1, 2])
+        self.assertEqual(columns['player.brawler.id'][:2], [16000000, 16000001])
+        self.assertEqual(columns['is_star_player'], [True, False, False, False, False])
+        self.assertEqual(columns['battle.trophy_change'], [8, 8, None, None, None])
+        self.assertEqual(columns['battle.rank'], [None, None, 3, 3, 3])
+        self.assertEqual(columns['event.mode'][-1], 'soloShowdown')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import json
+import os
+import tempfile
+import time
+import unittest
+
+import brawlstats
+
+
+async def payload(client, item):
+    return b'x' * 100000  # larger than a pipe's buffer, so unread results block the worker
+
+
+async def echo(client, item):
+    return item
+
+
+async def crash(client, item):
+    os._exit(3)
+
+
+class TestProcessPool(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'traffic.bsrec')
+        brawlers = json.dumps({'items': [{'id': 16000000, 'name': 'SHELLY', 'starPowers': [], 'gadgets': []}]})
+        with brawlstats.TrafficRecorder(self.path) as recorder:
+            recorder.record('/brawlers', 200, 1000.0, 0.01, brawlers)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_close_after_early_stop(self):
+        pool = brawlstats.ProcessPool('token', processes=2, concurrency=2, replay=self.path)
+        results = pool.map(payload, range(100))
+        item, result = next(results)
+        self.assertEqual(len(result), 100000)
+
+        start = time.monotonic()
+        pool.close(timeout=30)
+        self.assertLess(time.monotonic() - start, 10)
+        self.assertEqual(pool._workers, [])
+
+    def test_duplicates(self):
+        with brawlstats.ProcessPool('token', processes=1, concurrency=2, replay=self.path) as pool:
+            results = list(pool.map(echo, [1, 1, [2], [2]]))
+            self.assertEqual(sorted(map(str, (result for _, result in results))), ['1', '1', '[2]', '[2]'])
+            results = list(pool.map(echo, [1, 1, 2], max_pending=3, deduplicate=True))
+            self.assertEqual(sorted(result for _, result in results), [1, 2])
+
+    def test_worker_errors(self):
+        pool = brawlstats.ProcessPool('token', processes=1, priority='urgent', replay=self.path)
+        with self.assertRaises(RuntimeError) as context:
+            list(pool.map('get_player', ['#V2LQY9UY']))
+        self.assertIsInstance(context.exception.__cause__, ValueError)
+        pool.close(timeout=10)
+
+        pool = brawlstats.ProcessPool('token', processes=1, replay=self.path)
+        with self.assertRaises(RuntimeError):
+            list(pool.map(crash, [1]))
+        pool.close(timeout=10)
+
+    def test_close_unstarted(self):
+        brawlstats.ProcessPool('token', processes=1).close()
+
+
+if __name__ == '__main__':
+    unittest.main()
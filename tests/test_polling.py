@@ -0,0 +1,144 @@
+import asyncio
+import collections
+import os
+import tempfile
+import types
+import unittest
+
+import aiohttp
+
+import brawlstats
+from brawlstats.utils import int_to_tag, tag_to_int
+
+
+def battle_log(*times):
+    return brawlstats.BattleLog(None, {'items': [{'battleTime': t, 'battle': {'result': 'victory'}} for t in times]})
+
+
+class FakePoller:
+
+    def __init__(self, errors=None, battles=()):
+        self.errors = errors or {}
+        self.battles = list(battles)
+        self.polls = collections.Counter()
+
+    async def poll(self, tag):
+        self.polls[tag] += 1
+        if tag in self.errors:
+            raise self.errors[tag]
+        return self.battles
+
+
+class TestBattleLogPoller(unittest.TestCase):
+
+    PLAYER_TAG = '#V2LQY9UY'
+
+    def test_tag_to_int(self):
+        self.assertEqual(int_to_tag(tag_to_int(self.PLAYER_TAG)), self.PLAYER_TAG)
+        self.assertEqual(tag_to_int('%23V2LQY9UY'), tag_to_int('v2lqy9uy'))
+        self.assertRaises(brawlstats.NotFoundError, tag_to_int, 'AAA')
+
+    def test_high_water_marks(self):
+        marks = brawlstats.HighWaterMarks(merge_threshold=2)
+        for i in range(10):
+            marks.set(i * 7, i)
+        marks.set(14, 100)
+        marks.set(14, 50)
+        marks.set(self.PLAYER_TAG, 5)
+
+        self.assertEqual(len(marks), 11)
+        self.assertEqual(marks.get(14), 100)
+        self.assertEqual(marks.get(self.PLAYER_TAG), 5)
+        self.assertIsNone(marks.get(1))
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'marks')
+            marks.save(path)
+            loaded = brawlstats.HighWaterMarks.load(path)
+        self.assertEqual(loaded.get(14), 100)
+        self.assertIn(self.PLAYER_TAG, loaded)
+
+    def test_new_battles(self):
+        poller = brawlstats.BattleLogPoller(None)
+        first = battle_log('20200925T184431.000Z', '20200925T183000.000Z')
+        self.assertEqual(len(poller.new_battles(self.PLAYER_TAG, first)), 2)
+        self.assertEqual(poller.new_battles(self.PLAYER_TAG, first), [])
+
+        second = battle_log('20200925T190000.000Z', '20200925T184431.000Z', '20200925T183000.000Z')
+        new = poller.new_battles(self.PLAYER_TAG, second)
+        self.assertEqual([b.battle_time for b in new], ['20200925T190000.000Z'])
+
+    def test_scheduler_intervals(self):
+        client = types.SimpleNamespace(is_async=True)
+        scheduler = brawlstats.PollingScheduler(client, print, min_interval=60, max_interval=3600, target_battles=10)
+        self.assertEqual(scheduler.next_interval(600, 0), 1200)
+        self.assertEqual(scheduler.next_interval(600, 20), 300)
+        self.assertEqual(scheduler.next_interval(600, 10), 600)
+        self.assertEqual(scheduler.next_interval(60, 25), 60)
+        self.assertEqual(scheduler.next_interval(3000, 0), 3600)
+
+        scheduler.add(self.PLAYER_TAG)
+        scheduler.add(self.PLAYER_TAG)
+        self.assertEqual(len(scheduler), 1)
+        scheduler.remove(self.PLAYER_TAG)
+        self.assertEqual(len(scheduler), 0)
+        self.assertRaises(ValueError, brawlstats.PollingScheduler, types.SimpleNamespace(is_async=False), print)
+
+    def test_scheduler_readd(self):
+        poller = FakePoller()
+
+        async def main():
+            scheduler = brawlstats.PollingScheduler(
+                types.SimpleNamespace(is_async=True), print, workers=4, min_interval=0.05, max_interval=0.05,
+                poller=poller
+            )
+            scheduler.add(self.PLAYER_TAG)
+            scheduler.remove(self.PLAYER_TAG)
+            scheduler.add(self.PLAYER_TAG)
+            task = asyncio.ensure_future(scheduler.run())
+            await asyncio.sleep(0.22)
+            scheduler.stop()
+            await task
+            return scheduler
+
+        scheduler = asyncio.run(main())
+        # The entry queued by the first add is skipped, so the tag is polled once per interval
+        self.assertTrue(2 <= poller.polls[self.PLAYER_TAG] <= 5)
+        self.assertEqual(len(scheduler), 1)
+
+    def test_scheduler_errors(self):
+        failing, raising, working = '#V2LQY9UY', '#UL0GCC8', '#2PP'
+        poller = FakePoller(errors={failing: aiohttp.ClientConnectionError()}, battles=['battle'])
+        found = collections.Counter()
+
+        def callback(tag, new):
+            found[tag] += 1
+            if tag == raising:
+                raise RuntimeError('callback failed')
+
+        async def main():
+            scheduler = brawlstats.PollingScheduler(
+                types.SimpleNamespace(is_async=True), callback, workers=2, min_interval=0.05, max_interval=0.05,
+                poller=poller
+            )
+            for tag in (failing, raising, working):
+                scheduler.add(tag)
+            task = asyncio.ensure_future(scheduler.run())
+            await asyncio.sleep(0.17)
+            scheduler.stop()
+            await task
+            return scheduler
+
+        with self.assertLogs('brawlstats.polling', 'ERROR'):
+            scheduler = asyncio.run(main())
+        # Every tag keeps being polled after its connection error or callback error
+        for tag in (failing, raising, working):
+            self.assertGreaterEqual(poller.polls[tag], 2)
+        self.assertGreaterEqual(found[raising], 2)
+        self.assertEqual(found[failing], 0)
+        self.assertEqual(len(scheduler), 3)
+        self.assertEqual(len(scheduler._entries), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import json
+import os
+import tempfile
+import unittest
+
+import brawlstats
+from brawlstats.utils import API
+
+
+class TestProfiler(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_client(self):
+        path = os.path.join(self.tmp.name, 'traffic.bsrec')
+        brawlers = json.dumps({'items': [{'id': 16000000, 'name': 'SHELLY', 'starPowers': [], 'gadgets': []}]})
+        with brawlstats.TrafficRecorder(path) as recorder:
+            recorder.record('/brawlers', 200, 1000.0, 0.01, brawlers)
+            recorder.record('/players/%23V2LQY9UY', 200, 1000.0, 0.01, json.dumps({'tag': '#V2LQY9UY', 'name': 'A'}))
+
+        with brawlstats.Client('token', replay=brawlstats.ReplaySession(path, speed=None), profile=True) as client:
+            client.get_player('#V2LQY9UY')
+            client.get_player('#V2LQY9UY')  # cached, so only the model is built
+            stats = client.profiler.stats()
+
+        self.assertEqual({stage: s['calls'] for stage, s in stats['players/{tag}'].items()},
+                         {'request': 1, 'decode': 1, 'model': 2})
+        self.assertEqual(stats['get_player']['typecast']['calls'], 2)
+        self.assertIn('players/{tag}', client.profiler.report())
+
+    def test_memory(self):
+        profiler = brawlstats.Profiler(memory=True)
+        try:
+            with profiler.measure('players/{tag}', 'decode'):
+                data = [bytearray(1024) for _ in range(100)]
+        finally:
+            profiler.close()
+        self.assertGreater(profiler.stats()['players/{tag}']['decode']['allocated'], 100 * 1024)
+        self.assertEqual(len(data), 100)
+
+    def test_endpoint(self):
+        api = API(None)
+        self.assertEqual(api.endpoint(f'{api.RANKINGS}/FR/brawlers/16000000?limit=50'),
+                         'rankings/{region}/brawlers/{brawler}')
+        self.assertEqual(api.endpoint(f'{api.PROFILE}/%23V2LQY9UY/battlelog'), 'players/{tag}/battlelog')
+
+
+if __name__ == '__main__':
+    unittest.main()
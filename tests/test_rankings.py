@@ -0,0 +1,101 @@
+import asyncio
+import json
+import os
+import tempfile
+import threading
+import unittest
+
+import brawlstats
+from brawlstats.core import MAX_CONCURRENT_REGIONS
+from brawlstats.replay import ReplaySession
+from brawlstats.utils import REGIONS
+
+
+class TestRankings(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_rankings_all_regions(self):
+        path = os.path.join(self.tmp.name, 'rankings.bsrec')
+        regions = ['global', 'fr', 'us', 'de']
+        ranking = {'items': [{'tag': '#V2LQY9UY', 'name': 'a', 'trophies': 50000, 'rank': 1}]}
+        with brawlstats.TrafficRecorder(path) as recorder:
+            recorder.record('/brawlers', 200, 1000.0, 0.01, json.dumps({'items': []}))
+            for region in ('global', 'de'):
+                recorder.record(f'/rankings/{region}/players?limit=200', 200, 1000.0, 0.01, json.dumps(ranking))
+            recorder.record('/rankings/fr/players?limit=200', 503, 1000.0, 0.01, json.dumps({'reason': 'down'}))
+            for region in REGIONS:
+                recorder.record(f'/rankings/{region}/clubs?limit=200', 200, 1000.0, 0.02, json.dumps(ranking))
+        # 'us' was not recorded, so it is not found and skipped
+
+        def check(table):
+            self.assertEqual(table.region, ['global', 'de'])
+            self.assertEqual(list(table.errors), ['fr'])
+            self.assertIsInstance(table.errors['fr'], brawlstats.ServerError)
+
+        class CountingSession(ReplaySession):
+            in_flight = most = 0
+
+            def get(self, url, timeout=None, headers=None):
+                return CountingRequest(self, super().get(url, timeout, headers))
+
+        class CountingRequest:
+
+            def __init__(self, session, request):
+                self.session = session
+                self.request = request
+
+            def __enter__(self):
+                with self.session._lock:
+                    self.session.in_flight += 1
+                    self.session.most = max(self.session.most, self.session.in_flight)
+                return self.request.__enter__()
+
+            def __exit__(self, *exc_info):
+                with self.session._lock:
+                    self.session.in_flight -= 1
+
+            async def __aenter__(self):
+                self.session.in_flight += 1
+                self.session.most = max(self.session.most, self.session.in_flight)
+                return await self.request.__aenter__()
+
+            async def __aexit__(self, *exc_info):
+                self.session.in_flight -= 1
+
+        session = CountingSession(path)
+        with brawlstats.Client('token', replay=session) as client:
+            check(client.get_rankings_all_regions('players', regions=regions))
+            self.assertEqual(len(client.get_rankings_all_regions('clubs')), len(REGIONS))
+        self.assertEqual(session.most, MAX_CONCURRENT_REGIONS)
+
+        # Called from the threads of map, the regions are not queued behind them
+        with brawlstats.Client('token', replay=ReplaySession(path), max_workers=2) as client:
+            results = []
+            thread = threading.Thread(target=lambda: results.extend(client.map(
+                lambda ranking: client.get_rankings_all_regions(ranking, regions=['DE', 'GB']),
+                ['players', 'clubs']
+            )), daemon=True)
+            thread.start()
+            thread.join(10)
+            self.assertFalse(thread.is_alive())
+            self.assertEqual([len(table) for table in results], [0, 2])  # only the clubs rankings were recorded
+
+        async def main():
+            session = CountingSession(path)
+            async with brawlstats.Client('token', is_async=True, replay=session) as client:
+                check(await client.get_rankings_all_regions('players', regions=regions))
+                self.assertEqual(len(await client.get_rankings_all_regions('clubs')), len(REGIONS))
+            return session
+
+        # Every region is fetched, but no more than MAX_CONCURRENT_REGIONS at once without a rate limit
+        session = asyncio.run(main())
+        self.assertEqual(session.most, MAX_CONCURRENT_REGIONS)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import asyncio
+import multiprocessing
+import time
+import unittest
+
+import brawlstats
+
+
+class TestRateLimiter(unittest.TestCase):
+
+    def test_reserve(self):
+        limiter = brawlstats.RateLimiter(10, burst=2)
+        delays = [limiter.reserve() for _ in range(4)]
+        self.assertEqual(delays[:2], [0, 0])
+        self.assertAlmostEqual(delays[2], 0.1, places=2)
+        self.assertAlmostEqual(delays[3], 0.2, places=2)
+
+    def test_priorities(self):
+        limiter = brawlstats.RateLimiter(100)
+        order = []
+
+        async def acquire(name, priority):
+            await limiter.aacquire(priority)
+            order.append(name)
+
+        async def main():
+            limiter.reserve()  # take the free slot so that every request below has to wait
+            tasks = [asyncio.ensure_future(acquire(f'bulk{i}', 'bulk')) for i in range(3)]
+            await asyncio.sleep(0)
+            tasks.append(asyncio.ensure_future(acquire('interactive', 'interactive')))
+            await asyncio.gather(*tasks)
+            self.assertEqual(limiter.waiting, 0)
+
+        asyncio.run(main())
+        self.assertEqual(order, ['interactive', 'bulk0', 'bulk1', 'bulk2'])
+        self.assertRaises(ValueError, limiter.acquire, 'urgent')
+
+        # Bulk requests may only use half of the rate
+        limiter = brawlstats.RateLimiter(10, reserved=0.5)
+        limiter.acquire('bulk')
+        self.assertAlmostEqual(limiter._take(True), 0.2, places=2)
+        self.assertAlmostEqual(limiter._take(False), 0.1, places=2)
+
+    def test_timeout(self):
+        limiter = brawlstats.RateLimiter(1)
+        limiter.reserve()
+        # The next slot is a second away, so this gives up without waiting for the deadline
+        self.assertRaises(TimeoutError, limiter.acquire, timeout=0.5)
+        self.assertEqual(limiter.waiting, 0)
+
+        error = brawlstats.RequestTimeoutError(503, 'url', 0.5)
+        self.assertIsInstance(error, brawlstats.ServerError)
+        self.assertIsInstance(error, TimeoutError)
+        self.assertEqual(str(error), 'The request timed out after 0.5 seconds.')
+
+    def test_shared_rate_limiter(self):
+        limiter = brawlstats.SharedRateLimiter(10)
+        before = time.monotonic()
+        process = multiprocessing.Process(target=limiter.reserve)
+        process.start()
+        process.join()
+        after = time.monotonic()
+        # The other process advanced the shared arrival time by one interval from when it reserved
+        self.assertGreaterEqual(limiter._state[0], before + 0.1)
+        self.assertLessEqual(limiter._state[0], after + 0.1)
+        # So the slot it reserved is taken here
+        delay = limiter.reserve()
+        self.assertGreater(delay, 0)
+        self.assertLessEqual(delay, 0.1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import json
+import os
+import tempfile
+import unittest
+
+import brawlstats
+
+
+class TestReplay(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'traffic.bsrec')
+        brawlers = json.dumps({'items': [{'id': 16000000, 'name': 'SHELLY', 'starPowers': [], 'gadgets': []}]})
+        with brawlstats.TrafficRecorder(self.path) as recorder:
+            recorder.record('/brawlers', 200, 1000.0, 0.05, brawlers)
+            recorder.record('/players/%23V2LQY9UY', 200, 1001.0, 0.1, json.dumps({'tag': '#V2LQY9UY', 'name': 'A'}))
+            recorder.record('/players/%23V2LQY9UY', 200, 1002.0, 0.1, json.dumps({'tag': '#V2LQY9UY', 'name': 'B'}))
+            ranking = {'items': [{'tag': f'#{i}', 'name': str(i), 'rank': i + 1} for i in range(200)]}
+            recorder.record('/rankings/global/players?limit=200', 200, 1003.0, 0.1, json.dumps(ranking))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_read_recording(self):
+        responses = list(brawlstats.read_recording(self.path))
+        self.assertEqual(
+            [r.url for r in responses],
+            ['/brawlers', '/players/%23V2LQY9UY', '/players/%23V2LQY9UY', '/rankings/global/players?limit=200']
+        )
+        self.assertEqual(responses[2].data['name'], 'B')
+        self.assertEqual(responses[1].latency, 0.1)
+
+    def test_replay_session(self):
+        with brawlstats.Client('token', replay=brawlstats.ReplaySession(self.path, speed=None)) as client:
+            self.assertEqual(client.get_player('#V2LQY9UY', use_cache=False).name, 'A')
+            self.assertEqual(client.get_player('#V2LQY9UY', use_cache=False).name, 'B')
+            self.assertEqual(client.get_player('#V2LQY9UY', use_cache=False).name, 'B')  # the last one repeats
+            self.assertRaises(brawlstats.NotFoundError, client.get_club, '#UL0GCC8')
+
+            report = brawlstats.replay(client, self.path, speed=None)
+            self.assertEqual(report['requests'], 4)
+            self.assertEqual(report['errors'], 0)
+
+    def test_client_record(self):
+        path = os.path.join(self.tmp.name, 'recorded.bsrec')
+        replayed = brawlstats.ReplaySession(self.path, speed=None)
+        with brawlstats.Client('token', replay=replayed, record=path) as client:
+            client.get_player('#V2LQY9UY')
+            self.assertRaises(brawlstats.NotFoundError, client.get_club, '#UL0GCC8')
+
+        responses = [r for r in brawlstats.read_recording(path) if r.url != '/brawlers']
+        self.assertEqual(
+            [(r.url, r.status) for r in responses], [('/players/%23V2LQY9UY', 200), ('/clubs/%23UL0GCC8', 404)]
+        )
+        self.assertEqual(responses[0].data['name'], 'A')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import json
+import os
+import tempfile
+import threading
+import unittest
+
+import brawlstats
+from brawlstats.utils import CacheKey, int_to_tag, tag_to_int
+
+
+class TestThreading(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_map_threads(self):
+        tags = [int_to_tag(i) for i in range(1000, 1040)]
+        path = os.path.join(self.tmp.name, 'players.bsrec')
+        with brawlstats.TrafficRecorder(path) as recorder:
+            recorder.record('/brawlers', 200, 1000.0, 0.01, json.dumps({'items': []}))
+            for tag in tags:
+                recorder.record(f'/players/%23{tag[1:]}', 200, 1000.0, 0.01, json.dumps({'tag': tag, 'name': tag}))
+
+        session = brawlstats.ReplaySession(path)
+        with brawlstats.Client('token', replay=session, max_workers=4) as client:
+            def get_player(tag):
+                return threading.current_thread().name, client.get_player(tag)
+
+            results = {}
+            executor = client._executor
+
+            def run(offset):
+                # Every thread maps a rotation of the tags, so the same tags are requested concurrently
+                results[offset] = client.map(get_player, tags[offset:] + tags[:offset])
+
+            threads = [threading.Thread(target=run, args=(offset,)) for offset in (0, 10, 20, 30)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join(10)
+
+            for offset, result in results.items():
+                self.assertEqual([player.tag for _, player in result], tags[offset:] + tags[:offset])
+                self.assertTrue(all(name.startswith('brawlstats') for name, _ in result))
+            self.assertEqual(len(results), 4)
+            self.assertIsNotNone(executor)
+            self.assertIs(client._executor, executor)  # the threads did not make pools of their own
+            for tag in tags:
+                self.assertIn(CacheKey('players/{tag}', tag_to_int(tag)), client.cache)
+            self.assertLessEqual(session.requests, 1 + len(tags) * 4)
+
+            # Without a session passed, every worker thread makes its own
+            client.session = None
+            sessions = client.map(lambda _: client.session, range(20))
+            self.assertEqual(len(set(map(id, sessions))), len(client._sessions))
+            self.assertTrue(1 <= len(client._sessions) <= 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+from datetime import datetime, timezone
+
+from brawlstats.utils import API, CacheKey, bstag, get_datetime, get_timestamps, tag_to_int, typecasted
+
+
+class TestUtils(unittest.TestCase):
+
+    def test_get_datetime(self):
+        self.assertEqual(get_datetime('20200925T184431.000Z'), 1601059471)
+        self.assertEqual(get_datetime('19700101T000000.000Z'), 0)
+        self.assertEqual(get_datetime('20240229T235959.000Z'), 1709251199)
+        self.assertEqual(
+            get_datetime('20200925T184431.250Z', unix=False),
+            datetime(2020, 9, 25, 18, 44, 31, 250000, tzinfo=timezone.utc)
+        )
+        self.assertRaises(ValueError, get_datetime, '2020-09-25T18:44:31Z')
+
+        invalid = [
+            '20201325T184431.000Z', '20200025T184431.000Z', '20200931T184431.000Z', '20210229T184431.000Z',
+            '20200900T184431.000Z', '20200925T244431.000Z', '20200925T186031.000Z', '20200925T184460.000Z',
+            '2020092 T184431.000Z', '20200925T184431.-00Z', '+2020925T184431.000Z', '2020092\u0665T184431.000Z'
+        ]
+        for timestamp in invalid:
+            self.assertRaises(ValueError, get_datetime, timestamp)
+            self.assertRaises(ValueError, get_datetime, timestamp, unix=False)
+            self.assertRaises(ValueError, get_timestamps, ['20200925T184431.000Z', timestamp])
+
+    def test_get_timestamps(self):
+        timestamps = get_timestamps(['20200925T184431.000Z', '19700101T000001.000Z'])
+        self.assertEqual(timestamps.typecode, 'q')
+        self.assertEqual(list(timestamps), [1601059471, 1])
+
+    def test_typecasted(self):
+        @typecasted
+        def get(tag: bstag, use_cache=True, priority=None):
+            return tag, use_cache, priority
+
+        self.assertEqual(get('v2lqy9uy', use_cache=False, priority='bulk'), ('%23V2LQY9UY', False, 'bulk'))
+        self.assertEqual(get(tag='#V2LQY9UY'), ('%23V2LQY9UY', True, None))
+
+    def test_typecasted_none(self):
+        @typecasted
+        def get(tag: bstag, priority: str=None):
+            return tag, priority
+
+        self.assertEqual(get('#V2LQY9UY', priority=None), ('%23V2LQY9UY', None))
+        self.assertEqual(get('#V2LQY9UY', None), ('%23V2LQY9UY', None))
+        self.assertEqual(get('#V2LQY9UY', priority='bulk'), ('%23V2LQY9UY', 'bulk'))
+        self.assertRaises(Exception, get, None)  # required arguments are still converted
+
+    def test_cache_key(self):
+        api = API(base_url=None)
+        self.assertEqual(
+            api.cache_key(f'{api.PROFILE}/%23V2LQY9UY/battlelog'),
+            CacheKey('players/{tag}/battlelog', tag_to_int('V2LQY9UY'))
+        )
+        self.assertEqual(
+            api.cache_key(f'{api.RANKINGS}/global/players?limit=50'), CacheKey('rankings/global/players', None, 50)
+        )
+        self.assertEqual(api.cache_key(api.BRAWLERS), CacheKey('brawlers'))
+
+
+if __name__ == '__main__':
+    unittest.main()